@@ -0,0 +1,51 @@
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.core.alert_core import ALERT_LEVEL_CLEAR, ALERT_LEVEL_LOW
+
+ALERT_LOW = "low"
+ALERT_RECOVERED = "recovered"
+
+
+class LevelAlarm:
+    def __init__(self, low: float, clear: float):
+        if clear < low:
+            raise ValueError("The clear threshold must not be below the low threshold.")
+        self.low = low
+        self.clear = clear
+        self._active: Dict[int, bool] = {}
+        self._last: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+
+    def observe(
+        self, device_id: int, level: Optional[float], date: Optional[datetime] = None
+    ) -> Optional[str]:
+        if level is None:
+            return None
+        with self._lock:
+            if date is not None:
+                last = self._last.get(device_id)
+                if last is not None and date <= last:
+                    return None
+                self._last[device_id] = date
+            active = self._active.get(device_id, False)
+            if not active and level < self.low:
+                self._active[device_id] = True
+                return ALERT_LOW
+            if active and level >= self.clear:
+                self._active[device_id] = False
+                return ALERT_RECOVERED
+        return None
+
+    def active(self) -> List[int]:
+        with self._lock:
+            return sorted(device for device, active in self._active.items() if active)
+
+    def reset(self):
+        with self._lock:
+            self._active.clear()
+            self._last.clear()
+
+
+level_alarm = LevelAlarm(ALERT_LEVEL_LOW, ALERT_LEVEL_CLEAR)
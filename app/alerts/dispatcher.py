@@ -0,0 +1,257 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.alerts.detector import ALERT_LOW
+from app.alerts.senders import CHANNEL_EMAIL, CHANNEL_SMS, configured_senders
+from app.core.alert_core import (
+    ALERT_BATCH_SIZE,
+    ALERT_BATCH_WINDOW,
+    ALERT_MAX_RETRIES,
+    ALERT_QUEUE_SIZE,
+    ALERT_RATE_LIMIT,
+    ALERT_RETRY_DELAY,
+    ALERT_WORKERS,
+)
+from app.core.database import SessionLocal
+from app.core.metrics import Counter
+from app.repository.email_repository import get_email_addresses
+from app.repository.phone_repository import get_phone_numbers
+
+logger = logging.getLogger(__name__)
+
+alerts_sent = Counter(
+    "alerts_sent", "Alert messages delivered per contact.", ("channel",)
+)
+alerts_failed = Counter(
+    "alerts_failed", "Alert messages that failed after all retries.", ("channel",)
+)
+alerts_rate_limited = Counter(
+    "alerts_rate_limited",
+    "Repeated alerts withheld from a contact by the rate limit.",
+    ("channel",),
+)
+alerts_dropped = Counter("alerts_dropped", "Alerts dropped on a full queue.")
+
+
+def load_contacts() -> Dict[str, List[str]]:
+    with SessionLocal() as db:
+        return {
+            CHANNEL_EMAIL: get_email_addresses(db),
+            CHANNEL_SMS: get_phone_numbers(db),
+        }
+
+
+def format_alert(alert: dict) -> str:
+    feeder = f"Feeder '{alert['device_name']}' (device {alert['device_id']})"
+    date = alert["date"].strftime("%H:%M %d/%m/%Y")
+    if alert["kind"] == ALERT_LOW:
+        return f"{feeder} is running low: {alert['level']:.0f}% at {date}."
+    return f"{feeder} was refilled: {alert['level']:.0f}% at {date}."
+
+
+def format_subject(alerts: List[dict]) -> str:
+    low = sum(alert["kind"] == ALERT_LOW for alert in alerts)
+    if low:
+        return f"Peat Data: {low} feeder(s) running low"
+    return "Peat Data: feeder refilled"
+
+
+def _rate_key(channel: str, recipient: str, alert: dict) -> tuple:
+    return channel, recipient, alert["device_id"], alert["kind"]
+
+
+class AlertDispatcher:
+    def __init__(
+        self,
+        senders: Dict[str, object],
+        contacts: Callable[[], Dict[str, List[str]]] = load_contacts,
+        workers: int = ALERT_WORKERS,
+        queue_size: int = ALERT_QUEUE_SIZE,
+        batch_size: int = ALERT_BATCH_SIZE,
+        batch_window: float = ALERT_BATCH_WINDOW,
+        rate_limit: float = ALERT_RATE_LIMIT,
+        max_retries: int = ALERT_MAX_RETRIES,
+        retry_delay: float = ALERT_RETRY_DELAY,
+    ):
+        self.senders = senders
+        self.contacts = contacts
+        self.workers = workers
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.rate_limit = rate_limit
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._last_sent: Dict[tuple, float] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,
+            "dropped": 0,
+            "batches": 0,
+            "sent": 0,
+            "failed": 0,
+            "retries": 0,
+            "rate_limited": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.senders)
+
+    def start(self):
+        if not self.enabled or self._thread is not None:
+            return
+        self._ready.clear()
+        self._thread = threading.Thread(
+            target=lambda: asyncio.run(self._main()),
+            name="alert-dispatcher",
+            daemon=True,
+        )
+        self._thread.start()
+        self._ready.wait()
+
+    def stop(self, timeout: float = None):
+        if self._thread is None:
+            return
+        for _ in range(self.workers):
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, None)
+        self._thread.join(timeout)
+        self._thread = None
+        self._loop = None
+
+    def submit(self, alert: dict) -> bool:
+        loop = self._loop
+        if loop is None:
+            return False
+        loop.call_soon_threadsafe(self._enqueue, alert)
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["channels"] = sorted(self.senders)
+        stats["queue_depth"] = self._queue.qsize() if self._queue is not None else 0
+        stats["running"] = self._thread is not None and self._thread.is_alive()
+        return stats
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _enqueue(self, alert: dict):
+        try:
+            self._queue.put_nowait(alert)
+        except asyncio.QueueFull:
+            alerts_dropped.inc()
+            self._count("dropped")
+            logger.warning("Alert queue full, dropping alert")
+            return
+        self._count("submitted")
+
+    async def _main(self):
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._loop = asyncio.get_running_loop()
+        self._ready.set()
+        await asyncio.gather(*(self._worker() for _ in range(self.workers)))
+
+    async def _worker(self):
+        while True:
+            alert = await self._queue.get()
+            if alert is None:
+                return
+            batch = [alert]
+            deadline = time.monotonic() + self.batch_window
+            stopping = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    alert = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if alert is None:
+                    stopping = True
+                    break
+                batch.append(alert)
+            await self._deliver(batch)
+            if stopping:
+                return
+
+    async def _deliver(self, batch: List[dict]):
+        self._count("batches")
+        try:
+            contacts = await asyncio.to_thread(self.contacts)
+        except Exception as e:
+            self._count("failed", len(batch))
+            logger.error(f"Could not load alert contacts: {e}")
+            return
+
+        sends = []
+        for channel, sender in self.senders.items():
+            for alerts, recipients in self._allowed(
+                channel, contacts.get(channel, []), batch
+            ):
+                sends.append(self._send(channel, sender, recipients, alerts))
+        await asyncio.gather(*sends)
+
+    def _allowed(
+        self, channel: str, recipients: List[str], batch: List[dict]
+    ) -> List[Tuple[List[dict], List[str]]]:
+        now = time.monotonic()
+        groups: Dict[tuple, List[str]] = {}
+        with self._lock:
+            for recipient in recipients:
+                allowed = []
+                for index, alert in enumerate(batch):
+                    key = _rate_key(channel, recipient, alert)
+                    last_sent = self._last_sent.get(key)
+                    if last_sent is not None and now - last_sent < self.rate_limit:
+                        self._stats["rate_limited"] += 1
+                        alerts_rate_limited.inc(channel)
+                        continue
+                    self._last_sent[key] = now
+                    allowed.append(index)
+                if allowed:
+                    groups.setdefault(tuple(allowed), []).append(recipient)
+        return [
+            ([batch[index] for index in indexes], recipients)
+            for indexes, recipients in groups.items()
+        ]
+
+    async def _send(
+        self, channel: str, sender, recipients: List[str], alerts: List[dict]
+    ):
+        subject = format_subject(alerts)
+        body = "\n".join(format_alert(alert) for alert in alerts)
+        for attempt in range(self.max_retries + 1):
+            try:
+                await asyncio.to_thread(sender.send, recipients, subject, body)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    alerts_failed.inc(channel, amount=len(recipients))
+                    self._count("failed", len(recipients))
+                    with self._lock:
+                        for recipient in recipients:
+                            for alert in alerts:
+                                key = _rate_key(channel, recipient, alert)
+                                self._last_sent.pop(key, None)
+                    logger.error(f"Could not send {channel} alert: {e}")
+                    return
+                self._count("retries")
+                logger.warning(f"Retrying {channel} alert after error: {e}")
+                await asyncio.sleep(self.retry_delay * 2**attempt)
+                continue
+            alerts_sent.inc(channel, amount=len(recipients))
+            self._count("sent", len(recipients))
+            return
+
+
+alert_dispatcher = AlertDispatcher(configured_senders())
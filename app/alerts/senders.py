@@ -0,0 +1,86 @@
+import json
+import smtplib
+import urllib.request
+from email.message import EmailMessage
+from typing import Dict, List, Optional
+
+from app.core.alert_core import (
+    ALERT_SEND_TIMEOUT,
+    SMS_WEBHOOK_TOKEN,
+    SMS_WEBHOOK_URL,
+    SMTP_FROM,
+    SMTP_HOST,
+    SMTP_PASSWORD,
+    SMTP_PORT,
+    SMTP_STARTTLS,
+    SMTP_USER,
+)
+
+CHANNEL_EMAIL = "email"
+CHANNEL_SMS = "sms"
+
+
+class SmtpSender:
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        sender: str,
+        user: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = True,
+        timeout: float = ALERT_SEND_TIMEOUT,
+    ):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    def send(self, recipients: List[str], subject: str, body: str):
+        message = EmailMessage()
+        message["Subject"] = subject
+        message["From"] = self.sender
+        message["To"] = self.sender
+        message.set_content(body)
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.user:
+                smtp.login(self.user, self.password or "")
+            smtp.send_message(message, to_addrs=recipients)
+
+
+class WebhookSmsSender:
+    def __init__(
+        self, url: str, token: Optional[str] = None, timeout: float = ALERT_SEND_TIMEOUT
+    ):
+        self.url = url
+        self.token = token
+        self.timeout = timeout
+
+    def send(self, recipients: List[str], subject: str, body: str):
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps({"to": recipients, "message": body}).encode(),
+            headers=headers,
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+def configured_senders() -> Dict[str, object]:
+    senders = {}
+    if SMTP_HOST:
+        senders[CHANNEL_EMAIL] = SmtpSender(
+            SMTP_HOST, SMTP_PORT, SMTP_FROM, SMTP_USER, SMTP_PASSWORD, SMTP_STARTTLS
+        )
+    if SMS_WEBHOOK_URL:
+        senders[CHANNEL_SMS] = WebhookSmsSender(SMS_WEBHOOK_URL, SMS_WEBHOOK_TOKEN)
+    return senders
@@ -1,9 +1,19 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
 from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
+from app.alerts.detector import level_alarm
+from app.alerts.dispatcher import alert_dispatcher
 from app.auth.token_authenticator import TokenAuthenticator
+from app.core.cache import level_cache, sensor_data_cache
+from app.core.constants import GENERATE_DAYS, GENERATE_INTERVAL
 from app.core.database import get_db
+from app.core.dedupe import reading_dedupe
+from app.core.metrics import render_metrics
+from app.core.retention import retention_job
+from app.core.sql_profiler import sql_profiler
+from app.mqtt.mqtt_listener import consumer_status, ingest_queue
 from app.service.email_service import EmailService
 from app.service.level_service import LevelService
 from app.service.phone_service import PhoneService
@@ -25,14 +35,23 @@ def get_services(db: Session = Depends(get_db)):
 @router.post(
     "/generate-temp-humi-data",
     summary="Generate mock temperature and humidity data",
-    description="Generates mock temperature and humidity data for the past 31 days, with two entries per day.",
+    description="Generates temperature and humidity readings with a daily curve for the past `days` days, "
+    "one every `interval` seconds, for the first `devices` registered feeders. "
+    "Defaults to 31 days with two readings per day.",
 )
-async def generate_sensor_data(
+def generate_sensor_data(
+    days: int = Query(GENERATE_DAYS, ge=1, le=3650),
+    interval: int = Query(GENERATE_INTERVAL, ge=1),
+    devices: int = Query(1, ge=1),
     services=Depends(get_services),
     credentials: HTTPAuthorizationCredentials = Depends(auth.verify_token),
 ):
-    services["sensor_data_service"].generate_sensor_data()
-    return {"message": "Sensor data generated successfully!"}
+    result = services["sensor_data_service"].generate_sensor_data(
+        days, interval, devices
+    )
+    if isinstance(result, dict) and "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return {"message": "Sensor data generated successfully!", "generated": result}
 
 
 @router.delete(
@@ -40,7 +59,7 @@ async def generate_sensor_data(
     summary="Delete all sensor data",
     description="Deletes all records from the `sensor_data` table in the database.",
 )
-async def delete_sensor_data(
+def delete_sensor_data(
     services=Depends(get_services),
     credentials: HTTPAuthorizationCredentials = Depends(auth.verify_token),
 ):
@@ -52,15 +71,25 @@ async def delete_sensor_data(
 @router.post(
     "/generate-level-data",
     summary="Generate mock level/distance data",
-    description="Generates mock level/distance data for the past 31 days, with two entries per day.",
+    description="Generates feeder levels that drain during the day and are refilled every morning for the past `days` days, "
+    "one every `interval` seconds, for the first `devices` registered feeders. "
+    "Defaults to 31 days with two readings per day.",
 )
-async def generate_level_data(
+def generate_level_data(
+    days: int = Query(GENERATE_DAYS, ge=1, le=3650),
+    interval: int = Query(GENERATE_INTERVAL, ge=1),
+    devices: int = Query(1, ge=1),
     services=Depends(get_services),
     credentials: HTTPAuthorizationCredentials = Depends(auth.verify_token),
 ):
 
-    services["level_service"].generate_level_data()
-    return {"message": "Level/distance data generated successfully!"}
+    result = services["level_service"].generate_level_data(days, interval, devices)
+    if isinstance(result, dict) and "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return {
+        "message": "Level/distance data generated successfully!",
+        "generated": result,
+    }
 
 
 @router.delete(
@@ -68,7 +97,7 @@ async def generate_level_data(
     summary="Delete all level data",
     description="Deletes all records from the `level` table in the database.",
 )
-async def delete_level_data(
+def delete_level_data(
     services=Depends(get_services),
     credentials: HTTPAuthorizationCredentials = Depends(auth.verify_token),
 ):
@@ -82,7 +111,7 @@ async def delete_level_data(
     summary="Generate mock email data",
     description="Generates `n` mock email records and stores them in the database.",
 )
-async def generate_email_data(
+def generate_email_data(
     n: int,
     services=Depends(get_services),
     credentials: HTTPAuthorizationCredentials = Depends(auth.verify_token),
@@ -97,7 +126,7 @@ async def generate_email_data(
     summary="Delete all email records",
     description="Deletes all records from the `email` table in the database.",
 )
-async def delete_email_data(
+def delete_email_data(
     services=Depends(get_services),
     credentials: HTTPAuthorizationCredentials = Depends(auth.verify_token),
 ):
@@ -111,7 +140,7 @@ async def delete_email_data(
     summary="Generate mock phone data",
     description="Generates `n` mock phone records and stores them in the database.",
 )
-async def generate_phone_data(
+def generate_phone_data(
     n: int,
     services=Depends(get_services),
     credentials: HTTPAuthorizationCredentials = Depends(auth.verify_token),
@@ -125,9 +154,124 @@ async def generate_phone_data(
     summary="Delete all phone records",
     description="Deletes all records from the `phone` table in the database.",
 )
-async def delete_phone_data(
+def delete_phone_data(
     services=Depends(get_services),
     credentials: HTTPAuthorizationCredentials = Depends(auth.verify_token),
 ):
     services["phone_service"].delete_all_phone_data()
     return {"message": "All phone data deleted successfully!"}
+
+
+@router.get(
+    "/ingest/stats",
+    summary="Get MQTT ingest queue statistics",
+    description="Returns queue depth, backpressure drops and batch flush latency of the MQTT write-behind queue, "
+    "the duplicate readings dropped by the in-memory dedupe cache and the unique index, "
+    "and whether this worker is the active MQTT consumer.",
+)
+async def get_ingest_stats(
+    credentials: HTTPAuthorizationCredentials = Depends(auth.verify_token),
+):
+    return {
+        **ingest_queue.stats(),
+        "dedupe": reading_dedupe.stats(),
+        "consumer": consumer_status(),
+    }
+
+
+@router.get(
+    "/cache/stats",
+    summary="Get query result cache statistics",
+    description="Returns hit/miss counters, size and generation of the level and temperature/humidity result caches.",
+)
+async def get_cache_stats(
+    credentials: HTTPAuthorizationCredentials = Depends(auth.verify_token),
+):
+    return {"level": level_cache.stats(), "temp_humi": sensor_data_cache.stats()}
+
+
+@router.get(
+    "/metrics",
+    summary="Get Prometheus metrics",
+    description="Returns request latency per route, MQTT ingest counters and latency, "
+    "and database session timings of this worker in the Prometheus text format.",
+    response_class=PlainTextResponse,
+)
+async def get_metrics(
+    credentials: HTTPAuthorizationCredentials = Depends(auth.verify_token),
+):
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@router.get(
+    "/sql/profile",
+    summary="Get the slowest SQL statements",
+    description="Returns the `limit` slowest statements recorded by the SQL profiler, ordered by `order_by`, "
+    "with the repository function that ran them and the `EXPLAIN QUERY PLAN` of statements slower than `SQL_SLOW_MS`. "
+    "`full_scan` marks plans that scan a table without an index. The profiler only records when `SQL_PROFILE` is set.",
+)
+async def get_sql_profile(
+    limit: int = Query(20, ge=1, le=500),
+    order_by: str = Query("max_ms", pattern="^(max_ms|total_ms|count|slow)$"),
+    credentials: HTTPAuthorizationCredentials = Depends(auth.verify_token),
+):
+    return sql_profiler.stats(limit, order_by)
+
+
+@router.delete(
+    "/sql/profile",
+    summary="Reset the SQL profiler",
+    description="Clears the statements recorded by the SQL profiler.",
+)
+async def reset_sql_profile(
+    credentials: HTTPAuthorizationCredentials = Depends(auth.verify_token),
+):
+    sql_profiler.reset()
+    return {"message": "SQL profile reset successfully!"}
+
+
+@router.get(
+    "/retention/stats",
+    summary="Get retention job statistics",
+    description="Returns the retention windows of raw readings and hourly rollups, and the rows compacted, "
+    "purged and vacuumed by the last run of the background retention job.",
+)
+async def get_retention_stats(
+    credentials: HTTPAuthorizationCredentials = Depends(auth.verify_token),
+):
+    return retention_job.stats()
+
+
+@router.post(
+    "/retention/run",
+    summary="Run the retention job now",
+    description="Wakes the background retention job, which compacts raw readings older than `RETENTION_RAW_DAYS` "
+    "into hourly rollups and purges rollups older than `RETENTION_HOURLY_DAYS`. Returns 400 when retention is disabled.",
+)
+async def run_retention(
+    credentials: HTTPAuthorizationCredentials = Depends(auth.verify_token),
+):
+    if not retention_job.trigger():
+        raise HTTPException(
+            status_code=400, detail="Retention is disabled in this worker."
+        )
+    return {"message": "Retention run scheduled."}
+
+
+@router.get(
+    "/alerts/stats",
+    summary="Get low-level alert statistics",
+    description="Returns the feeders currently below `ALERT_LEVEL_LOW`, and the alerts queued, sent, retried, "
+    "rate limited and failed by the alert dispatcher of this worker.",
+)
+async def get_alert_stats(
+    credentials: HTTPAuthorizationCredentials = Depends(auth.verify_token),
+):
+    return {
+        **alert_dispatcher.stats(),
+        "low": level_alarm.low,
+        "clear": level_alarm.clear,
+        "active": level_alarm.active(),
+    }
@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.orm import Session
+from typing import List
+
+from app.auth.token_authenticator import TokenAuthenticator
+from app.core.database import get_db
+from app.model.device import Device
+from app.model.device_request import DeviceRequest, DeviceUpdateRequest
+from app.service.device_service import DeviceService
+
+router = APIRouter()
+auth = TokenAuthenticator()
+
+
+def get_device_service(db: Session = Depends(get_db)) -> DeviceService:
+    return DeviceService(db)
+
+
+@router.post(
+    "/devices",
+    response_model=Device,
+    summary="Registers a feeder",
+    description="Registers a feeder and its level sensor calibration: `capacity` is the distance read "
+    "when the feeder is empty and `distance_full` the distance read when it is full. "
+    "The returned `id` is the `device_id` the feeder reports its readings with.",
+)
+def post_device(
+    request: DeviceRequest,
+    services=Depends(get_device_service),
+    credentials: HTTPAuthorizationCredentials = Depends(auth.verify_token),
+):
+    result = services.add_device(request.name, request.capacity, request.distance_full)
+    if isinstance(result, dict) and "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+
+@router.get(
+    "/devices",
+    response_model=List[Device],
+    summary="Retrieves all registered feeders",
+    description="This endpoint retrieves all feeders registered in the system with their calibration.",
+)
+def get_devices(
+    services=Depends(get_device_service),
+    credentials: HTTPAuthorizationCredentials = Depends(auth.verify_token),
+):
+    return services.get_all_devices()
+
+
+@router.patch(
+    "/devices/{device_id}",
+    response_model=Device,
+    summary="Updates a feeder",
+    description="Updates the name or calibration of a feeder. The new calibration applies to readings "
+    "received from then on; stored levels are not recalculated.",
+)
+def patch_device(
+    device_id: int,
+    request: DeviceUpdateRequest,
+    services=Depends(get_device_service),
+    credentials: HTTPAuthorizationCredentials = Depends(auth.verify_token),
+):
+    result = services.update_device(device_id, request.model_dump(exclude_none=True))
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Device {device_id} not found.",
+        )
+    if isinstance(result, dict) and "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.auth.token_authenticator import TokenAuthenticator
+from app.core.constants import CONTACT_IMPORT_MAX_ROWS, MAX_PAGE_SIZE, PAGE_SIZE
+from app.core.contact_import import parse_contacts
 from app.core.database import get_db
+from app.core.pagination import parse_id_cursor
 from app.model.email import Email
 from app.model.email_request import EmailRequest
 from app.service.email_service import EmailService
@@ -41,14 +45,54 @@ def post_email(
     }
 
 
+@router.post(
+    "/email/bulk",
+    summary="Imports email addresses in bulk",
+    description=f"Adds up to {CONTACT_IMPORT_MAX_ROWS} email addresses in one request. "
+    'Send a JSON array of `{"name", "email"}` objects, or a CSV file with a `name,email` header and `Content-Type: text/csv`. '
+    "Addresses repeated in the request or already registered are skipped, and rows without a name or an address are rejected. "
+    "The response reports how many addresses were `inserted` and `skipped`, and the index of every `rejected` row.",
+)
+async def post_email_bulk(
+    request: Request,
+    services: EmailService = Depends(get_email_service),
+    credentials: HTTPAuthorizationCredentials = Depends(auth.verify_token),
+):
+    try:
+        contacts = parse_contacts(
+            await request.body(), request.headers.get("content-type", ""), "email"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(contacts) > CONTACT_IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"The import must not exceed {CONTACT_IMPORT_MAX_ROWS} rows.",
+        )
+    return await run_in_threadpool(services.import_emails, contacts)
+
+
 @router.get(
     "/email",
     response_model=List[Email],
     summary="Retrieves all registered email addresses",
-    description="This endpoint retrieves all email addresses registered in the system.",
+    description="This endpoint retrieves all email addresses registered in the system.\n\n"
+    "Results are paginated: at most `limit` records are returned and, when more exist, "
+    "the `X-Next-Cursor` response header holds the `cursor` for the next page.",
 )
 def get_emails(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     services=Depends(get_email_service),
     credentials: HTTPAuthorizationCredentials = Depends(auth.verify_token),
 ):
-    return services.get_all_emails()
+    try:
+        after = parse_id_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+    page = services.get_all_emails(limit, after)
+    if page.next_cursor is not None:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return page
@@ -1,14 +1,22 @@
+from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
 from app.auth.token_authenticator import TokenAuthenticator
-from app.model.level_request import LevelRequest
+from app.model.level_request import LevelBatchItem, LevelRequest
 from app.model.level_response import LevelResponse
 from app.service.level_service import LevelService
 from app.core.database import get_db
+from app.core.columnar import FastJSONResponse
+from app.core.constants import BATCH_MAX_READINGS, COMEDOURO_ID, HISTORY_PAGE_SIZE
+from app.core.export import EXPORT_FORMATS
+from app.core.pagination import parse_time_cursor
+from app.core.utils import day_range, local_now, to_local
+from app.core.watermark import cache_headers, is_not_modified, level_watermark
 
 router = APIRouter()
 auth = TokenAuthenticator()
@@ -21,14 +29,27 @@ def get_level_service(db: Session = Depends(get_db)) -> LevelService:
 @router.post(
     "/level",
     summary="Adds feeder occupation data",
-    description="Submit level data to the database.",
+    description="Submit level data to the database.\n\n"
+    "The distance reading is converted to an occupation percentage with the calibration of `device_id` "
+    f"(defaults to {COMEDOURO_ID}).\n\n"
+    "The reading may carry its own `date` (ISO 8601 or Unix timestamp); without one it is stamped with the server time. "
+    "A retried reading with the same device, value and `date` is reported as a duplicate and not stored again.",
 )
-async def post_distance(
+def post_distance(
     data: LevelRequest,
     services: LevelService = Depends(get_level_service),
     credentials: HTTPAuthorizationCredentials = Depends(auth.verify_token),
 ):
-    response = services.handle_level(data.level)
+    response = services.handle_level(data.level, data.device_id, data.date)
+    if isinstance(response, dict) and "invalid" in response:
+        raise HTTPException(status_code=400, detail=response["invalid"])
+    if isinstance(response, dict) and "error" in response:
+        raise HTTPException(status_code=404, detail=response["error"])
+    if isinstance(response, dict) and "duplicate" in response:
+        return {
+            "message": "Duplicate level reading ignored",
+            "detail": response["duplicate"],
+        }
     return {
         "message": "Level data received successfully",
         "level": f"{response.level}",
@@ -36,42 +57,205 @@ async def post_distance(
     }
 
 
+@router.post(
+    "/level/batch",
+    summary="Adds a batch of feeder occupation readings",
+    description=f"Submit up to {BATCH_MAX_READINGS} level readings in one request, e.g. readings buffered by a device while offline.\n\n"
+    "Each reading may carry its own `date` (ISO 8601 or Unix timestamp); readings without one are stamped with the server time. "
+    "Readings may also carry a `device_id`; readings for unregistered devices are rejected. "
+    "Readings already received with the same device, values and `date` are reported as `duplicate` and not stored again. "
+    "All accepted readings are stored in a single transaction and the response reports the result of every item.",
+)
+def post_level_batch(
+    readings: List[LevelBatchItem],
+    services: LevelService = Depends(get_level_service),
+    credentials: HTTPAuthorizationCredentials = Depends(auth.verify_token),
+):
+    if not readings:
+        raise HTTPException(status_code=400, detail="The batch must not be empty.")
+    if len(readings) > BATCH_MAX_READINGS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"The batch must not exceed {BATCH_MAX_READINGS} readings.",
+        )
+
+    results = services.handle_level_batch(
+        [(item.level, item.date, item.device_id) for item in readings]
+    )
+    saved = sum(result["status"] == "saved" for result in results)
+    duplicates = sum(result["status"] == "duplicate" for result in results)
+    return {
+        "message": "Batch processed",
+        "saved": saved,
+        "duplicates": duplicates,
+        "rejected": len(results) - saved - duplicates,
+        "results": results,
+    }
+
+
 @router.get(
     "/level",
     summary="Gets feeder occupation data based on query parameters",
-    description="Retrieve level data using one of the query parameters: `avg`, `last`, `days`, or `date`.\n\n"
-    "Only one parameter should be provided per request.",
+    description="Retrieve level data using one of the query parameters: `avg`, `last`, `days`, `date`, or the `from`/`to` range.\n\n"
+    "Only one parameter should be provided per request. `from` and `to` are ISO 8601 datetimes "
+    "(`to` is exclusive and optional).\n\n"
+    f"Results are those of the feeder `device_id` (defaults to {COMEDOURO_ID}).\n\n"
+    "`max_points` downsamples `days` and `from`/`to` results to at most that many points, "
+    "keeping the minimum and maximum of each time bucket.\n\n"
+    "Responses carry `ETag` and `Last-Modified` headers; conditional requests with "
+    "`If-None-Match` or `If-Modified-Since` get `304 Not Modified` when no new data arrived.\n\n"
+    "`format=ndjson` or `format=csv` streams `days` and `from`/`to` results in chunks instead of a JSON array. "
+    "`format=columnar` returns the `last`, `days`, `date` and `from`/`to` results as parallel arrays: "
+    "`ts` (UTC epoch milliseconds) and one array per value.\n\n"
+    "`last`, `days` and `from`/`to` results are paginated newest first: at most `limit` records "
+    "(`last` records for `last`) are returned and, when more exist, the `X-Next-Cursor` response "
+    "header holds the `cursor` for the next page.",
 )
-async def get_level(
+def get_level(
+    request: Request,
+    response: Response,
+    device_id: int = Query(COMEDOURO_ID, ge=1),
     avg: Optional[int] = None,
-    last: Optional[int] = None,
+    last: Optional[int] = Query(None, le=HISTORY_PAGE_SIZE),
     days: Optional[int] = None,
     date: Optional[str] = None,
+    from_: Optional[datetime] = Query(None, alias="from"),
+    to: Optional[datetime] = None,
+    max_points: Optional[int] = Query(None, ge=10),
+    format_: Optional[str] = Query(
+        None, alias="format", pattern="^(ndjson|csv|columnar)$"
+    ),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=HISTORY_PAGE_SIZE),
     services: LevelService = Depends(get_level_service),
     credentials: HTTPAuthorizationCredentials = Depends(auth.verify_token),
 ):
-    params_provided = sum(p is not None for p in [avg, last, days, date])
+    params_provided = sum(p is not None for p in [avg, last, days, date, from_])
 
+    if to is not None and from_ is None:
+        raise HTTPException(
+            status_code=400,
+            detail="The 'to' query parameter requires 'from'.",
+        )
     if params_provided == 0:
         raise HTTPException(
             status_code=400,
-            detail="Please provide one query parameter: 'avg', 'last', 'days', or 'date'.",
+            detail="Please provide one query parameter: 'avg', 'last', 'days', 'date', or 'from'.",
         )
     if params_provided > 1:
         raise HTTPException(
             status_code=400,
-            detail="Please provide only one of the query parameters: 'avg', 'last', 'days', or 'date'.",
+            detail="Please provide only one of the query parameters: 'avg', 'last', 'days', 'date', or 'from'.",
+        )
+    if max_points is not None and days is None and from_ is None:
+        raise HTTPException(
+            status_code=400,
+            detail="The 'max_points' query parameter is only supported with 'days' or 'from'.",
+        )
+    streaming = format_ in EXPORT_FORMATS
+    columnar = format_ == "columnar"
+    if streaming and days is None and from_ is None:
+        raise HTTPException(
+            status_code=400,
+            detail="The 'ndjson' and 'csv' formats are only supported with 'days' or 'from'.",
+        )
+    if streaming and max_points is not None:
+        raise HTTPException(
+            status_code=400,
+            detail="The 'ndjson' and 'csv' formats cannot be combined with 'max_points'.",
         )
+    if columnar and avg is not None:
+        raise HTTPException(
+            status_code=400,
+            detail="The 'columnar' format is not supported with 'avg'.",
+        )
+    if cursor is not None and last is None and days is None and from_ is None:
+        raise HTTPException(
+            status_code=400,
+            detail="The 'cursor' query parameter is only supported with 'last', 'days' or 'from'.",
+        )
+    if limit is not None and days is None and from_ is None:
+        raise HTTPException(
+            status_code=400,
+            detail="The 'limit' query parameter is only supported with 'days' or 'from'.",
+        )
+    if (cursor is not None or limit is not None) and (
+        max_points is not None or streaming
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail="The 'cursor' and 'limit' query parameters cannot be combined with 'max_points', 'ndjson' or 'csv'.",
+        )
+    try:
+        after = parse_time_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    limit = limit or HISTORY_PAGE_SIZE
 
     if avg is not None:
-        return services.get_last_n_avg_level(avg)
+        params, since = ("avg", device_id, avg), day_range(local_now().date())[0]
     elif last is not None:
-        return services.get_last_n_level_records(last)
+        params, since = ("last", device_id, last, cursor, format_), None
     elif days is not None:
-        return services.get_level_by_days(days)
+        params = ("days", device_id, days, max_points, format_, cursor, limit)
+        since = local_now().replace(second=0, microsecond=0)
     elif date is not None:
-        return services.get_level_by_date(date)
+        params, since = ("date", device_id, date, format_), None
+    else:
+        start_date, end_date = to_local(from_), to_local(to)
+        if end_date is not None and end_date <= start_date:
+            raise HTTPException(
+                status_code=400,
+                detail="The 'to' query parameter must be later than 'from'.",
+            )
+        params = (
+            "range",
+            device_id,
+            start_date,
+            end_date,
+            max_points,
+            format_,
+            cursor,
+            limit,
+        )
+        since = None
 
-    raise HTTPException(
-        status_code=500, detail="Internal server error: No valid parameter processed."
-    )
+    etag, last_modified = level_watermark.validators(params, since)
+    headers = cache_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    if streaming:
+        rows = (
+            services.stream_level_by_days(device_id, days, format_)
+            if days is not None
+            else services.stream_level_by_range(
+                device_id, start_date, end_date, format_
+            )
+        )
+        return StreamingResponse(
+            rows, media_type=EXPORT_FORMATS[format_], headers=headers
+        )
+
+    if avg is not None:
+        response.headers.update(headers)
+        return services.get_last_n_avg_level(device_id, avg)
+    elif date is not None:
+        result = services.get_level_by_date(device_id, date, columnar)
+    elif last is not None:
+        result = services.get_last_n_level_records(device_id, last, after, columnar)
+    elif days is not None:
+        result = services.get_level_by_days(
+            device_id, days, max_points, limit, after, columnar
+        )
+    else:
+        result = services.get_level_by_range(
+            device_id, start_date, end_date, max_points, limit, after, columnar
+        )
+
+    next_cursor = getattr(result, "next_cursor", None)
+    if next_cursor is not None:
+        headers["X-Next-Cursor"] = next_cursor
+    if columnar:
+        return FastJSONResponse(result, headers=headers)
+    response.headers.update(headers)
+    return result
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.auth.token_authenticator import TokenAuthenticator
+from app.core.constants import CONTACT_IMPORT_MAX_ROWS, MAX_PAGE_SIZE, PAGE_SIZE
+from app.core.contact_import import parse_contacts
 from app.core.database import get_db
+from app.core.pagination import parse_id_cursor
 from app.model.phone_request import PhoneRequest
 from app.service.phone_service import PhoneService
 from app.model.phone import Phone
@@ -30,7 +34,9 @@ def post_phone(
     if len(request.number) != 11 or not request.number.isdigit():
         raise HTTPException(status_code=400, detail="Number must have 11 digits")
 
-    services.add_phone(request.name, request.number)
+    result = services.add_phone(request.name, request.number)
+    if isinstance(result, dict) and "error" in result:
+        raise HTTPException(status_code=409, detail=result["error"])
     return {
         "message": "Phone number added successfully",
         "name": f"{request.name}",
@@ -38,15 +44,55 @@ def post_phone(
     }
 
 
+@router.post(
+    "/phone/bulk",
+    summary="Imports phone numbers in bulk",
+    description=f"Adds up to {CONTACT_IMPORT_MAX_ROWS} phone numbers in one request. "
+    "Send a JSON array of `{\"name\", \"number\"}` objects, or a CSV file with a `name,number` header and `Content-Type: text/csv`. "
+    "Numbers repeated in the request or already registered are skipped, and rows without a name or an 11-digit number are rejected. "
+    "The response reports how many numbers were `inserted` and `skipped`, and the index of every `rejected` row.",
+)
+async def post_phone_bulk(
+    request: Request,
+    services: PhoneService = Depends(get_phone_service),
+    credentials: HTTPAuthorizationCredentials = Depends(auth.verify_token),
+):
+    try:
+        contacts = parse_contacts(
+            await request.body(), request.headers.get("content-type", ""), "number"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(contacts) > CONTACT_IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"The import must not exceed {CONTACT_IMPORT_MAX_ROWS} rows.",
+        )
+    return await run_in_threadpool(services.import_phones, contacts)
+
+
 @router.get(
     "/phone",
     response_model=List[Phone],
     summary="Retrieves all registered phone numbers",
-    description="This endpoint retrieves all phone numbers registered in the system.",
+    description="This endpoint retrieves all phone numbers registered in the system.\n\n"
+    "Results are paginated: at most `limit` records are returned and, when more exist, "
+    "the `X-Next-Cursor` response header holds the `cursor` for the next page.",
 )
 def get_phones(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     services=Depends(get_phone_service),
     credentials: HTTPAuthorizationCredentials = Depends(auth.verify_token),
 ):
     
-    return services.get_all_phones()
+    try:
+        after = parse_id_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+    page = services.get_all_phones(limit, after)
+    if page.next_cursor is not None:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return page
@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 from app.api import (
     admin_controller,
+    device_controller,
     email_controller,
     level_controller,
     phone_controller,
@@ -14,6 +15,7 @@ router.include_router(root_contoller.router)
 
 router.include_router(temp_humi_controller.router, tags=["Temp-Humi"])
 router.include_router(level_controller.router, tags=["Level"])
+router.include_router(device_controller.router, tags=["Device"])
 router.include_router(phone_controller.router, tags=["Phone"])
 router.include_router(email_controller.router, tags=["Email"])
 router.include_router(admin_controller.router, tags=["Admin"])
@@ -0,0 +1,25 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ALERT_LEVEL_LOW = float(os.getenv("ALERT_LEVEL_LOW", 20))
+ALERT_LEVEL_CLEAR = float(os.getenv("ALERT_LEVEL_CLEAR", 30))
+ALERT_WORKERS = int(os.getenv("ALERT_WORKERS", 2))
+ALERT_QUEUE_SIZE = int(os.getenv("ALERT_QUEUE_SIZE", 1000))
+ALERT_BATCH_SIZE = int(os.getenv("ALERT_BATCH_SIZE", 20))
+ALERT_BATCH_WINDOW = float(os.getenv("ALERT_BATCH_WINDOW", 2.0))
+ALERT_RATE_LIMIT = float(os.getenv("ALERT_RATE_LIMIT", 3600))
+ALERT_MAX_RETRIES = int(os.getenv("ALERT_MAX_RETRIES", 3))
+ALERT_RETRY_DELAY = float(os.getenv("ALERT_RETRY_DELAY", 2.0))
+ALERT_SEND_TIMEOUT = float(os.getenv("ALERT_SEND_TIMEOUT", 10.0))
+
+SMTP_HOST = os.getenv("SMTP_HOST")
+SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
+SMTP_USER = os.getenv("SMTP_USER")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+SMTP_FROM = os.getenv("SMTP_FROM", SMTP_USER or "peat-data@localhost")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() in ("1", "true", "yes")
+
+SMS_WEBHOOK_URL = os.getenv("SMS_WEBHOOK_URL")
+SMS_WEBHOOK_TOKEN = os.getenv("SMS_WEBHOOK_TOKEN")
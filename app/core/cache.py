@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CACHE_MAX_SIZE = int(os.getenv("CACHE_MAX_SIZE", 256))
+CACHE_TTL = float(os.getenv("CACHE_TTL", 60))
+CACHE_MAX_ITEMS = int(os.getenv("CACHE_MAX_ITEMS", 5000))
+
+_MISSING = object()
+
+
+def _size(value) -> int:
+    if isinstance(value, dict):
+        return max((len(column) for column in value.values()), default=0)
+    if isinstance(value, list):
+        return len(value)
+    return 1
+
+
+class ResultCache:
+    def __init__(
+        self,
+        max_size: int = CACHE_MAX_SIZE,
+        ttl: float = CACHE_TTL,
+        max_items: int = CACHE_MAX_ITEMS,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_items = max_items
+        self.generation = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key: Hashable):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                generation, expires_at, value = entry
+                if generation == self.generation and expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return value
+                del self._entries[key]
+            self._stats["misses"] += 1
+            return _MISSING
+
+    def set(self, key: Hashable, generation: int, value):
+        if self.max_size <= 0 or _size(value) > self.max_items:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (generation, time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable):
+        value = self.get(key)
+        if value is not _MISSING:
+            return value
+        generation = self.generation
+        value = compute()
+        self.set(key, generation, value)
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._stats["invalidations"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+            stats["generation"] = self.generation
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+
+device_cache = ResultCache()
+level_cache = ResultCache()
+sensor_data_cache = ResultCache()
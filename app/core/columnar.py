@@ -0,0 +1,28 @@
+import json
+from typing import Any, Iterable, List, Sequence
+
+from fastapi.responses import JSONResponse
+
+from app.model.db_models.types import to_epoch_millis
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def to_columns(rows: Iterable[Sequence], fields: List[str]) -> dict:
+    timestamps = []
+    values = [[] for _ in fields]
+    for row in rows:
+        timestamps.append(to_epoch_millis(row[0]))
+        for column, value in zip(values, row[1:]):
+            column.append(value)
+    return {"ts": timestamps, **dict(zip(fields, values))}
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(content, separators=(",", ":")).encode()
@@ -1,8 +1,21 @@
+BATCH_MAX_READINGS = 1000
 COMEDOURO_ID = 1
 COMEDOURO_CAPACITY = 25
+CONTACT_IMPORT_MAX_ROWS = 10000
+DELETE_BATCH_SIZE = 5000
 DISTANCE_FULL = 2
 DOCUMENT_EMAIL = "email"
 DOCUMENT_PHONE = "phone"
+EXPORT_CHUNK_SIZE = 1000
+GENERATE_CHUNK_SIZE = 50000
+GENERATE_DAYS = 31
+GENERATE_INTERVAL = 43200
+GENERATE_MAX_ROWS = 10000000
+HISTORY_PAGE_SIZE = 5000
+INSERT_CHUNK_SIZE = 500
+MAX_CLOCK_SKEW = 300
+MAX_PAGE_SIZE = 1000
+PAGE_SIZE = 100
 TAGS = [
     {
         "name": "Level",
@@ -12,6 +25,10 @@ TAGS = [
         "name": "Temp-Humi",
         "description": "Routes related to temperature and humidity.",
     },
+    {
+        "name": "Device",
+        "description": "Routes related to the registered feeders.",
+    },
     {
         "name": "Email",
         "description": "Routes related to emails.",
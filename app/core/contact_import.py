@@ -0,0 +1,42 @@
+import csv
+import io
+import json
+from typing import List
+
+
+def parse_contacts(body: bytes, content_type: str, field: str) -> List[dict]:
+    if content_type.split(";")[0].strip().lower() == "text/csv":
+        rows = _read_csv(body, field)
+    else:
+        rows = _read_json(body)
+
+    contacts = []
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            raise ValueError(f"Row {index} must be an object.")
+        name, value = row.get("name"), row.get(field)
+        if not isinstance(name, str) or not isinstance(value, str):
+            raise ValueError(f"Row {index} must have string 'name' and '{field}'.")
+        contacts.append({"name": name.strip(), field: value.strip()})
+    return contacts
+
+
+def _read_json(body: bytes) -> list:
+    try:
+        rows = json.loads(body)
+    except ValueError:
+        raise ValueError("Body is not valid JSON.")
+    if not isinstance(rows, list):
+        raise ValueError("Body must be a JSON array.")
+    return rows
+
+
+def _read_csv(body: bytes, field: str) -> list:
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValueError("CSV must be UTF-8 encoded.")
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames or not {"name", field} <= set(reader.fieldnames):
+        raise ValueError(f"CSV header must contain 'name' and '{field}'.")
+    return list(reader)
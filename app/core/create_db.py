@@ -21,17 +21,15 @@ email2 = Email(
     id=uuid.uuid4(), name="maria.oliveira", email="maria.oliveira@example.com"
 )
 
-level1 = Level(id=uuid.uuid4(), date=datetime(2023, 10, 26, 10, 0, 0), level=10.5)
-level2 = Level(id=uuid.uuid4(), date=datetime(2023, 10, 26, 11, 0, 0), level=11.2)
+level1 = Level(date=datetime(2023, 10, 26, 10, 0, 0), level=10.5)
+level2 = Level(date=datetime(2023, 10, 26, 11, 0, 0), level=11.2)
 
 sensor_data1 = SensorData(
-    id=uuid.uuid4(),
     date=datetime(2023, 10, 26, 10, 0, 0),
     temperature=25.0,
     humidity=60.0,
 )
 sensor_data2 = SensorData(
-    id=uuid.uuid4(),
     date=datetime(2023, 10, 26, 11, 0, 0),
     temperature=26.5,
     humidity=65.0,
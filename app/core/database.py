@@ -1,14 +1,72 @@
-from sqlalchemy import create_engine
+import os
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.metrics import DB_BUCKETS, Histogram
+from app.core.sql_profiler import profile_engine
+from app.core.storage_profile import apply_pragmas, get_pool_options, get_pragmas
 
 DATABASE_URL = f"sqlite:///./peat_data.db"
+ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///./peat_data.db"
+DB_SCHEMA = os.getenv("DB_SCHEMA", "legacy")
 
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **get_pool_options())
+apply_pragmas(engine, get_pragmas())
+profile_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **get_pool_options())
+apply_pragmas(async_engine.sync_engine, get_pragmas())
+profile_engine(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(
+    autoflush=False, expire_on_commit=False, bind=async_engine
+)
+
 Base = declarative_base()
 
+db_session_open = Histogram(
+    "db_session_open_seconds",
+    "Time from the start of a session transaction until its connection is ready.",
+    buckets=DB_BUCKETS,
+)
+db_commit = Histogram(
+    "db_commit_seconds", "Duration of session commits.", buckets=DB_BUCKETS
+)
+
+
+@event.listens_for(Session, "after_transaction_create")
+def _transaction_created(session, transaction):
+    if transaction.parent is None:
+        session.info["transaction_started"] = time.perf_counter()
+
+
+@event.listens_for(Session, "after_begin")
+def _transaction_began(session, transaction, connection):
+    started = session.info.pop("transaction_started", None)
+    if started is not None:
+        db_session_open.observe(time.perf_counter() - started)
+
+
+@event.listens_for(Session, "before_commit")
+def _commit_started(session):
+    session.info["commit_started"] = time.perf_counter()
+
+
+@event.listens_for(Session, "after_commit")
+def _commit_finished(session):
+    started = session.info.pop("commit_started", None)
+    if started is not None:
+        db_commit.observe(time.perf_counter() - started)
+
+
+def create_session_factory(profile: str = None, pool_options: dict = None):
+    bind = create_engine(DATABASE_URL, **(pool_options or get_pool_options()))
+    apply_pragmas(bind, get_pragmas(profile))
+    profile_engine(bind)
+    return sessionmaker(autocommit=False, autoflush=False, bind=bind)
+
 
 def get_db():
     db = SessionLocal()
@@ -0,0 +1,75 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEDUPE_MAX_SIZE = int(os.getenv("DEDUPE_MAX_SIZE", 100000))
+DEDUPE_WINDOW = float(os.getenv("DEDUPE_WINDOW", 3600))
+
+
+class ReadingDedupe:
+    def __init__(
+        self,
+        max_size: int = DEDUPE_MAX_SIZE,
+        window: float = DEDUPE_WINDOW,
+    ):
+        self.max_size = max_size
+        self.window = window
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"checked": 0, "duplicates": 0, "evictions": 0}
+
+    def seen(
+        self,
+        kind: str,
+        device_id: int,
+        values: Tuple[float, ...],
+        date: Optional[datetime],
+    ) -> bool:
+        # Readings without a device timestamp are stamped on arrival and have no
+        # identity to compare, so only timestamped readings are deduplicated.
+        if date is None:
+            return False
+        key = (kind, device_id, values, date)
+        with self._lock:
+            self._stats["checked"] += 1
+            expires_at = self._keys.get(key)
+            if expires_at is None:
+                return False
+            if expires_at <= time.monotonic():
+                del self._keys[key]
+                return False
+            self._stats["duplicates"] += 1
+            return True
+
+    def remember(
+        self,
+        kind: str,
+        device_id: int,
+        values: Tuple[float, ...],
+        date: Optional[datetime],
+    ):
+        if self.max_size <= 0 or date is None:
+            return
+        key = (kind, device_id, values, date)
+        with self._lock:
+            self._keys[key] = time.monotonic() + self.window
+            self._keys.move_to_end(key)
+            while len(self._keys) > self.max_size:
+                self._keys.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._keys)
+        return stats
+
+
+reading_dedupe = ReadingDedupe()
@@ -0,0 +1,45 @@
+from datetime import datetime
+from itertools import chain, islice
+from typing import Iterable, List, Sequence
+
+
+def minmax_downsample(
+    rows: Iterable[Sequence], start: datetime, end: datetime, max_points: int
+) -> List[Sequence]:
+    iterator = iter(rows)
+    head = list(islice(iterator, max_points + 1))
+    if len(head) <= max_points:
+        return head
+
+    series = len(head[0]) - 1
+    buckets = max(1, max_points // (2 * series))
+    bucket_span = (end - start) / buckets
+
+    selected = []
+    extremes = {}
+    bucket = None
+    for position, row in enumerate(chain(head, iterator)):
+        index = min(max(int((row[0] - start) / bucket_span), 0), buckets - 1)
+        if index != bucket:
+            selected.extend(_bucket_rows(extremes))
+            extremes = {}
+            bucket = index
+
+        for column in range(1, series + 1):
+            value = row[column]
+            if value is None:
+                continue
+            low = extremes.get((column, "min"))
+            if low is None or value < low[1][column]:
+                extremes[(column, "min")] = (position, row)
+            high = extremes.get((column, "max"))
+            if high is None or value > high[1][column]:
+                extremes[(column, "max")] = (position, row)
+
+    selected.extend(_bucket_rows(extremes))
+    return selected
+
+
+def _bucket_rows(extremes: dict) -> List[Sequence]:
+    unique = {position: row for position, row in extremes.values()}
+    return [unique[position] for position in sorted(unique)]
@@ -0,0 +1,66 @@
+import csv
+import heapq
+import io
+import json
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy.sql import Select
+
+from app.core.constants import EXPORT_CHUNK_SIZE
+from app.core.database import AsyncSessionLocal
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+EXPORT_DATE_FORMAT = "%d/%m/%Y %H:%M"
+
+
+def _ndjson_chunk(rows, fields: List[str]) -> str:
+    return "".join(
+        json.dumps(dict(zip(fields, (row[0].strftime(EXPORT_DATE_FORMAT), *row[1:]))))
+        + "\n"
+        for row in rows
+    )
+
+
+def _csv_chunk(rows, fields: List[str] = None) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if fields is not None:
+        writer.writerow(fields)
+    writer.writerows((row[0].strftime(EXPORT_DATE_FORMAT), *row[1:]) for row in rows)
+    return buffer.getvalue()
+
+
+def _merge_newer(rows: Sequence, pending: Sequence) -> Tuple[List[Sequence], Sequence]:
+    oldest = rows[-1][0]
+    split = 0
+    while split < len(pending) and pending[split][0] >= oldest:
+        split += 1
+    merged = heapq.merge(rows, pending[:split], key=lambda row: row[0], reverse=True)
+    return list(merged), pending[split:]
+
+
+async def stream_rows(
+    statement: Select,
+    fields: List[str],
+    export_format: str,
+    session_factory=AsyncSessionLocal,
+    rollups: Optional[Select] = None,
+) -> AsyncIterator[str]:
+    def render(rows) -> str:
+        if export_format == "csv":
+            return _csv_chunk(rows)
+        return _ndjson_chunk(rows, fields)
+
+    if export_format == "csv":
+        yield _csv_chunk([], fields)
+
+    async with session_factory() as db:
+        pending = [] if rollups is None else (await db.execute(rollups)).all()
+        result = await db.stream(
+            statement.execution_options(yield_per=EXPORT_CHUNK_SIZE)
+        )
+        async for rows in result.partitions():
+            rows, pending = _merge_newer(rows, pending)
+            yield render(rows)
+        if pending:
+            yield render(pending)
@@ -0,0 +1,70 @@
+import argparse
+import time
+
+from app.core.constants import (
+    COMEDOURO_CAPACITY,
+    DISTANCE_FULL,
+    GENERATE_DAYS,
+    GENERATE_INTERVAL,
+)
+from app.core.database import SessionLocal
+from app.core.migrations import run_migrations
+from app.service.device_service import DeviceService
+from app.service.level_service import LevelService
+from app.service.sensor_data_service import SensorDataService
+
+GENERATORS = {
+    "level": lambda db, args: LevelService(db).generate_level_data(
+        args.days, args.interval, args.devices, args.seed
+    ),
+    "sensor": lambda db, args: SensorDataService(db).generate_sensor_data(
+        args.days, args.interval, args.devices, args.seed
+    ),
+}
+
+
+def add_missing_devices(db, devices: int):
+    service = DeviceService(db)
+    registered = len(service.get_all_devices())
+    for number in range(registered + 1, devices + 1):
+        service.add_device(f"Feeder {number}", COMEDOURO_CAPACITY, DISTANCE_FULL)
+        print(f"Registered device 'Feeder {number}'.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Seed the database with synthetic level and sensor readings "
+        "for load and capacity testing."
+    )
+    parser.add_argument("--days", type=int, default=GENERATE_DAYS)
+    parser.add_argument(
+        "--interval",
+        type=int,
+        default=GENERATE_INTERVAL,
+        help="Seconds between readings of a device.",
+    )
+    parser.add_argument(
+        "--devices",
+        type=int,
+        default=1,
+        help="Number of feeders, missing ones are registered first.",
+    )
+    parser.add_argument(
+        "--kind", nargs="+", choices=list(GENERATORS), default=list(GENERATORS)
+    )
+    parser.add_argument("--seed", type=int, help="Seed for reproducible series.")
+    args = parser.parse_args()
+
+    run_migrations()
+    with SessionLocal() as db:
+        add_missing_devices(db, args.devices)
+        for kind in args.kind:
+            started = time.perf_counter()
+            result = GENERATORS[kind](db, args)
+            if isinstance(result, dict):
+                parser.error(result["error"])
+            elapsed = time.perf_counter() - started
+            print(
+                f"Generated {result} {kind} readings in {elapsed:.1f}s "
+                f"({result / elapsed:.0f} rows/s)."
+            )
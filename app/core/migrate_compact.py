@@ -0,0 +1,186 @@
+import argparse
+import logging
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.constants import COMEDOURO_ID
+from app.core.database import DB_SCHEMA, engine
+from app.model.db_models.types import to_epoch_millis
+
+logger = logging.getLogger(__name__)
+
+COMPACT_TABLES = {
+    "levels": ["level"],
+    "sensor_data": ["temperature", "humidity"],
+}
+COPY_BATCH_SIZE = 5000
+
+
+def is_compact(bind, table: str) -> bool:
+    return "ts" in {column["name"] for column in inspect(bind).get_columns(table)}
+
+
+def _create_staging_table(conn: Connection, table: str):
+    columns = ", ".join(f"{column} FLOAT" for column in COMPACT_TABLES[table])
+    conn.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {table}_compact "
+            f"(id INTEGER NOT NULL, device_id INTEGER NOT NULL DEFAULT {COMEDOURO_ID}, "
+            f"ts BIGINT NOT NULL, {columns}, PRIMARY KEY (id))"
+        )
+    )
+    conn.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS compact_migration "
+            "(table_name VARCHAR PRIMARY KEY, last_rowid INTEGER)"
+        )
+    )
+    conn.execute(
+        text(
+            "INSERT OR IGNORE INTO compact_migration (table_name, last_rowid) "
+            "VALUES (:table, 0)"
+        ),
+        {"table": table},
+    )
+
+
+def _create_staging_index(conn: Connection, table: str):
+    conn.execute(
+        text(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_device_ts "
+            f"ON {table}_compact (device_id, ts)"
+        )
+    )
+
+
+def _copy_batch(conn: Connection, table: str) -> int:
+    columns = ["device_id", *COMPACT_TABLES[table]]
+    last_rowid = conn.execute(
+        text("SELECT last_rowid FROM compact_migration WHERE table_name = :table"),
+        {"table": table},
+    ).scalar_one()
+
+    rows = conn.execute(
+        text(
+            f"SELECT rowid, date, {', '.join(columns)} FROM {table} "
+            "WHERE rowid > :last_rowid ORDER BY rowid LIMIT :limit"
+        ),
+        {"last_rowid": last_rowid, "limit": COPY_BATCH_SIZE},
+    ).all()
+    if not rows:
+        return 0
+
+    dated = [row for row in rows if row[1] is not None]
+    if len(dated) < len(rows):
+        logger.warning(
+            f"Skipped {len(rows) - len(dated)} {table} rows without a date, "
+            f"they are kept in {table}_legacy"
+        )
+    if dated:
+        conn.execute(
+            text(
+                f"INSERT INTO {table}_compact (ts, {', '.join(columns)}) "
+                f"VALUES (:ts, {', '.join(':' + column for column in columns)})"
+            ),
+            [
+                {
+                    "ts": to_epoch_millis(datetime.fromisoformat(row[1])),
+                    **dict(zip(columns, row[2:])),
+                }
+                for row in dated
+            ],
+        )
+    conn.execute(
+        text(
+            "UPDATE compact_migration SET last_rowid = :last_rowid "
+            "WHERE table_name = :table"
+        ),
+        {"last_rowid": rows[-1][0], "table": table},
+    )
+    return len(rows)
+
+
+def copy_table(bind: Engine, table: str) -> int:
+    with bind.begin() as conn:
+        _create_staging_table(conn, table)
+
+    copied = 0
+    while True:
+        with bind.begin() as conn:
+            count = _copy_batch(conn, table)
+        copied += count
+        if count < COPY_BATCH_SIZE:
+            break
+        logger.info(f"Copied {copied} rows from {table} into {table}_compact")
+
+    with bind.begin() as conn:
+        _create_staging_index(conn, table)
+    return copied
+
+
+def swap_table(bind: Engine, table: str):
+    with bind.begin() as conn:
+        _create_staging_table(conn, table)
+        while _copy_batch(conn, table):
+            pass
+        _create_staging_index(conn, table)
+        conn.execute(text(f"ALTER TABLE {table} RENAME TO {table}_legacy"))
+        conn.execute(text(f"ALTER TABLE {table}_compact RENAME TO {table}"))
+        conn.execute(
+            text("DELETE FROM compact_migration WHERE table_name = :table"),
+            {"table": table},
+        )
+    logger.info(f"Table {table} switched to the compact schema")
+
+
+def swap_compact_tables(bind: Engine):
+    if DB_SCHEMA != "compact":
+        return
+    inspector = inspect(bind)
+    for table in COMPACT_TABLES:
+        if inspector.has_table(table) and not is_compact(bind, table):
+            swap_table(bind, table)
+
+
+def drop_legacy_tables(bind: Engine):
+    with bind.begin() as conn:
+        for table in COMPACT_TABLES:
+            conn.execute(text(f"DROP TABLE IF EXISTS {table}_legacy"))
+
+
+if __name__ == "__main__":
+    from app.core.migrations import add_device_columns
+
+    parser = argparse.ArgumentParser(
+        description="Migrate levels and sensor_data to the compact schema "
+        "(integer rowid keys, UTC epoch-millisecond timestamps)."
+    )
+    parser.add_argument(
+        "--finalize",
+        action="store_true",
+        help="Copy the remaining rows and swap the tables. Run with the API stopped, "
+        "then start it with DB_SCHEMA=compact.",
+    )
+    parser.add_argument(
+        "--drop-legacy",
+        action="store_true",
+        help="Drop the *_legacy tables kept after the swap.",
+    )
+    args = parser.parse_args()
+
+    add_device_columns(engine)
+    for table in COMPACT_TABLES:
+        if is_compact(engine, table):
+            print(f"Table {table} already uses the compact schema.")
+        elif args.finalize:
+            swap_table(engine, table)
+            print(f"Table {table} switched to the compact schema.")
+        else:
+            copied = copy_table(engine, table)
+            print(f"Copied {copied} rows from {table} into {table}_compact.")
+
+    if args.drop_legacy:
+        drop_legacy_tables(engine)
+        print("Legacy tables dropped.")
@@ -0,0 +1,177 @@
+import logging
+import os
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.constants import COMEDOURO_ID
+from app.core.database import Base, engine
+from app.core.locks import FileLock
+from app.core.migrate_compact import swap_compact_tables
+from app.model.db_models import (  # noqa: F401
+    data_version,
+    device,
+    email,
+    level,
+    level_daily,
+    level_hourly,
+    phone,
+    sensor_daily,
+    sensor_data,
+    sensor_hourly,
+)
+from app.repository.device_repository import create_default_device
+from app.repository.level_daily_repository import rebuild_level_daily
+from app.repository.sensor_daily_repository import rebuild_sensor_daily
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_LOCK_FILE = os.getenv("MIGRATIONS_LOCK_FILE", "./migrations.lock")
+
+
+ROLLUPS = {
+    "level_daily": rebuild_level_daily,
+    "sensor_daily": rebuild_sensor_daily,
+}
+DEVICE_TABLES = ["levels", "sensor_data"]
+OBSOLETE_INDEXES = [
+    "ix_emails_email",
+    "ix_levels_date",
+    "ix_levels_device_date",
+    "ix_levels_device_ts",
+    "ix_levels_ts",
+    "ix_phones_number",
+    "ix_sensor_data_date",
+    "ix_sensor_data_device_date",
+    "ix_sensor_data_device_ts",
+    "ix_sensor_data_ts",
+]
+
+
+def _has_column(inspector, table: str, column: str) -> bool:
+    return column in {item["name"] for item in inspector.get_columns(table)}
+
+
+def add_device_columns(bind: Engine):
+    inspector = inspect(bind)
+    for table in DEVICE_TABLES:
+        if not inspector.has_table(table) or _has_column(inspector, table, "device_id"):
+            continue
+        logger.info(f"Adding device_id column to {table}")
+        with bind.begin() as conn:
+            conn.execute(
+                text(
+                    f"ALTER TABLE {table} ADD COLUMN device_id INTEGER NOT NULL "
+                    f"DEFAULT {COMEDOURO_ID}"
+                )
+            )
+
+
+def create_rollup_tables(bind: Engine):
+    inspector = inspect(bind)
+    stale = [
+        name
+        for name in ROLLUPS
+        if inspector.has_table(name) and not _has_column(inspector, name, "device_id")
+    ]
+    with bind.begin() as conn:
+        for name in stale:
+            logger.info(f"Dropping rollup table {name} to partition it by device")
+            conn.execute(text(f"DROP TABLE {name}"))
+
+    missing = [
+        name for name in ROLLUPS if name in stale or not inspector.has_table(name)
+    ]
+    if not missing:
+        return
+
+    Base.metadata.create_all(bind)
+    with Session(bind) as db:
+        for name in missing:
+            logger.info(f"Building rollup table {name}")
+            ROLLUPS[name](db)
+
+
+def create_missing_tables(bind: Engine):
+    Base.metadata.create_all(bind)
+
+
+def create_default_devices(bind: Engine):
+    with Session(bind) as db:
+        create_default_device(db)
+
+
+def remove_duplicate_rows(bind: Engine):
+    inspector = inspect(bind)
+    changed = set()
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if not index.unique or index.name in existing:
+                continue
+            columns = ", ".join(column.name for column in index.columns)
+            with bind.begin() as conn:
+                removed = conn.execute(
+                    text(
+                        f"DELETE FROM {table.name} WHERE rowid NOT IN "
+                        f"(SELECT min(rowid) FROM {table.name} GROUP BY {columns})"
+                    )
+                ).rowcount
+            if removed:
+                logger.info(f"Removed {removed} duplicate rows from {table.name}")
+                changed.add(table.name)
+
+    if changed & set(DEVICE_TABLES):
+        with Session(bind) as db:
+            for name, rebuild in ROLLUPS.items():
+                logger.info(f"Rebuilding rollup table {name}")
+                rebuild(db)
+
+
+def create_missing_indexes(bind: Engine):
+    inspector = inspect(bind)
+    created = False
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            logger.info(f"Creating index {index.name} on {table.name}")
+            index.create(bind)
+            created = True
+
+    if created:
+        with bind.begin() as conn:
+            conn.execute(text("ANALYZE"))
+
+
+def drop_obsolete_indexes(bind: Engine):
+    with bind.begin() as conn:
+        for name in OBSOLETE_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+MIGRATIONS = [
+    add_device_columns,
+    swap_compact_tables,
+    create_rollup_tables,
+    create_missing_tables,
+    create_default_devices,
+    remove_duplicate_rows,
+    create_missing_indexes,
+    drop_obsolete_indexes,
+]
+
+
+def run_migrations(bind: Engine = engine):
+    with FileLock(MIGRATIONS_LOCK_FILE):
+        for migration in MIGRATIONS:
+            migration(bind)
+
+
+if __name__ == "__main__":
+    run_migrations()
+    print("Migrations applied successfully!")
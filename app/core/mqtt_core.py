@@ -9,3 +9,22 @@ MQTT_USER = os.getenv("MQTT_USER")
 MQTT_PASSWORD = os.getenv("MQTT_PASSWORD")
 MQTT_TOPIC_SENSOR = os.getenv("MQTT_TOPIC_SENSOR")
 MQTT_TOPIC_LEVEL = os.getenv("MQTT_TOPIC_LEVEL")
+MQTT_CONSUMER = os.getenv("MQTT_CONSUMER", "api")
+MQTT_SHARED_GROUP = os.getenv("MQTT_SHARED_GROUP")
+MQTT_LOCK_FILE = os.getenv("MQTT_LOCK_FILE", "./mqtt.lock")
+MQTT_LEADER_RETRY = float(os.getenv("MQTT_LEADER_RETRY", 5.0))
+
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", 10000))
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", 500))
+INGEST_FLUSH_INTERVAL = float(os.getenv("INGEST_FLUSH_INTERVAL", 1.0))
+INGEST_PUT_TIMEOUT = float(os.getenv("INGEST_PUT_TIMEOUT", 5.0))
+INGEST_SPOOL_DIR = os.getenv("INGEST_SPOOL_DIR", "./spool")
+INGEST_SPOOL_SEGMENT_BYTES = int(os.getenv("INGEST_SPOOL_SEGMENT_BYTES", 16777216))
+INGEST_SPOOL_FSYNC_INTERVAL = float(os.getenv("INGEST_SPOOL_FSYNC_INTERVAL", 0.2))
+INGEST_SPOOL_RETRY_INTERVAL = float(os.getenv("INGEST_SPOOL_RETRY_INTERVAL", 1.0))
+
+
+def subscription_topic(topic: str) -> str:
+    if MQTT_SHARED_GROUP:
+        return f"$share/{MQTT_SHARED_GROUP}/{topic}"
+    return topic
@@ -0,0 +1,50 @@
+import base64
+import json
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+from uuid import UUID
+
+
+class Page(list):
+    def __init__(self, items: Iterable = (), next_cursor: Optional[str] = None):
+        super().__init__(items)
+        self.next_cursor = next_cursor
+
+
+class ColumnPage(dict):
+    def __init__(self, columns: dict, next_cursor: Optional[str] = None):
+        super().__init__(columns)
+        self.next_cursor = next_cursor
+
+
+def encode_cursor(*values) -> str:
+    payload = json.dumps(
+        [
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in values
+        ],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *parsers) -> tuple:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError(cursor)
+        return tuple(parse(value) for parse, value in zip(parsers, values))
+    except (TypeError, ValueError) as error:
+        raise ValueError(f"Invalid cursor '{cursor}'") from error
+
+
+def parse_time_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    if cursor is None:
+        return None
+    return decode_cursor(cursor, datetime.fromisoformat, int)
+
+
+def parse_id_cursor(cursor: Optional[str]) -> Optional[UUID]:
+    if cursor is None:
+        return None
+    return decode_cursor(cursor, UUID)[0]
@@ -0,0 +1,26 @@
+import os
+
+from dotenv import load_dotenv
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+load_dotenv()
+
+API_READ_ONLY = os.getenv("API_READ_ONLY", "false").lower() in ("1", "true", "yes")
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class ReadOnlyMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and scope["method"] not in SAFE_METHODS:
+            response = JSONResponse(
+                {"detail": "This API instance is read-only"},
+                status_code=405,
+                headers={"Allow": ", ".join(SAFE_METHODS)},
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
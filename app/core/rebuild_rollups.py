@@ -0,0 +1,12 @@
+from sqlalchemy.orm import Session
+
+from app.core.database import engine
+from app.core.migrations import ROLLUPS, run_migrations
+
+if __name__ == "__main__":
+    run_migrations()
+
+    with Session(engine) as session:
+        for name, rebuild in ROLLUPS.items():
+            rebuild(session)
+            print(f"Rollup table {name} rebuilt successfully!")
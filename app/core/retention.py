@@ -0,0 +1,159 @@
+import argparse
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from app.core.database import SessionLocal
+from app.core.locks import FileLock
+from app.repository.maintenance_repository import enable_incremental_vacuum
+from app.service.retention_service import RetentionService
+
+load_dotenv()
+
+RETENTION_RAW_DAYS = int(os.getenv("RETENTION_RAW_DAYS", 0))
+RETENTION_HOURLY_DAYS = int(os.getenv("RETENTION_HOURLY_DAYS", 365))
+RETENTION_INTERVAL = float(os.getenv("RETENTION_INTERVAL", 3600))
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", 2000))
+RETENTION_BATCH_PAUSE = float(os.getenv("RETENTION_BATCH_PAUSE", 0.05))
+RETENTION_VACUUM_PAGES = int(os.getenv("RETENTION_VACUUM_PAGES", 1000))
+RETENTION_LOCK_FILE = os.getenv("RETENTION_LOCK_FILE", "./retention.lock")
+
+logger = logging.getLogger(__name__)
+
+
+class RetentionJob:
+    def __init__(
+        self,
+        raw_days: int,
+        hourly_days: int,
+        interval: float,
+        batch_size: int,
+        pause: float,
+        vacuum_pages: int,
+        lock_file: str,
+    ):
+        self.raw_days = raw_days
+        self.hourly_days = hourly_days
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pause = pause
+        self.vacuum_pages = vacuum_pages
+        self.lock = FileLock(lock_file)
+        self.runs = 0
+        self.skipped = 0
+        self.failures = 0
+        self.last_run: Optional[dict] = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.raw_days > 0
+
+    def start(self):
+        if not self.enabled or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="retention", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def trigger(self) -> bool:
+        if self._thread is None:
+            return False
+        self._wake.set()
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "raw_days": self.raw_days,
+            "hourly_days": self.hourly_days,
+            "interval": self.interval,
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "failures": self.failures,
+            "last_run": self.last_run,
+        }
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._run_safely()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def _run_safely(self):
+        try:
+            self.run_once()
+        except Exception as e:
+            self.failures += 1
+            logger.warning(f"Retention run failed: {e}")
+
+    def run_once(self) -> Optional[dict]:
+        if not self.lock.acquire(blocking=False):
+            self.skipped += 1
+            return None
+        try:
+            with SessionLocal() as db:
+                result = RetentionService(db).apply(
+                    self.raw_days,
+                    self.hourly_days,
+                    self.batch_size,
+                    self.pause,
+                    self.vacuum_pages,
+                )
+        finally:
+            self.lock.release()
+        self.runs += 1
+        self.last_run = {"finished_at": time.time(), **result}
+        logger.info(f"Retention run finished: {result}")
+        return result
+
+
+retention_job = RetentionJob(
+    RETENTION_RAW_DAYS,
+    RETENTION_HOURLY_DAYS,
+    RETENTION_INTERVAL,
+    RETENTION_BATCH_SIZE,
+    RETENTION_BATCH_PAUSE,
+    RETENTION_VACUUM_PAGES,
+    RETENTION_LOCK_FILE,
+)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compact raw readings older than the retention window into "
+        "hourly rollups and purge expired rollups."
+    )
+    parser.add_argument("--raw-days", type=int, default=RETENTION_RAW_DAYS or 30)
+    parser.add_argument("--hourly-days", type=int, default=RETENTION_HOURLY_DAYS)
+    parser.add_argument(
+        "--enable-incremental-vacuum",
+        action="store_true",
+        help="Switch the database to incremental auto-vacuum (runs a full VACUUM once).",
+    )
+    args = parser.parse_args()
+
+    if args.enable_incremental_vacuum:
+        with SessionLocal() as db:
+            enable_incremental_vacuum(db)
+        print("Incremental auto-vacuum enabled.")
+
+    retention_job.raw_days = args.raw_days
+    retention_job.hourly_days = args.hourly_days
+    result = retention_job.run_once()
+    if result is None:
+        parser.exit(1, "Another retention run holds the lock.\n")
+    print(result)
@@ -0,0 +1,153 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import List
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SQL_PROFILE = os.getenv("SQL_PROFILE", "false").lower() in ("1", "true", "yes")
+SQL_SLOW_MS = float(os.getenv("SQL_SLOW_MS", 100))
+SQL_PROFILE_MAX_STATEMENTS = int(os.getenv("SQL_PROFILE_MAX_STATEMENTS", 500))
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")
+
+
+def _find_caller() -> str:
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(APP_DIR) and filename != __file__:
+            module = os.path.splitext(os.path.basename(filename))[0]
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+def _is_full_scan(detail: str) -> bool:
+    return detail.startswith("SCAN ") and " USING " not in detail
+
+
+class SqlProfiler:
+    def __init__(
+        self,
+        slow_ms: float = SQL_SLOW_MS,
+        max_statements: int = SQL_PROFILE_MAX_STATEMENTS,
+    ):
+        self.slow_ms = slow_ms
+        self.max_statements = max_statements
+        self._statements = OrderedDict()
+        self._lock = threading.Lock()
+        self._engines = []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._engines)
+
+    def attach(self, engine: Engine):
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "after_cursor_execute", self._after_execute)
+        self._engines.append(engine)
+
+    def detach(self):
+        for engine in self._engines:
+            event.remove(engine, "before_cursor_execute", self._before_execute)
+            event.remove(engine, "after_cursor_execute", self._after_execute)
+        self._engines = []
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+
+    def _before_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        context._profile_started = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - context._profile_started) * 1000
+        caller = _find_caller()
+        key = (caller, statement)
+
+        with self._lock:
+            entry = self._statements.get(key)
+            if entry is None:
+                entry = self._statements[key] = {
+                    "caller": caller,
+                    "statement": statement,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "slow": 0,
+                    "plan": None,
+                }
+                while len(self._statements) > self.max_statements:
+                    self._statements.popitem(last=False)
+            self._statements.move_to_end(key)
+            entry["count"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            if elapsed_ms < self.slow_ms:
+                return
+            entry["slow"] += 1
+            needs_plan = entry["plan"] is None
+
+        if needs_plan:
+            plan = self._explain(conn, statement, parameters, executemany)
+            with self._lock:
+                entry["plan"] = plan
+        logger.warning(f"Slow query ({elapsed_ms:.1f} ms) in {caller}: {statement}")
+
+    def _explain(self, conn, statement, parameters, executemany) -> List[str]:
+        if not statement.lstrip().upper().startswith(EXPLAINABLE):
+            return []
+        if executemany:
+            parameters = parameters[0] if parameters else ()
+        try:
+            cursor = conn.connection.cursor()
+            try:
+                cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+                return [row[3] for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+        except Exception as e:
+            logger.debug(f"Could not explain slow query in {statement}: {e}")
+            return []
+
+    def top(self, limit: int = 20, order_by: str = "max_ms") -> List[dict]:
+        with self._lock:
+            entries = [dict(entry) for entry in self._statements.values()]
+        entries.sort(key=lambda entry: entry[order_by], reverse=True)
+        result = []
+        for entry in entries[:limit]:
+            entry["avg_ms"] = round(entry["total_ms"] / entry["count"], 3)
+            entry["total_ms"] = round(entry["total_ms"], 3)
+            entry["max_ms"] = round(entry["max_ms"], 3)
+            entry["full_scan"] = any(_is_full_scan(d) for d in entry["plan"] or [])
+            result.append(entry)
+        return result
+
+    def stats(self, limit: int = 20, order_by: str = "max_ms") -> dict:
+        return {
+            "enabled": self.enabled,
+            "slow_ms": self.slow_ms,
+            "statements": len(self._statements),
+            "queries": self.top(limit, order_by),
+        }
+
+
+sql_profiler = SqlProfiler()
+
+
+def profile_engine(engine: Engine):
+    if SQL_PROFILE:
+        sql_profiler.attach(engine)
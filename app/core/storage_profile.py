@@ -0,0 +1,74 @@
+import os
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+load_dotenv()
+
+STORAGE_PROFILES = {
+    "default": {},
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -20000,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+    },
+    "wal-durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 10000,
+        "cache_size": -20000,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+    },
+}
+
+PRAGMA_ORDER = [
+    "busy_timeout",
+    "journal_mode",
+    "synchronous",
+    "cache_size",
+    "mmap_size",
+    "temp_store",
+]
+
+DB_PROFILE = os.getenv("DB_PROFILE", "wal")
+
+
+def get_pragmas(profile: str = None) -> dict:
+    profile = profile or DB_PROFILE
+    if profile not in STORAGE_PROFILES:
+        raise ValueError(
+            f"Unknown DB_PROFILE '{profile}'. Available: {', '.join(STORAGE_PROFILES)}"
+        )
+
+    pragmas = dict(STORAGE_PROFILES[profile])
+    for name in PRAGMA_ORDER:
+        value = os.getenv(f"SQLITE_{name.upper()}")
+        if value:
+            pragmas[name] = value
+    return pragmas
+
+
+def get_pool_options() -> dict:
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", 30)),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", -1)),
+    }
+
+
+def apply_pragmas(engine: Engine, pragmas: dict):
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name in PRAGMA_ORDER:
+            if name in pragmas:
+                cursor.execute(f"PRAGMA {name}={pragmas[name]}")
+        cursor.close()
@@ -0,0 +1,161 @@
+import math
+import random
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Iterator, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SECONDS_PER_DAY = 86400
+SECONDS_PER_HOUR = 3600
+TEMP_MEAN = 27.0
+TEMP_AMPLITUDE = 5.0
+TEMP_PEAK_HOUR = 15
+HUMI_MEAN = 65.0
+HUMI_PER_DEGREE = -2.5
+LEVEL_DRAIN_PER_HOUR = 3.5
+LEVEL_REFILL_HOUR = 7
+
+
+def sample_count(days: int, interval: float) -> int:
+    return int(days * SECONDS_PER_DAY // interval)
+
+
+def _hours(start: datetime, interval: float, index):
+    offset = start.hour + start.minute / 60 + start.second / SECONDS_PER_HOUR
+    return offset + index * interval / SECONDS_PER_HOUR
+
+
+def _diurnal(hours, peak_hour: float, sin=math.sin):
+    return sin(2 * math.pi * (hours - peak_hour + 6) / 24)
+
+
+def _rows(
+    device_id: int,
+    start: datetime,
+    interval: float,
+    names: List[str],
+    columns: list,
+    chunk_size: int,
+) -> Iterator[dict]:
+    count = len(columns[0])
+    step = np.timedelta64(int(interval * 1_000_000), "us")
+    origin = np.datetime64(start, "us")
+    for offset in range(0, count, chunk_size):
+        end = min(offset + chunk_size, count)
+        dates = (origin + np.arange(offset, end) * step).tolist()
+        values = [column[offset:end].tolist() for column in columns]
+        for date, *row in zip(dates, *values):
+            yield {"device_id": device_id, "date": date, **dict(zip(names, row))}
+
+
+def _chunks(rows: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def _sensor_rows_numpy(device_id, start, interval, count, chunk_size, seed):
+    rng = np.random.default_rng(seed)
+    hours = _hours(start, interval, np.arange(count))
+    days = (hours // 24).astype(int)
+    drift = np.clip(np.cumsum(rng.normal(0, 0.7, days[-1] + 1)), -4, 4)
+    swing = TEMP_AMPLITUDE * _diurnal(hours % 24, TEMP_PEAK_HOUR, np.sin)
+    temperature = TEMP_MEAN + drift[days] + swing + rng.normal(0, 0.3, count)
+    humidity = HUMI_MEAN + HUMI_PER_DEGREE * swing + rng.normal(0, 2.0, count)
+    return _rows(
+        device_id,
+        start,
+        interval,
+        ["temperature", "humidity"],
+        [np.round(temperature, 1), np.round(np.clip(humidity, 10.0, 98.0), 1)],
+        chunk_size,
+    )
+
+
+def _sensor_rows_python(device_id, start, interval, count, seed):
+    rng = random.Random(seed)
+    drift, day = 0.0, None
+    for index in range(count):
+        hours = _hours(start, interval, index)
+        if hours // 24 != day:
+            day = hours // 24
+            drift = min(max(drift + rng.gauss(0, 0.7), -4), 4)
+        swing = TEMP_AMPLITUDE * _diurnal(hours % 24, TEMP_PEAK_HOUR)
+        temperature = TEMP_MEAN + drift + swing + rng.gauss(0, 0.3)
+        humidity = HUMI_MEAN + HUMI_PER_DEGREE * swing + rng.gauss(0, 2.0)
+        yield {
+            "device_id": device_id,
+            "date": start + timedelta(seconds=interval * index),
+            "temperature": round(temperature, 1),
+            "humidity": round(min(max(humidity, 10.0), 98.0), 1),
+        }
+
+
+def _level_rows_numpy(device_id, start, interval, count, chunk_size, seed):
+    rng = np.random.default_rng(seed)
+    hours = _hours(start, interval, np.arange(count))
+    appetite = 1 + 0.8 * _diurnal(hours % 24, 12, np.sin)
+    rate = LEVEL_DRAIN_PER_HOUR * rng.uniform(0.7, 1.3)
+    drain = appetite * rate * interval / SECONDS_PER_HOUR * rng.uniform(0.5, 1.5, count)
+    eaten = np.cumsum(drain)
+    refills = (hours - LEVEL_REFILL_HOUR) // 24
+    _, first, cycle = np.unique(refills, return_index=True, return_inverse=True)
+    consumed = eaten - (eaten - drain)[first][cycle]
+    level = np.round(np.clip(100 - consumed, 0, 100))
+    return _rows(device_id, start, interval, ["level"], [level], chunk_size)
+
+
+def _level_rows_python(device_id, start, interval, count, seed):
+    rng = random.Random(seed)
+    rate = LEVEL_DRAIN_PER_HOUR * rng.uniform(0.7, 1.3)
+    consumed, refill = 0.0, None
+    for index in range(count):
+        hours = _hours(start, interval, index)
+        appetite = 1 + 0.8 * _diurnal(hours % 24, 12)
+        drain = appetite * rate * interval / SECONDS_PER_HOUR * rng.uniform(0.5, 1.5)
+        if (hours - LEVEL_REFILL_HOUR) // 24 != refill:
+            refill = (hours - LEVEL_REFILL_HOUR) // 24
+            consumed = 0.0
+        consumed += drain
+        yield {
+            "device_id": device_id,
+            "date": start + timedelta(seconds=interval * index),
+            "level": float(round(min(max(100 - consumed, 0), 100))),
+        }
+
+
+def sensor_data_chunks(
+    device_id: int,
+    start: datetime,
+    interval: float,
+    count: int,
+    chunk_size: int,
+    seed: Optional[int] = None,
+) -> Iterator[List[dict]]:
+    if count <= 0:
+        return iter(())
+    if np is not None:
+        rows = _sensor_rows_numpy(device_id, start, interval, count, chunk_size, seed)
+    else:
+        rows = _sensor_rows_python(device_id, start, interval, count, seed)
+    return _chunks(rows, chunk_size)
+
+
+def level_chunks(
+    device_id: int,
+    start: datetime,
+    interval: float,
+    count: int,
+    chunk_size: int,
+    seed: Optional[int] = None,
+) -> Iterator[List[dict]]:
+    if count <= 0:
+        return iter(())
+    if np is not None:
+        rows = _level_rows_numpy(device_id, start, interval, count, chunk_size, seed)
+    else:
+        rows = _level_rows_python(device_id, start, interval, count, seed)
+    return _chunks(rows, chunk_size)
@@ -1,20 +1,52 @@
+import math
 import random
+from datetime import date, datetime, time, timedelta
+from typing import Optional, Tuple
 import pytz
-from app.core.constants import DISTANCE_FULL, COMEDOURO_CAPACITY
+from app.core.constants import MAX_CLOCK_SKEW
 
 fortaleza_tz = pytz.timezone("America/Fortaleza")
 SIMPLE_NAMES = ["Ana", "Maria", "Jose", "Joao", "Pedro", "Sofia", "Lucas", "Isabela"]
 DOMAINS = ["gmail.com", "hotmail.com", "yahoo.com", "outlook.com"]
 
 
-def calculate_comedouro_level(level: float) -> float:
-    if level < DISTANCE_FULL:
+def calculate_comedouro_level(
+    level: float, capacity: float, distance_full: float
+) -> float:
+    if level < distance_full:
         return 100
-    if level > COMEDOURO_CAPACITY:
+    if level > capacity:
         return 0
-    return round(
-        100 - ((level - DISTANCE_FULL) / (COMEDOURO_CAPACITY - DISTANCE_FULL) * 100)
-    )
+    return round(100 - ((level - distance_full) / (capacity - distance_full) * 100))
+
+
+def local_now() -> datetime:
+    return datetime.now(fortaleza_tz).replace(tzinfo=None)
+
+
+def to_local(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(fortaleza_tz).replace(tzinfo=None)
+
+
+def to_millis(value: datetime) -> datetime:
+    return value.replace(microsecond=value.microsecond // 1000 * 1000)
+
+
+def day_range(day: date) -> Tuple[datetime, datetime]:
+    start = datetime.combine(day, time.min)
+    return start, start + timedelta(days=1)
+
+
+def reading_error(
+    values: Tuple[float, ...], date: Optional[datetime], now: datetime
+) -> Optional[str]:
+    if not all(math.isfinite(value) for value in values):
+        return "Reading values must be finite numbers."
+    if date is not None and date > now + timedelta(seconds=MAX_CLOCK_SKEW):
+        return "Reading timestamp is in the future."
+    return None
 
 
 def generate_random_name() -> str:
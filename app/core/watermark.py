@@ -0,0 +1,136 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+from fastapi import Request
+from sqlalchemy.orm import Session
+
+from app.core.cache import ResultCache, device_cache, level_cache, sensor_data_cache
+from app.core.database import SessionLocal
+from app.core.utils import fortaleza_tz
+from app.repository.data_version_repository import get_data_versions
+
+load_dotenv()
+
+WATERMARK_SYNC_INTERVAL = float(os.getenv("WATERMARK_SYNC_INTERVAL", 1.0))
+
+logger = logging.getLogger(__name__)
+
+
+class Watermark:
+    def __init__(self, table: str, cache: Optional[ResultCache] = None):
+        self.table = table
+        self.cache = cache
+        self.version = 0
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        self._lock = threading.Lock()
+
+    def advance(
+        self, version: Optional[int] = None, modified_at: Optional[float] = None
+    ):
+        with self._lock:
+            if version is None:
+                version = self.version + 1
+            elif version <= self.version:
+                return
+            self.version = version
+            self.last_modified = datetime.fromtimestamp(
+                modified_at or time.time(), timezone.utc
+            ).replace(microsecond=0)
+        if self.cache is not None:
+            self.cache.invalidate()
+
+    def validators(
+        self, params: tuple, since: Optional[datetime] = None
+    ) -> Tuple[str, datetime]:
+        with self._lock:
+            version, last_modified = self.version, self.last_modified
+        if since is not None:
+            since = fortaleza_tz.localize(since).astimezone(timezone.utc)
+            last_modified = max(last_modified, since)
+        digest = hashlib.blake2b(
+            repr((self.table, version, params, since)).encode(),
+            digest_size=12,
+        ).hexdigest()
+        return f'W/"{digest}"', last_modified
+
+
+def cache_headers(etag: str, last_modified: datetime) -> Dict[str, str]:
+    return {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        "Cache-Control": "private, no-cache",
+    }
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag.removeprefix("W/") in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified <= since
+
+
+def sync_watermarks(db: Session):
+    for table, (version, modified_at) in get_data_versions(db).items():
+        watermark = WATERMARKS.get(table)
+        if watermark is not None:
+            watermark.advance(version, modified_at)
+
+
+class WatermarkSync:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._sync()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="watermark-sync", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sync()
+
+    def _sync(self):
+        try:
+            with SessionLocal() as db:
+                sync_watermarks(db)
+        except Exception as e:
+            logger.warning(f"Watermark sync failed: {e}")
+
+
+device_watermark = Watermark("devices", device_cache)
+level_watermark = Watermark("levels", level_cache)
+sensor_data_watermark = Watermark("sensor_data", sensor_data_cache)
+WATERMARKS = {
+    watermark.table: watermark
+    for watermark in (device_watermark, level_watermark, sensor_data_watermark)
+}
+watermark_sync = WatermarkSync(WATERMARK_SYNC_INTERVAL)
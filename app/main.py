@@ -1,8 +1,16 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.alerts.dispatcher import alert_dispatcher
 from app.api.routes import router
-from app.mqtt.mqtt_listener import start_mqtt_listener
+from app.mqtt.mqtt_listener import start_mqtt_listener, stop_mqtt_listener
+from app.core.compression import CompressionMiddleware
 from app.core.constants import TAGS
+from app.core.metrics import MetricsMiddleware
+from app.core.migrations import run_migrations
+from app.core.mqtt_core import MQTT_CONSUMER
+from app.core.read_only import API_READ_ONLY, ReadOnlyMiddleware
+from app.core.retention import retention_job
+from app.core.watermark import watermark_sync
 
 
 app = FastAPI(
@@ -20,6 +28,9 @@ app = FastAPI(
     },
 )
 
+if API_READ_ONLY:
+    app.add_middleware(ReadOnlyMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -28,9 +39,30 @@ app.add_middleware(
     allow_headers=["Content-Type", "Authorization"],
 )
 
+app.add_middleware(CompressionMiddleware)
+
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(router)
 
+consume_mqtt = MQTT_CONSUMER == "api" and not API_READ_ONLY
+
 
 @app.on_event("startup")
 def startup_event():
-    start_mqtt_listener()
+    if not API_READ_ONLY:
+        run_migrations()
+        retention_job.start()
+        alert_dispatcher.start()
+    watermark_sync.start()
+    if consume_mqtt:
+        start_mqtt_listener()
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    if consume_mqtt:
+        stop_mqtt_listener()
+    watermark_sync.stop()
+    retention_job.stop()
+    alert_dispatcher.stop(timeout=10)
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Float, Integer, String
+from app.core.database import Base
+
+
+class DataVersion(Base):
+    __tablename__ = "data_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False)
+    modified_at = Column(Float, nullable=False)
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Float, Integer, String
+from app.core.constants import COMEDOURO_CAPACITY, DISTANCE_FULL
+from app.core.database import Base
+
+
+class Device(Base):
+    __tablename__ = "devices"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    capacity = Column(Float, nullable=False, default=COMEDOURO_CAPACITY)
+    distance_full = Column(Float, nullable=False, default=DISTANCE_FULL)
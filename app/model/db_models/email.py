@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, String, UUID
+from sqlalchemy import Column, Index, String, UUID
 from app.core.database import Base
 
 
@@ -8,5 +8,7 @@ class Email(Base):
     __tablename__ = "emails"
 
     id = Column(UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4)
-    email = Column(String, index=True)
+    email = Column(String)
     name = Column(String)
+
+    __table_args__ = (Index("ux_emails_email", email, unique=True),)
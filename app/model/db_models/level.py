@@ -1,13 +1,37 @@
 import uuid
 
 
-from sqlalchemy import Column, DateTime, Float, UUID
-from app.core.database import Base
+from sqlalchemy import Column, DateTime, Float, Index, Integer, UUID
+from app.core.constants import COMEDOURO_ID
+from app.core.database import Base, DB_SCHEMA
+from app.model.db_models.types import EpochMillis
 
+if DB_SCHEMA == "compact":
 
-class Level(Base):
-    __tablename__ = "levels"
+    class Level(Base):
+        __tablename__ = "levels"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4)
-    date = Column(DateTime)
-    level = Column(Float)
+        id = Column(Integer, primary_key=True)
+        device_id = Column(Integer, nullable=False, default=COMEDOURO_ID)
+        date = Column("ts", EpochMillis, nullable=False)
+        level = Column(Float)
+
+        __table_args__ = (
+            Index("ux_levels_device_ts", device_id, date, level, unique=True),
+        )
+
+else:
+
+    class Level(Base):
+        __tablename__ = "levels"
+
+        id = Column(
+            UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4
+        )
+        device_id = Column(Integer, nullable=False, default=COMEDOURO_ID)
+        date = Column(DateTime)
+        level = Column(Float)
+
+        __table_args__ = (
+            Index("ux_levels_device_date", device_id, date, level, unique=True),
+        )
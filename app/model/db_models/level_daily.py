@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Date, Float, Integer
+from app.core.database import Base
+
+
+class LevelDaily(Base):
+    __tablename__ = "level_daily"
+
+    device_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    count = Column(Integer, nullable=False)
+    sum = Column(Float, nullable=False)
+    min = Column(Float, nullable=False)
+    max = Column(Float, nullable=False)
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, DateTime, Float, Integer
+from app.core.database import Base
+
+
+class LevelHourly(Base):
+    __tablename__ = "level_hourly"
+
+    device_id = Column(Integer, primary_key=True)
+    hour = Column(DateTime, primary_key=True)
+    count = Column(Integer, nullable=False)
+    sum = Column(Float, nullable=False)
+    min = Column(Float, nullable=False)
+    max = Column(Float, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, UUID
+from sqlalchemy import Column, Index, String, UUID
 from app.core.database import Base
 import uuid
 
@@ -9,3 +9,5 @@ class Phone(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, index=True)
     number = Column(String)
+
+    __table_args__ = (Index("ux_phones_number", number, unique=True),)
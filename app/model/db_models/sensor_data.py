@@ -1,13 +1,52 @@
 import uuid
 
-from sqlalchemy import Column, Integer, DateTime, Float, UUID
-from app.core.database import Base
+from sqlalchemy import Column, Integer, DateTime, Float, Index, UUID
+from app.core.constants import COMEDOURO_ID
+from app.core.database import Base, DB_SCHEMA
+from app.model.db_models.types import EpochMillis
 
+if DB_SCHEMA == "compact":
 
-class SensorData(Base):
-    __tablename__ = "sensor_data"
+    class SensorData(Base):
+        __tablename__ = "sensor_data"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4)
-    date = Column(DateTime)
-    temperature = Column(Float)
-    humidity = Column(Float)
+        id = Column(Integer, primary_key=True)
+        device_id = Column(Integer, nullable=False, default=COMEDOURO_ID)
+        date = Column("ts", EpochMillis, nullable=False)
+        temperature = Column(Float)
+        humidity = Column(Float)
+
+        __table_args__ = (
+            Index(
+                "ux_sensor_data_device_ts",
+                device_id,
+                date,
+                temperature,
+                humidity,
+                unique=True,
+            ),
+        )
+
+else:
+
+    class SensorData(Base):
+        __tablename__ = "sensor_data"
+
+        id = Column(
+            UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4
+        )
+        device_id = Column(Integer, nullable=False, default=COMEDOURO_ID)
+        date = Column(DateTime)
+        temperature = Column(Float)
+        humidity = Column(Float)
+
+        __table_args__ = (
+            Index(
+                "ux_sensor_data_device_date",
+                device_id,
+                date,
+                temperature,
+                humidity,
+                unique=True,
+            ),
+        )
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, DateTime, Float, Integer
+from app.core.database import Base
+
+
+class SensorHourly(Base):
+    __tablename__ = "sensor_hourly"
+
+    device_id = Column(Integer, primary_key=True)
+    hour = Column(DateTime, primary_key=True)
+    count = Column(Integer, nullable=False)
+    temp_sum = Column(Float, nullable=False)
+    temp_min = Column(Float, nullable=False)
+    temp_max = Column(Float, nullable=False)
+    humi_sum = Column(Float, nullable=False)
+    humi_min = Column(Float, nullable=False)
+    humi_max = Column(Float, nullable=False)
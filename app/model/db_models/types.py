@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import BigInteger
+from sqlalchemy.types import TypeDecorator
+
+LOCAL_TZ = ZoneInfo("America/Fortaleza")
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+NAIVE_EPOCH = datetime(1970, 1, 1)
+MILLISECOND = timedelta(milliseconds=1)
+MILLIS_PER_HOUR = 3_600_000
+
+
+def to_epoch_millis(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=LOCAL_TZ)
+    return (value - EPOCH) // MILLISECOND
+
+
+@lru_cache(maxsize=8192)
+def _local_offset(hour: int) -> timedelta:
+    return (EPOCH + timedelta(hours=hour)).astimezone(LOCAL_TZ).utcoffset()
+
+
+def from_epoch_millis(value: int) -> datetime:
+    return (
+        NAIVE_EPOCH
+        + timedelta(milliseconds=value)
+        + _local_offset(value // MILLIS_PER_HOUR)
+    )
+
+
+class EpochMillis(TypeDecorator):
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, int):
+            return value
+        return to_epoch_millis(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return value
+        return from_epoch_millis(value)
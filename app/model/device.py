@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+
+class Device(BaseModel):
+    id: int
+    name: str
+    capacity: float
+    distance_full: float
@@ -0,0 +1,17 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.core.constants import COMEDOURO_CAPACITY, DISTANCE_FULL
+
+
+class DeviceRequest(BaseModel):
+    name: str
+    capacity: float = COMEDOURO_CAPACITY
+    distance_full: float = DISTANCE_FULL
+
+
+class DeviceUpdateRequest(BaseModel):
+    name: Optional[str] = None
+    capacity: Optional[float] = None
+    distance_full: Optional[float] = None
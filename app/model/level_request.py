@@ -1,5 +1,18 @@
-from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from app.core.constants import COMEDOURO_ID
 
 
 class LevelRequest(BaseModel):
     level: float
+    date: Optional[datetime] = None
+    device_id: int = Field(COMEDOURO_ID, ge=1)
+
+
+class LevelBatchItem(BaseModel):
+    level: float
+    date: Optional[datetime] = None
+    device_id: int = Field(COMEDOURO_ID, ge=1)
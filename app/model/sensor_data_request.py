@@ -1,6 +1,20 @@
-from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from app.core.constants import COMEDOURO_ID
 
 
 class SensorDataRequest(BaseModel):
     temperature: float
     humidity: float
+    date: Optional[datetime] = None
+    device_id: int = Field(COMEDOURO_ID, ge=1)
+
+
+class SensorDataBatchItem(BaseModel):
+    temperature: float
+    humidity: float
+    date: Optional[datetime] = None
+    device_id: int = Field(COMEDOURO_ID, ge=1)
@@ -0,0 +1,76 @@
+import argparse
+import signal
+import threading
+
+from app.alerts.dispatcher import alert_dispatcher
+from app.core.database import create_session_factory
+from app.core.migrations import run_migrations
+from app.core.retention import retention_job
+from app.core.mqtt_core import (
+    INGEST_BATCH_SIZE,
+    INGEST_FLUSH_INTERVAL,
+    INGEST_QUEUE_SIZE,
+)
+from app.core.storage_profile import DB_PROFILE, get_pool_options
+from app.core.watermark import watermark_sync
+from app.mqtt.mqtt_listener import (
+    configure_ingest,
+    ingest_queue,
+    logger,
+    start_mqtt_listener,
+    stop_mqtt_listener,
+)
+
+
+def run(args: argparse.Namespace):
+    run_migrations()
+    session_factory = create_session_factory(
+        args.db_profile, {**get_pool_options(), "pool_size": args.pool_size}
+    )
+    configure_ingest(
+        session_factory, args.queue_size, args.batch_size, args.flush_interval
+    )
+
+    stopping = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stopping.set())
+
+    watermark_sync.start()
+    retention_job.start()
+    alert_dispatcher.start()
+    start_mqtt_listener()
+    logger.info(
+        f"Ingest worker started: profile={args.db_profile}, "
+        f"batch_size={args.batch_size}, flush_interval={args.flush_interval}s, "
+        f"queue_size={args.queue_size}"
+    )
+
+    interval = args.stats_interval if args.stats_interval > 0 else None
+    while not stopping.wait(interval):
+        logger.info(f"Ingest stats: {ingest_queue.stats()}")
+
+    logger.info("Stopping ingest worker, draining the queue")
+    stop_mqtt_listener()
+    alert_dispatcher.stop(timeout=10)
+    retention_job.stop()
+    watermark_sync.stop()
+    session_factory.kw["bind"].dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Consume MQTT readings and write them to the database, "
+        "independently of the API process."
+    )
+    parser.add_argument("--db-profile", default=DB_PROFILE)
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--queue-size", type=int, default=INGEST_QUEUE_SIZE)
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE)
+    parser.add_argument("--flush-interval", type=float, default=INGEST_FLUSH_INTERVAL)
+    parser.add_argument(
+        "--stats-interval",
+        type=float,
+        default=60.0,
+        help="Seconds between ingest stats log lines, 0 to disable.",
+    )
+    run(parser.parse_args())
@@ -0,0 +1,284 @@
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.database import SessionLocal
+from app.core.metrics import DB_BUCKETS, INGEST_BUCKETS, Counter, Histogram
+from app.mqtt.spool import Spool
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+ingest_saved = Counter(
+    "ingest_readings_saved", "Readings written to the database.", ("kind",)
+)
+ingest_duplicates_ignored = Counter(
+    "ingest_readings_ignored",
+    "Readings ignored by the unique index as duplicates.",
+    ("kind",),
+)
+ingest_spooled = Counter(
+    "ingest_readings_spooled", "Readings appended to the disk spool.", ("kind",)
+)
+ingest_failed = Counter(
+    "ingest_readings_failed", "Readings that could not be written.", ("kind",)
+)
+ingest_dropped = Counter(
+    "ingest_readings_dropped", "Readings dropped on a full queue.", ("kind",)
+)
+ingest_latency = Histogram(
+    "ingest_latency_seconds",
+    "Time from receiving a reading to committing it.",
+    ("kind",),
+    buckets=INGEST_BUCKETS,
+)
+ingest_flush = Histogram(
+    "ingest_flush_seconds", "Duration of batch flushes.", buckets=DB_BUCKETS
+)
+
+
+class IngestQueue:
+    def __init__(
+        self,
+        handlers: Dict[str, Callable[[Session, List[dict]], int]],
+        max_size: int,
+        batch_size: int,
+        flush_interval: float,
+        put_timeout: float,
+        session_factory: sessionmaker = SessionLocal,
+        spool: Optional[Spool] = None,
+        retry_interval: float = 1.0,
+    ):
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.session_factory = session_factory
+        self.spool = spool
+        self.retry_interval = retry_interval
+        self._replay_after = 0.0
+        self.queue = queue.Queue(maxsize=max_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "enqueued": 0,
+            "dropped": 0,
+            "saved": 0,
+            "failed": 0,
+            "spooled": 0,
+            "duplicates": 0,
+            "batches": 0,
+            "max_queue_depth": 0,
+            "last_batch_size": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+        }
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        if self.spool is not None:
+            self.spool.open()
+        self._thread = threading.Thread(
+            target=self._run, name="ingest-writer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        if self._thread is None:
+            return
+        self.queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+        if self.spool is not None:
+            self.spool.close()
+
+    def put(self, kind: str, row: dict) -> bool:
+        item = (kind, row, time.monotonic())
+        try:
+            if self._spooling():
+                self.queue.put_nowait(item)
+            else:
+                self.queue.put(item, timeout=self.put_timeout)
+        except queue.Full:
+            if self._spooling():
+                self.spool.append(kind, [row])
+                ingest_spooled.inc(kind)
+                with self._lock:
+                    self._stats["spooled"] += 1
+                return True
+            ingest_dropped.inc(kind)
+            with self._lock:
+                self._stats["dropped"] += 1
+            logger.warning(
+                f"Ingest queue full for {self.put_timeout}s, dropping {kind} reading"
+            )
+            return False
+
+        depth = self.queue.qsize()
+        with self._lock:
+            self._stats["enqueued"] += 1
+            if depth > self._stats["max_queue_depth"]:
+                self._stats["max_queue_depth"] = depth
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        total_flush_ms = stats.pop("total_flush_ms")
+        stats["queue_depth"] = self.queue.qsize()
+        stats["queue_capacity"] = self.queue.maxsize
+        stats["avg_flush_ms"] = (
+            round(total_flush_ms / stats["batches"], 3) if stats["batches"] else 0.0
+        )
+        stats["running"] = self._thread is not None and self._thread.is_alive()
+        if self.spool is not None:
+            stats["spool"] = self.spool.stats()
+        return stats
+
+    def _spooling(self) -> bool:
+        return self.spool is not None and self.spool.enabled
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                item = self.queue.get(
+                    timeout=self.spool.fsync_interval if self._spooling() else None
+                )
+            except queue.Empty:
+                self._maintain_spool()
+                continue
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._flush(batch)
+            self._maintain_spool()
+
+        if self._spooling():
+            self._replay_after = 0.0
+            self._replay(drain=True)
+
+    def _maintain_spool(self):
+        if not self._spooling():
+            return
+        self.spool.sync()
+        if self.spool.pending and time.monotonic() >= self._replay_after:
+            self._replay()
+
+    def _replay(self, drain: bool = False):
+        db: Session = self.session_factory()
+        try:
+            while drain or self.queue.empty():
+                chunk = self.spool.read(self.batch_size)
+                if chunk is None:
+                    break
+                kind, rows, token = chunk
+                started = time.perf_counter()
+                try:
+                    count = self.handlers[kind](db, rows)
+                    ingest_saved.inc(kind, amount=count)
+                    ingest_duplicates_ignored.inc(kind, amount=len(rows) - count)
+                    with self._lock:
+                        self._stats["duplicates"] += len(rows) - count
+                    logger.info(f"{kind.capitalize()} data replayed: {count} readings")
+                except OperationalError as e:
+                    db.rollback()
+                    self._replay_after = time.monotonic() + self.retry_interval
+                    logger.warning(f"Spool replay deferred: {e.orig}")
+                    break
+                except Exception as e:
+                    db.rollback()
+                    ingest_failed.inc(kind, amount=len(rows))
+                    with self._lock:
+                        self._stats["failed"] += len(rows)
+                    logger.error(f"Error replaying {len(rows)} {kind} readings: {e}")
+                self.spool.commit(token, len(rows), time.perf_counter() - started)
+        finally:
+            db.close()
+
+    def _flush(self, batch: List[tuple]):
+        grouped: Dict[str, List[dict]] = {}
+        received: Dict[str, List[float]] = {}
+        for kind, row, enqueued_at in batch:
+            grouped.setdefault(kind, []).append(row)
+            received.setdefault(kind, []).append(enqueued_at)
+
+        started = time.perf_counter()
+        saved = 0
+        failed = 0
+        spooled = 0
+        duplicates = 0
+        db: Session = self.session_factory()
+        try:
+            for kind, rows in grouped.items():
+                try:
+                    count = self.handlers[kind](db, rows)
+                    committed_at = time.monotonic()
+                    ingest_latency.observe_many(
+                        (committed_at - enqueued_at for enqueued_at in received[kind]),
+                        kind,
+                    )
+                    ingest_saved.inc(kind, amount=count)
+                    ingest_duplicates_ignored.inc(kind, amount=len(rows) - count)
+                    saved += count
+                    duplicates += len(rows) - count
+                    logger.info(f"{kind.capitalize()} data saved: {count} readings")
+                except OperationalError as e:
+                    db.rollback()
+                    if not self._spooling():
+                        ingest_failed.inc(kind, amount=len(rows))
+                        failed += len(rows)
+                        logger.error(f"Error saving {len(rows)} {kind} readings: {e}")
+                        continue
+                    self.spool.append(kind, rows)
+                    ingest_spooled.inc(kind, amount=len(rows))
+                    spooled += len(rows)
+                    self._replay_after = time.monotonic() + self.retry_interval
+                    logger.warning(f"Spooled {len(rows)} {kind} readings: {e.orig}")
+                except Exception as e:
+                    db.rollback()
+                    ingest_failed.inc(kind, amount=len(rows))
+                    failed += len(rows)
+                    logger.error(f"Error saving {len(rows)} {kind} readings: {e}")
+        finally:
+            db.close()
+        elapsed = time.perf_counter() - started
+        ingest_flush.observe(elapsed)
+        elapsed_ms = elapsed * 1000
+        if saved and not spooled:
+            self._replay_after = 0.0
+
+        with self._lock:
+            self._stats["saved"] += saved
+            self._stats["failed"] += failed
+            self._stats["spooled"] += spooled
+            self._stats["duplicates"] += duplicates
+            self._stats["batches"] += 1
+            self._stats["last_batch_size"] = len(batch)
+            self._stats["last_flush_ms"] = round(elapsed_ms, 3)
+            self._stats["total_flush_ms"] += elapsed_ms
+            if elapsed_ms > self._stats["max_flush_ms"]:
+                self._stats["max_flush_ms"] = round(elapsed_ms, 3)
@@ -0,0 +1,60 @@
+import logging
+import threading
+from typing import Callable
+
+from app.core.locks import FileLock
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderElection:
+    def __init__(
+        self,
+        lock: FileLock,
+        on_elected: Callable[[], None],
+        on_resigned: Callable[[], None],
+        retry_interval: float,
+    ):
+        self.lock = lock
+        self.on_elected = on_elected
+        self.on_resigned = on_resigned
+        self.retry_interval = retry_interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self.lock.held
+
+    def start(self):
+        self._stop.clear()
+        if self._try_lead():
+            return
+        logger.info(
+            f"Another process holds {self.lock.path}, standing by as MQTT consumer"
+        )
+        self._thread = threading.Thread(
+            target=self._wait_for_leadership, name="mqtt-leader", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.lock.held:
+            self.on_resigned()
+            self.lock.release()
+
+    def _try_lead(self) -> bool:
+        if not self.lock.acquire(blocking=False):
+            return False
+        logger.info(f"Acquired {self.lock.path}, this process consumes MQTT")
+        self.on_elected()
+        return True
+
+    def _wait_for_leadership(self):
+        while not self._stop.wait(self.retry_interval):
+            if self._try_lead():
+                return
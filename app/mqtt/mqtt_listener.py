@@ -1,18 +1,38 @@
-import json
 import logging
+from app.core.database import SessionLocal
+from app.core.dedupe import reading_dedupe
+from app.core.locks import FileLock
+from app.core.metrics import Counter, Gauge
 from app.core.mqtt_core import (
+    INGEST_BATCH_SIZE,
+    INGEST_FLUSH_INTERVAL,
+    INGEST_PUT_TIMEOUT,
+    INGEST_QUEUE_SIZE,
+    INGEST_SPOOL_DIR,
+    INGEST_SPOOL_FSYNC_INTERVAL,
+    INGEST_SPOOL_RETRY_INTERVAL,
+    INGEST_SPOOL_SEGMENT_BYTES,
     MQTT_BROKER,
+    MQTT_LEADER_RETRY,
+    MQTT_LOCK_FILE,
     MQTT_PASSWORD,
     MQTT_PORT,
+    MQTT_SHARED_GROUP,
     MQTT_TOPIC_LEVEL,
     MQTT_TOPIC_SENSOR,
     MQTT_USER,
+    subscription_topic,
 )
+from app.core.utils import local_now, reading_error, to_local
 import colorlog
 import paho.mqtt.client as paho
 from paho import mqtt
-from sqlalchemy.orm import Session
-from app.core.database import SessionLocal
+from sqlalchemy.orm import Session, sessionmaker
+from app.model.level_request import LevelBatchItem
+from app.model.sensor_data_request import SensorDataBatchItem
+from app.mqtt.ingest_queue import IngestQueue
+from app.mqtt.leader import LeaderElection
+from app.mqtt.spool import Spool
 from app.service.sensor_data_service import SensorDataService
 from app.service.level_service import LevelService
 
@@ -34,47 +54,141 @@ logger.addHandler(handler)
 logger.setLevel(logging.INFO)
 
 
+def save_sensor_data(db: Session, rows):
+    return len(SensorDataService(db).save_sensor_data(rows))
+
+
+def save_levels(db: Session, rows):
+    return len(LevelService(db).save_levels(rows))
+
+
+ingest_queue = IngestQueue(
+    handlers={"sensor": save_sensor_data, "level": save_levels},
+    max_size=INGEST_QUEUE_SIZE,
+    batch_size=INGEST_BATCH_SIZE,
+    flush_interval=INGEST_FLUSH_INTERVAL,
+    put_timeout=INGEST_PUT_TIMEOUT,
+    spool=(
+        Spool(INGEST_SPOOL_DIR, INGEST_SPOOL_SEGMENT_BYTES, INGEST_SPOOL_FSYNC_INTERVAL)
+        if INGEST_SPOOL_DIR
+        else None
+    ),
+    retry_interval=INGEST_SPOOL_RETRY_INTERVAL,
+)
+mqtt_client = None
+session_factory = SessionLocal
+
+mqtt_messages_received = Counter(
+    "mqtt_messages_received", "MQTT messages received by topic.", ("topic",)
+)
+ingest_errors = Counter(
+    "ingest_errors",
+    "MQTT readings rejected or failed before queueing.",
+    ("kind", "reason"),
+)
+ingest_duplicates = Counter(
+    "ingest_duplicates_dropped",
+    "Duplicate MQTT readings dropped by the dedupe cache.",
+    ("kind",),
+)
+Gauge(
+    "ingest_queue_depth",
+    "Readings waiting in the ingest queue.",
+    lambda: ingest_queue.queue.qsize(),
+)
+Gauge(
+    "ingest_spool_pending",
+    "Readings waiting in the disk spool.",
+    lambda: ingest_queue.spool.pending if ingest_queue.spool is not None else 0,
+)
+Gauge(
+    "mqtt_consumer_active",
+    "1 when this process is connected as the MQTT consumer.",
+    lambda: int(mqtt_client is not None),
+)
+
+
+def configure_ingest(
+    factory: sessionmaker, max_size: int, batch_size: int, flush_interval: float
+):
+    global session_factory
+    session_factory = factory
+    ingest_queue.session_factory = factory
+    ingest_queue.queue.maxsize = max_size
+    ingest_queue.batch_size = batch_size
+    ingest_queue.flush_interval = flush_interval
+
+
 def handle_temperature_humidity(payload):
-    db = None
     try:
-        data = json.loads(payload)
-        db: Session = SessionLocal()
-        sensor_service = SensorDataService(db)
-        sensor_data = sensor_service.handle_sensor_data(
-            data["temperature"], data["humidity"]
-        )
-        logger.info(
-            f"Sensor data saved: Temp={sensor_data.temp}, Humi={sensor_data.humi}, Date={sensor_data.date}"
-        )
+        reading = SensorDataBatchItem.model_validate_json(payload)
+        values = (reading.temperature, reading.humidity)
+        date = to_local(reading.date)
+        error = reading_error(values, date, local_now())
+        if error is not None:
+            ingest_errors.inc("sensor", "rejected")
+            logger.error(f"Sensor data rejected: {error}")
+            return
+        if reading_dedupe.seen("sensor", reading.device_id, values, date):
+            ingest_duplicates.inc("sensor")
+            logger.debug(f"Duplicate sensor data dropped: Device={reading.device_id}")
+            return
+        with session_factory() as db:
+            sensor_data = SensorDataService(db).build_sensor_data(
+                *values, reading.device_id
+            )
+        if sensor_data is None:
+            ingest_errors.inc("sensor", "unknown_device")
+            logger.error(f"Sensor data rejected: device {reading.device_id} not found")
+            return
+        if date is not None:
+            sensor_data["date"] = date
+        if ingest_queue.put("sensor", sensor_data):
+            reading_dedupe.remember("sensor", reading.device_id, values, date)
+            logger.debug(
+                f"Sensor data queued: Device={reading.device_id}, Temp={sensor_data['temperature']}, Humi={sensor_data['humidity']}, Date={sensor_data['date']}"
+            )
     except Exception as e:
-        logger.error(f"Error saving sensor data: {e}")
-    finally:
-        if db is not None and db.is_active:
-            db.close()
+        ingest_errors.inc("sensor", "invalid")
+        logger.error(f"Error processing sensor data: {e}")
 
 
 def handle_level(payload):
-    db = None
     try:
-        data = json.loads(payload)
-        db: Session = SessionLocal()
-        level_service = LevelService(db)
-        level_data = level_service.handle_level(data["level"])
-        logger.info(
-            f"Level data saved: Level={level_data.level}, Date={level_data.date}"
-        )
+        reading = LevelBatchItem.model_validate_json(payload)
+        date = to_local(reading.date)
+        error = reading_error((reading.level,), date, local_now())
+        if error is not None:
+            ingest_errors.inc("level", "rejected")
+            logger.error(f"Level data rejected: {error}")
+            return
+        if reading_dedupe.seen("level", reading.device_id, (reading.level,), date):
+            ingest_duplicates.inc("level")
+            logger.debug(f"Duplicate level data dropped: Device={reading.device_id}")
+            return
+        with session_factory() as db:
+            level_data = LevelService(db).build_level(reading.level, reading.device_id)
+        if level_data is None:
+            ingest_errors.inc("level", "unknown_device")
+            logger.error(f"Level data rejected: device {reading.device_id} not found")
+            return
+        if date is not None:
+            level_data["date"] = date
+        if ingest_queue.put("level", level_data):
+            reading_dedupe.remember("level", reading.device_id, (reading.level,), date)
+            logger.debug(
+                f"Level data queued: Device={reading.device_id}, Level={level_data['level']}, Date={level_data['date']}"
+            )
     except Exception as e:
-        logger.error(f"Error saving level data: {e}")
-    finally:
-        if db is not None and db.is_active:
-            db.close()
+        ingest_errors.inc("level", "invalid")
+        logger.error(f"Error processing level data: {e}")
 
 
 def on_connect(client, userdata, flags, rc, properties=None):
     if rc == 0:
         logger.info("Connected to MQTT broker")
-        client.subscribe(MQTT_TOPIC_SENSOR, qos=2)
-        client.subscribe(MQTT_TOPIC_LEVEL, qos=2)
+        client.subscribe(subscription_topic(MQTT_TOPIC_SENSOR), qos=2)
+        client.subscribe(subscription_topic(MQTT_TOPIC_LEVEL), qos=2)
     else:
         logger.error(
             f"Failed to connect to MQTT broker. Return code: {rc}. The client will attempt to reconnect automatically."
@@ -92,13 +206,17 @@ def on_disconnect(client, userdata, rc):
 
 def on_message(client, userdata, msg):
     logger.debug(f"Received message on topic {msg.topic}")
+    mqtt_messages_received.inc(msg.topic)
     if msg.topic == MQTT_TOPIC_SENSOR:
         handle_temperature_humidity(msg.payload.decode())
     elif msg.topic == MQTT_TOPIC_LEVEL:
         handle_level(msg.payload.decode())
 
 
-def start_mqtt_listener():
+def start_mqtt_client():
+    global mqtt_client
+    ingest_queue.start()
+
     client = paho.Client(client_id="", userdata=None, protocol=paho.MQTTv5)
     client.enable_logger(logger)
     client.username_pw_set(MQTT_USER, MQTT_PASSWORD)
@@ -109,6 +227,7 @@ def start_mqtt_listener():
     client.on_disconnect = on_disconnect
 
     client.reconnect_delay_set(min_delay=120, max_delay=120)
+    mqtt_client = client
 
     client.loop_start()
 
@@ -117,3 +236,40 @@ def start_mqtt_listener():
         client.connect(MQTT_BROKER, MQTT_PORT, 60)
     except Exception as e:
         logger.error(f"MQTT connection attempt failed: {e}. Retrying in 2 minutes...")
+
+
+def stop_mqtt_client():
+    global mqtt_client
+    if mqtt_client is not None:
+        mqtt_client.disconnect()
+        mqtt_client.loop_stop()
+        mqtt_client = None
+    ingest_queue.stop()
+    logger.info(f"Ingest queue drained: {ingest_queue.stats()}")
+
+
+leader_election = LeaderElection(
+    FileLock(MQTT_LOCK_FILE), start_mqtt_client, stop_mqtt_client, MQTT_LEADER_RETRY
+)
+
+
+def start_mqtt_listener():
+    if MQTT_SHARED_GROUP:
+        logger.info(f"Consuming MQTT through the shared group {MQTT_SHARED_GROUP}")
+        start_mqtt_client()
+    else:
+        leader_election.start()
+
+
+def consumer_status() -> dict:
+    return {
+        "mode": "shared" if MQTT_SHARED_GROUP else "leader",
+        "active": mqtt_client is not None,
+    }
+
+
+def stop_mqtt_listener():
+    if MQTT_SHARED_GROUP:
+        stop_mqtt_client()
+    else:
+        leader_election.stop()
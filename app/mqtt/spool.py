@@ -0,0 +1,237 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from app.core.locks import FileLock
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = ".ndjson"
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot spool value of type {type(value).__name__}")
+
+
+def _decode_row(row: dict) -> dict:
+    if isinstance(row.get("date"), str):
+        row["date"] = datetime.fromisoformat(row["date"])
+    return row
+
+
+class Spool:
+    def __init__(self, directory: str, segment_bytes: int, fsync_interval: float):
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._owner = FileLock(str(self.directory / "spool.lock"))
+        self._segments: List[Path] = []
+        self._writer = None
+        self._position = 0
+        self._oldest_at: Optional[float] = None
+        self._dirty = False
+        self._last_fsync = 0.0
+        self._stats = {
+            "pending": 0,
+            "spooled": 0,
+            "replayed": 0,
+            "fsyncs": 0,
+            "replay_seconds": 0.0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self._owner.held
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return self._stats["pending"]
+
+    def open(self) -> bool:
+        if self.enabled:
+            return True
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if not self._owner.acquire(blocking=False):
+            logger.warning(
+                f"Spool {self.directory} is owned by another process, "
+                "readings that cannot be written will be dropped"
+            )
+            return False
+
+        with self._lock:
+            self._segments = sorted(self.directory.glob(f"*{SEGMENT_SUFFIX}"))
+            self._position = self._load_offset()
+            self._save_offset()
+            self._stats["pending"] = sum(
+                len(record["rows"])
+                for segment in self._segments
+                for _, record in self._scan(
+                    segment, self._position if segment == self._segments[0] else 0
+                )
+            )
+            self._oldest_at = self._peek_oldest()
+        if self._stats["pending"]:
+            logger.info(
+                f"Spool {self.directory} holds {self._stats['pending']} readings to replay"
+            )
+        return True
+
+    def close(self):
+        with self._lock:
+            if self._writer is not None:
+                self._fsync()
+                self._writer.close()
+                self._writer = None
+        self._owner.release()
+
+    def append(self, kind: str, rows: List[dict]):
+        line = json.dumps(
+            {"kind": kind, "at": time.time(), "rows": rows},
+            default=_encode,
+            separators=(",", ":"),
+        )
+        with self._lock:
+            if self._writer is None or self._writer.tell() >= self.segment_bytes:
+                self._roll()
+            self._writer.write(line + "\n")
+            self._writer.flush()
+            self._dirty = True
+            self._stats["pending"] += len(rows)
+            self._stats["spooled"] += len(rows)
+            if self._oldest_at is None:
+                self._oldest_at = time.time()
+            if time.monotonic() - self._last_fsync >= self.fsync_interval:
+                self._fsync()
+
+    def sync(self):
+        with self._lock:
+            if self._dirty:
+                self._fsync()
+
+    def read(self, max_rows: int) -> Optional[Tuple[str, List[dict], tuple]]:
+        with self._lock:
+            while self._segments:
+                segment = self._segments[0]
+                kind, rows, end = None, [], self._position
+                for position, record in self._scan(segment, self._position):
+                    if kind is not None and (
+                        record["kind"] != kind or len(rows) >= max_rows
+                    ):
+                        break
+                    kind = record["kind"]
+                    rows.extend(_decode_row(row) for row in record["rows"])
+                    end = position
+                if kind is not None:
+                    return kind, rows, (segment, end)
+                if segment == self._active_segment():
+                    return None
+                self._remove_head()
+            return None
+
+    def commit(self, token: tuple, count: int, seconds: float):
+        segment, position = token
+        with self._lock:
+            if not self._segments or self._segments[0] != segment:
+                return
+            self._position = position
+            if position >= segment.stat().st_size:
+                if segment == self._active_segment():
+                    self._fsync()
+                    self._writer.close()
+                    self._writer = None
+                self._remove_head()
+            else:
+                self._save_offset()
+            self._stats["pending"] -= count
+            self._stats["replayed"] += count
+            self._stats["replay_seconds"] += seconds
+            self._oldest_at = self._peek_oldest()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            oldest_at = self._oldest_at
+            stats["segments"] = len(self._segments)
+            stats["bytes"] = sum(
+                segment.stat().st_size for segment in self._segments if segment.exists()
+            )
+        replay_seconds = stats.pop("replay_seconds")
+        stats["enabled"] = self.enabled
+        stats["lag_seconds"] = (
+            round(time.time() - oldest_at, 3) if oldest_at is not None else 0.0
+        )
+        stats["replay_rate"] = (
+            round(stats["replayed"] / replay_seconds, 1) if replay_seconds else 0.0
+        )
+        return stats
+
+    def _scan(self, segment: Path, position: int) -> Iterator[Tuple[int, dict]]:
+        with open(segment, "rb") as file:
+            file.seek(position)
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                position += len(line)
+                yield position, json.loads(line)
+
+    def _peek_oldest(self) -> Optional[float]:
+        for index, segment in enumerate(self._segments):
+            for _, record in self._scan(segment, self._position if index == 0 else 0):
+                return record["at"]
+        return None
+
+    def _active_segment(self) -> Optional[Path]:
+        return Path(self._writer.name) if self._writer is not None else None
+
+    def _roll(self):
+        if self._writer is not None:
+            self._fsync()
+            self._writer.close()
+        sequence = int(self._segments[-1].stem) + 1 if self._segments else 1
+        segment = self.directory / f"{sequence:010d}{SEGMENT_SUFFIX}"
+        self._writer = open(segment, "a", encoding="utf-8")
+        self._segments.append(segment)
+
+    def _remove_head(self):
+        segment = self._segments.pop(0)
+        segment.unlink(missing_ok=True)
+        self._position = 0
+        self._save_offset()
+
+    def _fsync(self):
+        if self._writer is not None:
+            os.fsync(self._writer.fileno())
+            self._stats["fsyncs"] += 1
+        self._dirty = False
+        self._last_fsync = time.monotonic()
+
+    def _load_offset(self) -> int:
+        try:
+            offset = json.loads((self.directory / "offset").read_text())
+        except (OSError, ValueError):
+            return 0
+        if self._segments and offset.get("segment") == self._segments[0].name:
+            return int(offset.get("position", 0))
+        return 0
+
+    def _save_offset(self):
+        path = self.directory / "offset"
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(
+            json.dumps(
+                {
+                    "segment": self._segments[0].name if self._segments else None,
+                    "position": self._position,
+                }
+            )
+        )
+        os.replace(temporary, path)
@@ -0,0 +1,25 @@
+import time
+from typing import Dict, Tuple
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.model.db_models.data_version import DataVersion
+
+
+def bump_data_version(db: Session, name: str) -> Tuple[int, float]:
+    stmt = sqlite_insert(DataVersion).values(
+        name=name, version=1, modified_at=time.time()
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DataVersion.name],
+        set_={
+            "version": DataVersion.version + 1,
+            "modified_at": stmt.excluded.modified_at,
+        },
+    ).returning(DataVersion.version, DataVersion.modified_at)
+    version, modified_at = db.execute(stmt).one()
+    db.commit()
+    return version, modified_at
+
+
+def get_data_versions(db: Session) -> Dict[str, Tuple[int, float]]:
+    return {row.name: (row.version, row.modified_at) for row in db.query(DataVersion)}
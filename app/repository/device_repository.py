@@ -0,0 +1,54 @@
+from typing import List, Optional
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.core.constants import COMEDOURO_CAPACITY, COMEDOURO_ID, DISTANCE_FULL
+from app.model.db_models.device import Device as DeviceDB
+from app.model.device import Device
+
+
+def _to_model(device: DeviceDB) -> Device:
+    return Device(
+        id=device.id,
+        name=device.name,
+        capacity=device.capacity,
+        distance_full=device.distance_full,
+    )
+
+
+def get_device(db: Session, device_id: int) -> Optional[Device]:
+    device = db.get(DeviceDB, device_id)
+    return _to_model(device) if device is not None else None
+
+
+def get_all_devices(db: Session) -> List[Device]:
+    return [_to_model(device) for device in db.query(DeviceDB).order_by(DeviceDB.id)]
+
+
+def create_device(db: Session, device: dict) -> Device:
+    db_device = DeviceDB(**device)
+    db.add(db_device)
+    db.commit()
+    db.refresh(db_device)
+    return _to_model(db_device)
+
+
+def update_device(db: Session, device_id: int, fields: dict) -> Optional[Device]:
+    device = db.get(DeviceDB, device_id)
+    if device is None:
+        return None
+    for name, value in fields.items():
+        setattr(device, name, value)
+    db.commit()
+    db.refresh(device)
+    return _to_model(device)
+
+
+def create_default_device(db: Session):
+    stmt = sqlite_insert(DeviceDB).values(
+        id=COMEDOURO_ID,
+        name=f"Comedouro {COMEDOURO_ID}",
+        capacity=COMEDOURO_CAPACITY,
+        distance_full=DISTANCE_FULL,
+    )
+    db.execute(stmt.on_conflict_do_nothing(index_elements=[DeviceDB.id]))
+    db.commit()
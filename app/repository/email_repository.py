@@ -1,7 +1,12 @@
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app.model.email import Email
 from app.model.db_models.email import Email as EmailDB
 from uuid import UUID
+from typing import List, Optional
+from app.core.constants import INSERT_CHUNK_SIZE, PAGE_SIZE
+from app.core.pagination import Page, encode_cursor
 
 
 def get_email(db: Session, email_id: UUID):
@@ -15,10 +20,39 @@ def get_email_by_address(db: Session, email_address: str):
 def create_email(db: Session, email: Email):
     db_email = EmailDB(**email.dict())
     db.add(db_email)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return None
     db.refresh(db_email)
     return email
 
 
-def get_all_emails(db: Session):
-    return db.query(EmailDB).all()
+def get_all_emails(db: Session, limit: int = PAGE_SIZE, after: Optional[UUID] = None):
+    query = db.query(EmailDB)
+    if after is not None:
+        query = query.filter(EmailDB.id > after)
+    result = query.order_by(EmailDB.id).limit(limit + 1).all()
+
+    if len(result) > limit:
+        return Page(result[:limit], encode_cursor(str(result[limit - 1].id)))
+    return Page(result)
+
+
+def get_email_addresses(db: Session) -> List[str]:
+    return [row[0] for row in db.query(EmailDB.email).distinct() if row[0]]
+
+
+def create_email_batch(db: Session, emails: List[dict]) -> int:
+    inserted = 0
+    for start in range(0, len(emails), INSERT_CHUNK_SIZE):
+        result = db.execute(
+            sqlite_insert(EmailDB)
+            .on_conflict_do_nothing(index_elements=[EmailDB.email])
+            .returning(EmailDB.id),
+            emails[start : start + INSERT_CHUNK_SIZE],
+        )
+        inserted += len(result.all())
+    db.commit()
+    return inserted
@@ -0,0 +1,74 @@
+from typing import List
+from sqlalchemy import func, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.model.db_models.level import Level as LevelDB
+from app.model.db_models.level_daily import LevelDaily
+
+REBUILD_CHUNK_SIZE = 5000
+
+
+def add_to_level_daily(db: Session, levels: List[dict]):
+    days = {}
+    for level in levels:
+        key = (level["device_id"], level["date"].date())
+        value = level["level"]
+        row = days.get(key)
+        if row is None:
+            days[key] = {
+                "device_id": key[0],
+                "day": key[1],
+                "count": 1,
+                "sum": value,
+                "min": value,
+                "max": value,
+            }
+        else:
+            row["count"] += 1
+            row["sum"] += value
+            row["min"] = min(row["min"], value)
+            row["max"] = max(row["max"], value)
+
+    if not days:
+        return
+
+    stmt = sqlite_insert(LevelDaily)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[LevelDaily.device_id, LevelDaily.day],
+        set_={
+            "count": LevelDaily.count + stmt.excluded.count,
+            "sum": LevelDaily.sum + stmt.excluded.sum,
+            "min": func.min(LevelDaily.min, stmt.excluded.min),
+            "max": func.max(LevelDaily.max, stmt.excluded.max),
+        },
+    )
+    db.execute(stmt, list(days.values()))
+
+
+def _reset_level_daily(db: Session, levels: List[dict], reset: set):
+    days = {(row["device_id"], row["date"].date()) for row in levels} - reset
+    if days:
+        db.query(LevelDaily).filter(
+            tuple_(LevelDaily.device_id, LevelDaily.day).in_(days)
+        ).delete(synchronize_session=False)
+        reset.update(days)
+
+
+def rebuild_level_daily(db: Session):
+    reset = set()
+    rows = (
+        db.query(LevelDB.device_id, LevelDB.date, LevelDB.level)
+        .filter(LevelDB.level.is_not(None))
+        .order_by(LevelDB.device_id, LevelDB.date)
+        .yield_per(REBUILD_CHUNK_SIZE)
+    )
+    chunk = []
+    for device_id, date, level in rows:
+        chunk.append({"device_id": device_id, "date": date, "level": level})
+        if len(chunk) == REBUILD_CHUNK_SIZE:
+            _reset_level_daily(db, chunk, reset)
+            add_to_level_daily(db, chunk)
+            chunk = []
+    _reset_level_daily(db, chunk, reset)
+    add_to_level_daily(db, chunk)
+    db.commit()
@@ -0,0 +1,58 @@
+from datetime import datetime
+from typing import List
+from sqlalchemy import Integer, delete, func, literal_column, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.model.db_models.level_hourly import LevelHourly
+
+ROWID = literal_column("rowid", Integer)
+
+
+def add_to_level_hourly(db: Session, levels: List[dict]):
+    hours = {}
+    for level in levels:
+        key = (
+            level["device_id"],
+            level["date"].replace(minute=0, second=0, microsecond=0),
+        )
+        value = level["level"]
+        row = hours.get(key)
+        if row is None:
+            hours[key] = {
+                "device_id": key[0],
+                "hour": key[1],
+                "count": 1,
+                "sum": value,
+                "min": value,
+                "max": value,
+            }
+        else:
+            row["count"] += 1
+            row["sum"] += value
+            row["min"] = min(row["min"], value)
+            row["max"] = max(row["max"], value)
+
+    if not hours:
+        return
+
+    stmt = sqlite_insert(LevelHourly)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[LevelHourly.device_id, LevelHourly.hour],
+        set_={
+            "count": LevelHourly.count + stmt.excluded.count,
+            "sum": LevelHourly.sum + stmt.excluded.sum,
+            "min": func.min(LevelHourly.min, stmt.excluded.min),
+            "max": func.max(LevelHourly.max, stmt.excluded.max),
+        },
+    )
+    db.execute(stmt, list(hours.values()))
+
+
+def delete_level_hourly_before(db: Session, cutoff: datetime, batch_size: int) -> int:
+    batch = select(ROWID).where(LevelHourly.hour < cutoff).limit(batch_size)
+    deleted = db.execute(
+        delete(LevelHourly).where(ROWID.in_(batch.scalar_subquery())),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+    db.commit()
+    return deleted
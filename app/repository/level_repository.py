@@ -1,74 +1,233 @@
+import heapq
 from datetime import datetime, timedelta
-from sqlalchemy import func
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy import Integer, delete, insert, literal_column, select, tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from app.core.constants import HISTORY_PAGE_SIZE, INSERT_CHUNK_SIZE
+from app.core.columnar import to_columns
+from app.core.pagination import ColumnPage, Page, encode_cursor
+from app.core.utils import day_range, local_now
 from app.model.db_models.level import Level as LevelDB
-from app.model.level import Level
+from app.model.db_models.level_daily import LevelDaily
+from app.model.db_models.level_hourly import LevelHourly
+from app.repository.level_daily_repository import add_to_level_daily
+from app.repository.level_hourly_repository import add_to_level_hourly
 from uuid import UUID
 
+ROWID = literal_column("rowid", Integer)
+
 
 def get_level(db: Session, level_id: UUID):
     return db.query(LevelDB).filter(LevelDB.id == level_id).first()
 
 
-def create_level(db: Session, level: Level):
-    db_level = LevelDB(**level.dict())
+def create_level(db: Session, level: dict):
+    db_level = LevelDB(**level)
     db.add(db_level)
-    db.commit()
+    add_to_level_daily(db, [level])
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return None
     db.refresh(db_level)
-    return level
+    return db_level
+
+
+def create_level_batch(db: Session, levels: List[dict]):
+    inserted = []
+    for start in range(0, len(levels), INSERT_CHUNK_SIZE):
+        chunk = levels[start : start + INSERT_CHUNK_SIZE]
+        result = db.execute(
+            insert(LevelDB)
+            .prefix_with("OR IGNORE")
+            .returning(LevelDB.device_id, LevelDB.date.label("date"), LevelDB.level),
+            chunk,
+        )
+        inserted.extend(row._asdict() for row in result)
+    add_to_level_daily(db, inserted)
+    db.commit()
+    return inserted
 
 
-def get_last_n_avg_level_data(db: Session, n: int):
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=n)
+def get_last_n_avg_level_data(db: Session, device_id: int, n: int):
+    start_day = local_now().date() - timedelta(days=n - 1)
 
     result = (
         db.query(
-            func.strftime("%d/%m", LevelDB.date).label("date"),
-            func.avg(LevelDB.level).label("level"),
+            LevelDaily.day,
+            (LevelDaily.sum / LevelDaily.count).label("level"),
         )
-        .filter(LevelDB.date >= start_date)
-        .group_by(func.strftime("%d/%m", LevelDB.date))
-        .order_by(func.strftime("%Y-%m-%d", LevelDB.date).desc())
+        .filter(LevelDaily.device_id == device_id, LevelDaily.day >= start_day)
+        .order_by(LevelDaily.day.desc())
+        .limit(n)
         .all()
     )
 
-    return [{"date": r.date, "level": r.level} for r in result]
+    return [{"date": r.day.strftime("%d/%m"), "level": r.level} for r in result]
 
 
-def get_last_n_level_records(db: Session, n: int):
-    result = (
-        db.query(LevelDB.date, LevelDB.level)
-        .order_by(LevelDB.date.desc())
-        .limit(n)
-        .all()
+def get_last_n_level_records(
+    db: Session,
+    device_id: int,
+    n: int,
+    after: Optional[Tuple[datetime, int]] = None,
+    columnar: bool = False,
+):
+    query = db.query(LevelDB.date, LevelDB.level, ROWID).filter(
+        LevelDB.device_id == device_id
+    )
+    return _level_page(query, n, after, "%H:%M %d/%m/%y", columnar)
+
+
+def _level_page(
+    query,
+    limit: int,
+    after: Optional[Tuple[datetime, int]],
+    fmt: str,
+    columnar: bool = False,
+    rollups=None,
+):
+    if after is not None:
+        query = query.filter(tuple_(LevelDB.date, ROWID) < after)
+    result = query.order_by(LevelDB.date.desc(), ROWID.desc()).limit(limit + 1).all()
+    if rollups is not None:
+        rollups = rollups.add_columns((-ROWID).label("rowid")).order_by(ROWID)
+        if after is not None:
+            rollups = rollups.where(tuple_(LevelHourly.hour, -ROWID) < after)
+        hourly = query.session.execute(rollups.limit(limit + 1)).all()
+        result = list(
+            heapq.merge(result, hourly, key=lambda row: (row[0], row[2]), reverse=True)
+        )[: limit + 1]
+
+    next_cursor = None
+    if len(result) > limit:
+        result = result[:limit]
+        next_cursor = encode_cursor(result[-1][0], result[-1][2])
+    if columnar:
+        return ColumnPage(to_columns(result, ["level"]), next_cursor)
+    return Page(
+        [{"date": r[0].strftime(fmt), "level": r[1]} for r in result], next_cursor
     )
 
-    return [{"date": r[0].strftime("%H:%M %d/%m/%y"), "level": r[1]} for r in result]
 
+def _level_range_filter(
+    device_id: int, start_date: datetime, end_date: Optional[datetime]
+) -> list:
+    conditions = [LevelDB.device_id == device_id, LevelDB.date >= start_date]
+    if end_date is not None:
+        conditions.append(LevelDB.date < end_date)
+    return conditions
 
-def get_level_by_days(db: Session, days: int):
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
 
-    result = (
-        db.query(LevelDB.date, LevelDB.level)
-        .filter(LevelDB.date >= start_date)
-        .order_by(LevelDB.date.desc())
-        .all()
+def query_level_range(
+    db: Session, device_id: int, start_date: datetime, end_date: Optional[datetime]
+):
+    query = db.query(LevelDB.date, LevelDB.level).filter(
+        *_level_range_filter(device_id, start_date, end_date)
+    )
+    return query.order_by(LevelDB.date.desc())
+
+
+def select_level_range(
+    device_id: int, start_date: datetime, end_date: Optional[datetime]
+):
+    stmt = select(LevelDB.date, LevelDB.level).where(
+        *_level_range_filter(device_id, start_date, end_date)
+    )
+    return stmt.order_by(LevelDB.date.desc())
+
+
+def select_level_hourly_range(
+    device_id: int, start_date: datetime, end_date: Optional[datetime]
+):
+    conditions = [LevelHourly.device_id == device_id, LevelHourly.hour >= start_date]
+    if end_date is not None:
+        conditions.append(LevelHourly.hour < end_date)
+    stmt = select(
+        LevelHourly.hour, (LevelHourly.sum / LevelHourly.count).label("level")
+    ).where(*conditions)
+    return stmt.order_by(LevelHourly.hour.desc())
+
+
+def iter_level_range(
+    db: Session, device_id: int, start_date: datetime, end_date: Optional[datetime]
+) -> Iterator[tuple]:
+    hourly = db.execute(
+        select_level_hourly_range(device_id, start_date, end_date)
+    ).all()
+    rows = query_level_range(db, device_id, start_date, end_date).yield_per(1000)
+    return heapq.merge(rows, hourly, key=lambda row: row[0], reverse=True)
+
+
+def get_level_by_days(
+    db: Session,
+    device_id: int,
+    days: int,
+    limit: int = HISTORY_PAGE_SIZE,
+    after: Optional[Tuple[datetime, int]] = None,
+    columnar: bool = False,
+):
+    start_date = local_now() - timedelta(days=days)
+    return get_level_by_range(db, device_id, start_date, None, limit, after, columnar)
+
+
+def get_level_by_range(
+    db: Session,
+    device_id: int,
+    start_date: datetime,
+    end_date: Optional[datetime],
+    limit: int = HISTORY_PAGE_SIZE,
+    after: Optional[Tuple[datetime, int]] = None,
+    columnar: bool = False,
+):
+    query = db.query(LevelDB.date, LevelDB.level, ROWID).filter(
+        *_level_range_filter(device_id, start_date, end_date)
     )
+    rollups = select_level_hourly_range(device_id, start_date, end_date)
+    return _level_page(query, limit, after, "%d/%m/%Y %H:%M", columnar, rollups)
 
-    return [{"date": r[0].strftime("%d/%m/%Y %H:%M"), "level": r[1]} for r in result]
 
+def get_level_by_date(db: Session, device_id: int, date: str, columnar: bool = False):
+    start_date, end_date = day_range(datetime.strptime(date, "%d%m%Y").date())
+    result = list(iter_level_range(db, device_id, start_date, end_date))
+    if columnar:
+        return to_columns(result, ["level"])
 
-def get_level_by_date(db: Session, date: str):
-    date_obj = datetime.strptime(date, "%d%m%Y").date()
+    return [{"date": r[0].strftime("%H:%M"), "level": r[1]} for r in result]
 
-    result = (
-        db.query(LevelDB.date, LevelDB.level)
-        .filter(func.date(LevelDB.date) == date_obj)
-        .order_by(LevelDB.date.desc())
-        .all()
+
+def get_level_device_ids(db: Session) -> List[int]:
+    return [row[0] for row in db.query(LevelDB.device_id).distinct()]
+
+
+def compact_level_batch(
+    db: Session, device_id: int, cutoff: datetime, batch_size: int
+) -> int:
+    batch = (
+        select(ROWID)
+        .where(LevelDB.device_id == device_id, LevelDB.date < cutoff)
+        .order_by(LevelDB.date)
+        .limit(batch_size)
+    )
+    result = db.execute(
+        delete(LevelDB)
+        .where(ROWID.in_(batch.scalar_subquery()))
+        .returning(LevelDB.device_id, LevelDB.date.label("date"), LevelDB.level),
+        execution_options={"synchronize_session": False},
     )
+    removed = [row._asdict() for row in result]
+    add_to_level_hourly(db, [row for row in removed if row["level"] is not None])
+    db.commit()
+    return len(removed)
 
-    return [{"date": r[0].strftime("%H:%M"), "level": r[1]} for r in result]
+
+def delete_level_batch(db: Session, batch_size: int) -> int:
+    batch = select(ROWID).select_from(LevelDB).limit(batch_size)
+    deleted = db.execute(
+        delete(LevelDB).where(ROWID.in_(batch.scalar_subquery())),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+    db.commit()
+    return deleted
@@ -0,0 +1,41 @@
+from typing import List
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+def get_pragma(db: Session, name: str):
+    return db.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def incremental_vacuum_enabled(db: Session) -> bool:
+    return get_pragma(db, "auto_vacuum") == AUTO_VACUUM_INCREMENTAL
+
+
+def incremental_vacuum(db: Session, pages: int) -> int:
+    before = get_pragma(db, "freelist_count")
+    db.commit()
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.executescript(f"PRAGMA incremental_vacuum({int(pages)})")
+    finally:
+        cursor.close()
+    db.commit()
+    return before - get_pragma(db, "freelist_count")
+
+
+def analyze_tables(db: Session, tables: List[str], analysis_limit: int):
+    db.execute(text(f"PRAGMA analysis_limit={int(analysis_limit)}"))
+    for table in tables:
+        db.execute(text(f'ANALYZE "{table}"'))
+    db.execute(text("PRAGMA analysis_limit=0"))
+    db.commit()
+
+
+def enable_incremental_vacuum(db: Session):
+    db.commit()
+    db.execute(text("PRAGMA auto_vacuum=INCREMENTAL"))
+    db.commit()
+    db.connection().exec_driver_sql("VACUUM")
+    db.commit()
@@ -1,6 +1,11 @@
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app.model.db_models.phone import Phone
 from uuid import UUID
+from typing import List, Optional
+from app.core.constants import INSERT_CHUNK_SIZE, PAGE_SIZE
+from app.core.pagination import Page, encode_cursor
 
 
 def get_phone(db: Session, phone_id: UUID):
@@ -10,10 +15,39 @@ def get_phone(db: Session, phone_id: UUID):
 def create_phone(db: Session, phone: Phone):
     db_phone = Phone(**phone.dict())
     db.add(db_phone)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return None
     db.refresh(db_phone)
     return db_phone
 
 
-def get_all_phones(db: Session):
-    return db.query(Phone).all()
+def get_all_phones(db: Session, limit: int = PAGE_SIZE, after: Optional[UUID] = None):
+    query = db.query(Phone)
+    if after is not None:
+        query = query.filter(Phone.id > after)
+    result = query.order_by(Phone.id).limit(limit + 1).all()
+
+    if len(result) > limit:
+        return Page(result[:limit], encode_cursor(str(result[limit - 1].id)))
+    return Page(result)
+
+
+def get_phone_numbers(db: Session) -> List[str]:
+    return [row[0] for row in db.query(Phone.number).distinct() if row[0]]
+
+
+def create_phone_batch(db: Session, phones: List[dict]) -> int:
+    inserted = 0
+    for start in range(0, len(phones), INSERT_CHUNK_SIZE):
+        result = db.execute(
+            sqlite_insert(Phone)
+            .on_conflict_do_nothing(index_elements=[Phone.number])
+            .returning(Phone.id),
+            phones[start : start + INSERT_CHUNK_SIZE],
+        )
+        inserted += len(result.all())
+    db.commit()
+    return inserted
@@ -0,0 +1,96 @@
+from typing import List
+from sqlalchemy import func, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.model.db_models.sensor_data import SensorData
+from app.model.db_models.sensor_daily import SensorDaily
+
+REBUILD_CHUNK_SIZE = 5000
+
+
+def add_to_sensor_daily(db: Session, sensor_data: List[dict]):
+    days = {}
+    for data in sensor_data:
+        key = (data["device_id"], data["date"].date())
+        temp = data["temperature"]
+        humi = data["humidity"]
+        row = days.get(key)
+        if row is None:
+            days[key] = {
+                "device_id": key[0],
+                "day": key[1],
+                "count": 1,
+                "temp_sum": temp,
+                "temp_min": temp,
+                "temp_max": temp,
+                "humi_sum": humi,
+                "humi_min": humi,
+                "humi_max": humi,
+            }
+        else:
+            row["count"] += 1
+            row["temp_sum"] += temp
+            row["temp_min"] = min(row["temp_min"], temp)
+            row["temp_max"] = max(row["temp_max"], temp)
+            row["humi_sum"] += humi
+            row["humi_min"] = min(row["humi_min"], humi)
+            row["humi_max"] = max(row["humi_max"], humi)
+
+    if not days:
+        return
+
+    stmt = sqlite_insert(SensorDaily)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SensorDaily.device_id, SensorDaily.day],
+        set_={
+            "count": SensorDaily.count + stmt.excluded.count,
+            "temp_sum": SensorDaily.temp_sum + stmt.excluded.temp_sum,
+            "temp_min": func.min(SensorDaily.temp_min, stmt.excluded.temp_min),
+            "temp_max": func.max(SensorDaily.temp_max, stmt.excluded.temp_max),
+            "humi_sum": SensorDaily.humi_sum + stmt.excluded.humi_sum,
+            "humi_min": func.min(SensorDaily.humi_min, stmt.excluded.humi_min),
+            "humi_max": func.max(SensorDaily.humi_max, stmt.excluded.humi_max),
+        },
+    )
+    db.execute(stmt, list(days.values()))
+
+
+def _reset_sensor_daily(db: Session, sensor_data: List[dict], reset: set):
+    days = {(row["device_id"], row["date"].date()) for row in sensor_data} - reset
+    if days:
+        db.query(SensorDaily).filter(
+            tuple_(SensorDaily.device_id, SensorDaily.day).in_(days)
+        ).delete(synchronize_session=False)
+        reset.update(days)
+
+
+def rebuild_sensor_daily(db: Session):
+    reset = set()
+    rows = (
+        db.query(
+            SensorData.device_id,
+            SensorData.date,
+            SensorData.temperature,
+            SensorData.humidity,
+        )
+        .filter(SensorData.temperature.is_not(None), SensorData.humidity.is_not(None))
+        .order_by(SensorData.device_id, SensorData.date)
+        .yield_per(REBUILD_CHUNK_SIZE)
+    )
+    chunk = []
+    for device_id, date, temperature, humidity in rows:
+        chunk.append(
+            {
+                "device_id": device_id,
+                "date": date,
+                "temperature": temperature,
+                "humidity": humidity,
+            }
+        )
+        if len(chunk) == REBUILD_CHUNK_SIZE:
+            _reset_sensor_daily(db, chunk, reset)
+            add_to_sensor_daily(db, chunk)
+            chunk = []
+    _reset_sensor_daily(db, chunk, reset)
+    add_to_sensor_daily(db, chunk)
+    db.commit()
@@ -1,84 +1,266 @@
+import heapq
 from datetime import datetime, timedelta
-from sqlalchemy import func
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy import Integer, delete, func, insert, literal_column, select, tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from app.core.constants import HISTORY_PAGE_SIZE, INSERT_CHUNK_SIZE
+from app.core.columnar import to_columns
+from app.core.pagination import ColumnPage, Page, encode_cursor
+from app.core.utils import day_range, local_now
 from app.model.db_models.sensor_data import SensorData
+from app.model.db_models.sensor_daily import SensorDaily
+from app.model.db_models.sensor_hourly import SensorHourly
+from app.repository.sensor_daily_repository import add_to_sensor_daily
+from app.repository.sensor_hourly_repository import add_to_sensor_hourly
 from uuid import UUID
 
+ROWID = literal_column("rowid", Integer)
+
 
 def get_sensor_data(db: Session, sensor_data_id: UUID):
     return db.query(SensorData).filter(SensorData.id == sensor_data_id).first()
 
 
-def create_sensor_data(
-    db: Session, temperature: float, humidity: float, date: datetime
-):
-    sensor_data = SensorData(temperature=temperature, humidity=humidity, date=date)
-    db.add(sensor_data)
-    db.commit()
-    db.refresh(sensor_data)
-    return sensor_data
-
+def create_sensor_data(db: Session, sensor_data: dict):
+    db_sensor_data = SensorData(**sensor_data)
+    db.add(db_sensor_data)
+    add_to_sensor_daily(db, [sensor_data])
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return None
+    db.refresh(db_sensor_data)
+    return db_sensor_data
 
-def get_last_n_avg_sensor_data(db: Session, n: int):
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=n)
 
-    result = (
-        db.query(
-            func.strftime("%d/%m", SensorData.date).label("date"),
-            func.round(func.avg(SensorData.temperature), 1).label("temp"),
-            func.round(func.avg(SensorData.humidity), 1).label("humi"),
+def create_sensor_data_batch(db: Session, sensor_data: List[dict]):
+    inserted = []
+    for start in range(0, len(sensor_data), INSERT_CHUNK_SIZE):
+        chunk = sensor_data[start : start + INSERT_CHUNK_SIZE]
+        result = db.execute(
+            insert(SensorData)
+            .prefix_with("OR IGNORE")
+            .returning(
+                SensorData.device_id,
+                SensorData.date.label("date"),
+                SensorData.temperature,
+                SensorData.humidity,
+            ),
+            chunk,
         )
-        .filter(SensorData.date >= start_date)
-        .group_by(func.strftime("%d/%m", SensorData.date))
-        .order_by(func.strftime("%Y-%m-%d", SensorData.date).desc())
-        .all()
-    )
+        inserted.extend(row._asdict() for row in result)
+    add_to_sensor_daily(db, inserted)
+    db.commit()
+    return inserted
 
-    return [{"date": r.date, "temp": r.temp, "humi": r.humi} for r in result]
 
+def get_last_n_avg_sensor_data(db: Session, device_id: int, n: int):
+    start_day = local_now().date() - timedelta(days=n - 1)
 
-def get_last_n_sensor_data_records(db: Session, n: int):
     result = (
-        db.query(SensorData.date, SensorData.temperature, SensorData.humidity)
-        .order_by(SensorData.date.desc())
+        db.query(
+            SensorDaily.day,
+            func.round(SensorDaily.temp_sum / SensorDaily.count, 1).label("temp"),
+            func.round(SensorDaily.humi_sum / SensorDaily.count, 1).label("humi"),
+        )
+        .filter(SensorDaily.device_id == device_id, SensorDaily.day >= start_day)
+        .order_by(SensorDaily.day.desc())
         .limit(n)
         .all()
     )
 
     return [
-        {"date": r[0].strftime("%H:%M %d/%m/%y"), "temp": r[1], "humi": r[2]}
+        {"date": r.day.strftime("%d/%m"), "temp": r.temp, "humi": r.humi}
         for r in result
     ]
 
 
-def get_sensor_data_by_days(db: Session, days: int):
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
+def get_last_n_sensor_data_records(
+    db: Session,
+    device_id: int,
+    n: int,
+    after: Optional[Tuple[datetime, int]] = None,
+    columnar: bool = False,
+):
+    query = db.query(
+        SensorData.date, SensorData.temperature, SensorData.humidity, ROWID
+    ).filter(SensorData.device_id == device_id)
+    return _sensor_data_page(query, n, after, "%H:%M %d/%m/%y", columnar)
 
-    result = (
-        db.query(SensorData.date, SensorData.temperature, SensorData.humidity)
-        .filter(SensorData.date >= start_date)
-        .order_by(SensorData.date.desc())
-        .all()
+
+def _sensor_data_page(
+    query,
+    limit: int,
+    after: Optional[Tuple[datetime, int]],
+    fmt: str,
+    columnar: bool = False,
+    rollups=None,
+):
+    if after is not None:
+        query = query.filter(tuple_(SensorData.date, ROWID) < after)
+    result = query.order_by(SensorData.date.desc(), ROWID.desc()).limit(limit + 1).all()
+    if rollups is not None:
+        rollups = rollups.add_columns((-ROWID).label("rowid")).order_by(ROWID)
+        if after is not None:
+            rollups = rollups.where(tuple_(SensorHourly.hour, -ROWID) < after)
+        hourly = query.session.execute(rollups.limit(limit + 1)).all()
+        result = list(
+            heapq.merge(result, hourly, key=lambda row: (row[0], row[3]), reverse=True)
+        )[: limit + 1]
+
+    next_cursor = None
+    if len(result) > limit:
+        result = result[:limit]
+        next_cursor = encode_cursor(result[-1][0], result[-1][3])
+    if columnar:
+        return ColumnPage(to_columns(result, ["temp", "humi"]), next_cursor)
+    return Page(
+        [{"date": r[0].strftime(fmt), "temp": r[1], "humi": r[2]} for r in result],
+        next_cursor,
     )
 
-    return [
-        {"date": r[0].strftime("%d/%m/%Y %H:%M"), "temp": r[1], "humi": r[2]}
-        for r in result
+
+def _sensor_data_range_filter(
+    device_id: int, start_date: datetime, end_date: Optional[datetime]
+) -> list:
+    conditions = [SensorData.device_id == device_id, SensorData.date >= start_date]
+    if end_date is not None:
+        conditions.append(SensorData.date < end_date)
+    return conditions
+
+
+def query_sensor_data_range(
+    db: Session, device_id: int, start_date: datetime, end_date: Optional[datetime]
+):
+    query = db.query(
+        SensorData.date, SensorData.temperature, SensorData.humidity
+    ).filter(*_sensor_data_range_filter(device_id, start_date, end_date))
+    return query.order_by(SensorData.date.desc())
+
+
+def select_sensor_data_range(
+    device_id: int, start_date: datetime, end_date: Optional[datetime]
+):
+    stmt = select(SensorData.date, SensorData.temperature, SensorData.humidity).where(
+        *_sensor_data_range_filter(device_id, start_date, end_date)
+    )
+    return stmt.order_by(SensorData.date.desc())
+
+
+def select_sensor_hourly_range(
+    device_id: int, start_date: datetime, end_date: Optional[datetime]
+):
+    conditions = [
+        SensorHourly.device_id == device_id,
+        SensorHourly.hour >= start_date,
     ]
+    if end_date is not None:
+        conditions.append(SensorHourly.hour < end_date)
+    stmt = select(
+        SensorHourly.hour,
+        (SensorHourly.temp_sum / SensorHourly.count).label("temperature"),
+        (SensorHourly.humi_sum / SensorHourly.count).label("humidity"),
+    ).where(*conditions)
+    return stmt.order_by(SensorHourly.hour.desc())
 
 
-def get_sensor_data_by_date(db: Session, date: str):
-    date_obj = datetime.strptime(date, "%d%m%Y").date()
+def iter_sensor_data_range(
+    db: Session, device_id: int, start_date: datetime, end_date: Optional[datetime]
+) -> Iterator[tuple]:
+    hourly = db.execute(
+        select_sensor_hourly_range(device_id, start_date, end_date)
+    ).all()
+    rows = query_sensor_data_range(db, device_id, start_date, end_date).yield_per(1000)
+    return heapq.merge(rows, hourly, key=lambda row: row[0], reverse=True)
 
-    result = (
-        db.query(SensorData.date, SensorData.temperature, SensorData.humidity)
-        .filter(func.date(SensorData.date) == date_obj)
-        .order_by(SensorData.date.desc())
-        .all()
+
+def get_sensor_data_by_days(
+    db: Session,
+    device_id: int,
+    days: int,
+    limit: int = HISTORY_PAGE_SIZE,
+    after: Optional[Tuple[datetime, int]] = None,
+    columnar: bool = False,
+):
+    start_date = local_now() - timedelta(days=days)
+    return get_sensor_data_by_range(
+        db, device_id, start_date, None, limit, after, columnar
     )
 
+
+def get_sensor_data_by_range(
+    db: Session,
+    device_id: int,
+    start_date: datetime,
+    end_date: Optional[datetime],
+    limit: int = HISTORY_PAGE_SIZE,
+    after: Optional[Tuple[datetime, int]] = None,
+    columnar: bool = False,
+):
+    query = db.query(
+        SensorData.date, SensorData.temperature, SensorData.humidity, ROWID
+    ).filter(*_sensor_data_range_filter(device_id, start_date, end_date))
+    rollups = select_sensor_hourly_range(device_id, start_date, end_date)
+    return _sensor_data_page(query, limit, after, "%d/%m/%Y %H:%M", columnar, rollups)
+
+
+def get_sensor_data_by_date(
+    db: Session, device_id: int, date: str, columnar: bool = False
+):
+    start_date, end_date = day_range(datetime.strptime(date, "%d%m%Y").date())
+    result = list(iter_sensor_data_range(db, device_id, start_date, end_date))
+    if columnar:
+        return to_columns(result, ["temp", "humi"])
+
     return [
         {"date": r[0].strftime("%H:%M"), "temp": r[1], "humi": r[2]} for r in result
     ]
+
+
+def get_sensor_data_device_ids(db: Session) -> List[int]:
+    return [row[0] for row in db.query(SensorData.device_id).distinct()]
+
+
+def compact_sensor_data_batch(
+    db: Session, device_id: int, cutoff: datetime, batch_size: int
+) -> int:
+    batch = (
+        select(ROWID)
+        .where(SensorData.device_id == device_id, SensorData.date < cutoff)
+        .order_by(SensorData.date)
+        .limit(batch_size)
+    )
+    result = db.execute(
+        delete(SensorData)
+        .where(ROWID.in_(batch.scalar_subquery()))
+        .returning(
+            SensorData.device_id,
+            SensorData.date.label("date"),
+            SensorData.temperature,
+            SensorData.humidity,
+        ),
+        execution_options={"synchronize_session": False},
+    )
+    removed = [row._asdict() for row in result]
+    add_to_sensor_hourly(
+        db,
+        [
+            row
+            for row in removed
+            if row["temperature"] is not None and row["humidity"] is not None
+        ],
+    )
+    db.commit()
+    return len(removed)
+
+
+def delete_sensor_data_batch(db: Session, batch_size: int) -> int:
+    batch = select(ROWID).select_from(SensorData).limit(batch_size)
+    deleted = db.execute(
+        delete(SensorData).where(ROWID.in_(batch.scalar_subquery())),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+    db.commit()
+    return deleted
@@ -0,0 +1,68 @@
+from datetime import datetime
+from typing import List
+from sqlalchemy import Integer, delete, func, literal_column, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.model.db_models.sensor_hourly import SensorHourly
+
+ROWID = literal_column("rowid", Integer)
+
+
+def add_to_sensor_hourly(db: Session, sensor_data: List[dict]):
+    hours = {}
+    for data in sensor_data:
+        key = (
+            data["device_id"],
+            data["date"].replace(minute=0, second=0, microsecond=0),
+        )
+        temp = data["temperature"]
+        humi = data["humidity"]
+        row = hours.get(key)
+        if row is None:
+            hours[key] = {
+                "device_id": key[0],
+                "hour": key[1],
+                "count": 1,
+                "temp_sum": temp,
+                "temp_min": temp,
+                "temp_max": temp,
+                "humi_sum": humi,
+                "humi_min": humi,
+                "humi_max": humi,
+            }
+        else:
+            row["count"] += 1
+            row["temp_sum"] += temp
+            row["temp_min"] = min(row["temp_min"], temp)
+            row["temp_max"] = max(row["temp_max"], temp)
+            row["humi_sum"] += humi
+            row["humi_min"] = min(row["humi_min"], humi)
+            row["humi_max"] = max(row["humi_max"], humi)
+
+    if not hours:
+        return
+
+    stmt = sqlite_insert(SensorHourly)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SensorHourly.device_id, SensorHourly.hour],
+        set_={
+            "count": SensorHourly.count + stmt.excluded.count,
+            "temp_sum": SensorHourly.temp_sum + stmt.excluded.temp_sum,
+            "temp_min": func.min(SensorHourly.temp_min, stmt.excluded.temp_min),
+            "temp_max": func.max(SensorHourly.temp_max, stmt.excluded.temp_max),
+            "humi_sum": SensorHourly.humi_sum + stmt.excluded.humi_sum,
+            "humi_min": func.min(SensorHourly.humi_min, stmt.excluded.humi_min),
+            "humi_max": func.max(SensorHourly.humi_max, stmt.excluded.humi_max),
+        },
+    )
+    db.execute(stmt, list(hours.values()))
+
+
+def delete_sensor_hourly_before(db: Session, cutoff: datetime, batch_size: int) -> int:
+    batch = select(ROWID).where(SensorHourly.hour < cutoff).limit(batch_size)
+    deleted = db.execute(
+        delete(SensorHourly).where(ROWID.in_(batch.scalar_subquery())),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+    db.commit()
+    return deleted
@@ -0,0 +1,44 @@
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from app.core.cache import device_cache
+from app.core.watermark import device_watermark
+from app.model.device import Device
+from app.repository import device_repository
+from app.repository.data_version_repository import bump_data_version
+
+
+class DeviceService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _devices_changed(self):
+        device_watermark.advance(*bump_data_version(self.db, "devices"))
+
+    def get_device(self, device_id: int) -> Optional[Device]:
+        return device_cache.get_or_compute(
+            device_id, lambda: device_repository.get_device(self.db, device_id)
+        )
+
+    def get_all_devices(self) -> List[Device]:
+        return device_repository.get_all_devices(self.db)
+
+    def add_device(self, name: str, capacity: float, distance_full: float):
+        if distance_full >= capacity:
+            return {"error": "'distance_full' must be lower than 'capacity'."}
+        device = device_repository.create_device(
+            self.db,
+            {"name": name, "capacity": capacity, "distance_full": distance_full},
+        )
+        self._devices_changed()
+        return device
+
+    def update_device(self, device_id: int, fields: dict):
+        device = self.get_device(device_id)
+        if device is None:
+            return None
+        capacity = fields.get("capacity", device.capacity)
+        if fields.get("distance_full", device.distance_full) >= capacity:
+            return {"error": "'distance_full' must be lower than 'capacity'."}
+        device = device_repository.update_device(self.db, device_id, fields)
+        self._devices_changed()
+        return device
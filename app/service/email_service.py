@@ -1,11 +1,10 @@
-import uuid
-
 from sqlalchemy.orm import Session
 from app.repository import email_repository
 from app.model.email import Email
 from app.model.db_models.email import Email as EmailDB
-from typing import List, Union
-from uuid import uuid4
+from typing import List, Optional, Union
+from uuid import UUID, uuid4
+from app.core.constants import PAGE_SIZE
 from app.core.utils import generate_random_email, generate_random_name
 
 
@@ -18,18 +17,38 @@ class EmailService:
         if existing_email:
             return {"error": f"Email '{email}' already exists."}
         email_data = Email(id=uuid4(), name=name, email=email)
-        return email_repository.create_email(self.db, email_data)
+        created = email_repository.create_email(self.db, email_data)
+        if created is None:
+            return {"error": f"Email '{email}' already exists."}
+        return created
 
-    def get_all_emails(self) -> List[Email]:
-        return email_repository.get_all_emails(self.db)
+    def import_emails(self, contacts: List[dict]) -> dict:
+        emails, rejected = {}, []
+        for index, contact in enumerate(contacts):
+            if not contact["name"] or not contact["email"]:
+                rejected.append(
+                    {"index": index, "detail": "Name and email are required."}
+                )
+                continue
+            emails.setdefault(contact["email"], contact)
+        inserted = email_repository.create_email_batch(self.db, list(emails.values()))
+        return {
+            "inserted": inserted,
+            "skipped": len(contacts) - len(rejected) - inserted,
+            "rejected": rejected,
+        }
+
+    def get_all_emails(
+        self, limit: int = PAGE_SIZE, after: Optional[UUID] = None
+    ) -> List[Email]:
+        return email_repository.get_all_emails(self.db, limit, after)
 
     def generate_email_data(self, n: int):
+        emails = []
         for _ in range(n):
             name = generate_random_name()
-            email_address = generate_random_email(name)
-            email = EmailDB(id=uuid.uuid4(), name=name, email=email_address)
-            self.db.add(email)
-        self.db.commit()
+            emails.append({"name": name, "email": generate_random_email(name)})
+        email_repository.create_email_batch(self.db, emails)
 
     def delete_all_email_data(self):
         self.db.query(EmailDB).delete()
@@ -1,77 +1,349 @@
-import random
+from collections import Counter
+from typing import List, Optional, Tuple
 from sqlalchemy.orm import Session
-from app.model.level import Level
-from zoneinfo import ZoneInfo
+from app.model.level_response import LevelResponse
 from datetime import datetime, timedelta
 from app.repository.level_repository import (
     create_level,
+    create_level_batch,
+    delete_level_batch,
     get_last_n_avg_level_data,
     get_last_n_level_records,
     get_level_by_days,
     get_level_by_date,
+    get_level_by_range,
+    iter_level_range,
+    select_level_range,
+    select_level_hourly_range,
 )
-from app.model.db_models.level import Level as LevelDB
-from app.core.utils import calculate_comedouro_level
-from datetime import datetime, timedelta
-import uuid
+from app.model.db_models.level_daily import LevelDaily
+from app.model.db_models.level_hourly import LevelHourly
+from app.core.constants import (
+    COMEDOURO_ID,
+    DELETE_BATCH_SIZE,
+    GENERATE_CHUNK_SIZE,
+    GENERATE_DAYS,
+    GENERATE_INTERVAL,
+    GENERATE_MAX_ROWS,
+    HISTORY_PAGE_SIZE,
+)
+from app.alerts.detector import level_alarm
+from app.alerts.dispatcher import alert_dispatcher
+from app.core.cache import level_cache
+from app.core.dedupe import reading_dedupe
+from app.core.watermark import level_watermark
+from app.repository.data_version_repository import bump_data_version
+from app.core.columnar import to_columns
+from app.core.downsampling import minmax_downsample
+from app.core.export import stream_rows
+from app.core.synthetic import level_chunks, sample_count
+from app.core.utils import (
+    calculate_comedouro_level,
+    local_now,
+    reading_error,
+    to_local,
+    to_millis,
+)
+from app.service.device_service import DeviceService
 
 
 class LevelService:
     def __init__(self, db: Session):
         self.db = db
 
-    def handle_level(self, level_value: float):
-        calculated_level = calculate_comedouro_level(level_value)
-        level_data = Level(
-            id=uuid.uuid4(),
-            level=calculated_level,
-            date=datetime.now(ZoneInfo("America/Fortaleza")),
-        )
-        create_level(self.db, level_data)
-        return level_data
+    def _data_changed(self):
+        level_watermark.advance(*bump_data_version(self.db, "levels"))
 
-    def delete_all_level_data(self):
-        self.db.query(LevelDB).delete()
-        self.db.commit()
+    def handle_level(
+        self,
+        level_value: float,
+        device_id: int = COMEDOURO_ID,
+        date: Optional[datetime] = None,
+    ):
+        date = to_local(date)
+        error = reading_error((level_value,), date, local_now())
+        if error is not None:
+            return {"invalid": error}
+        level_data = self.build_level(level_value, device_id)
+        if level_data is None:
+            return {"error": f"Device {device_id} not found."}
+        key = (device_id, (level_value,), date)
+        if reading_dedupe.seen("level", *key):
+            return {"duplicate": "Reading already received."}
+        if date is not None:
+            level_data["date"] = date
+        stored = create_level(self.db, level_data)
+        reading_dedupe.remember("level", *key)
+        if stored is None:
+            return {"duplicate": "Reading already stored."}
+        self._data_changed()
+        self._check_alerts([level_data])
+        return LevelResponse(level=level_data["level"], date=str(level_data["date"]))
 
-    def generate_level_data(self):
-        tz = ZoneInfo("America/Fortaleza")
-        now = datetime.now(tz)
-        end_date = now
-        start_date = end_date - timedelta(days=31)
-        current_date = start_date
+    def build_level(
+        self, level_value: float, device_id: int = COMEDOURO_ID
+    ) -> Optional[dict]:
+        device = DeviceService(self.db).get_device(device_id)
+        if device is None:
+            return None
+        return {
+            "device_id": device_id,
+            "level": calculate_comedouro_level(
+                level_value, device.capacity, device.distance_full
+            ),
+            "date": local_now(),
+        }
 
-        delta_times = [timedelta(hours=-6), timedelta(hours=-3)]
+    def handle_level_batch(
+        self, readings: List[Tuple[float, Optional[datetime], int]]
+    ) -> List[dict]:
+        now = local_now()
+        levels, results, pending, keys = [], [], [], set()
+        for index, (level_value, date, device_id) in enumerate(readings):
+            date = to_local(date)
+            error = reading_error((level_value,), date, now)
+            if error is None:
+                level_data = self.build_level(level_value, device_id)
+                if level_data is None:
+                    error = f"Device {device_id} not found."
+            if error is not None:
+                results.append({"index": index, "status": "rejected", "detail": error})
+                continue
 
-        while current_date <= end_date:
-            for delta in delta_times:
-                measurement_time = (
-                    datetime.combine(current_date.date(), now.time(), tzinfo=tz) + delta
+            key = (device_id, (level_value,), date)
+            if (date is not None and key in keys) or reading_dedupe.seen("level", *key):
+                results.append(
+                    {
+                        "index": index,
+                        "status": "duplicate",
+                        "detail": "Reading already received.",
+                    }
                 )
+                continue
 
-                if measurement_time > now:
-                    continue
+            keys.add(key)
+            if date is not None:
+                level_data["date"] = date
+            levels.append(level_data)
+            pending.append({"index": index})
+            results.append(pending[-1])
 
-                raw_level = round(random.uniform(2.0, 25.0), 1)
-                calculated_level = calculate_comedouro_level(raw_level)
+        if levels:
+            inserted = Counter(
+                self._row_key(level) for level in self.save_levels(levels)
+            )
+            for key in keys:
+                reading_dedupe.remember("level", *key)
+            for result, level in zip(pending, levels):
+                row_key = self._row_key(level)
+                if inserted[row_key]:
+                    inserted[row_key] -= 1
+                    result.update(
+                        status="saved",
+                        device_id=level["device_id"],
+                        level=level["level"],
+                        date=str(level["date"]),
+                    )
+                else:
+                    result.update(status="duplicate", detail="Reading already stored.")
+        return results
 
-                level_data = LevelDB(
-                    id=uuid.uuid4(), level=calculated_level, date=measurement_time
-                )
-                self.db.add(level_data)
+    def save_levels(self, levels: List[dict]) -> List[dict]:
+        inserted = create_level_batch(self.db, levels)
+        if inserted:
+            self._data_changed()
+            self._check_alerts(inserted)
+        return inserted
 
-            current_date += timedelta(days=1)
+    @staticmethod
+    def _row_key(level: dict) -> tuple:
+        return level["device_id"], to_millis(level["date"]), level["level"]
 
+    def _check_alerts(self, levels: List[dict]):
+        for level in sorted(levels, key=lambda level: level["date"]):
+            kind = level_alarm.observe(
+                level["device_id"], level["level"], level["date"]
+            )
+            if kind is None:
+                continue
+            device = DeviceService(self.db).get_device(level["device_id"])
+            alert_dispatcher.submit(
+                {
+                    "kind": kind,
+                    "device_id": level["device_id"],
+                    "device_name": device.name if device else level["device_id"],
+                    "level": level["level"],
+                    "date": level["date"],
+                }
+            )
+
+    def delete_all_level_data(self):
+        while delete_level_batch(self.db, DELETE_BATCH_SIZE):
+            pass
+        self.db.query(LevelDaily).delete()
+        self.db.query(LevelHourly).delete()
         self.db.commit()
+        self._data_changed()
 
-    def get_last_n_avg_level(self, n: int):
-        return get_last_n_avg_level_data(self.db, n)
+    def generate_level_data(
+        self,
+        days: int = GENERATE_DAYS,
+        interval: int = GENERATE_INTERVAL,
+        devices: int = 1,
+        seed: Optional[int] = None,
+    ):
+        targets = DeviceService(self.db).get_all_devices()[:devices]
+        if len(targets) < devices:
+            return {"error": f"Only {len(targets)} devices are registered."}
+        count = sample_count(days, interval)
+        if count * devices > GENERATE_MAX_ROWS:
+            return {"error": f"At most {GENERATE_MAX_ROWS} readings can be generated."}
 
-    def get_last_n_level_records(self, n: int):
-        return get_last_n_level_records(self.db, n)
+        start = local_now() - timedelta(seconds=interval * (count - 1))
+        generated = 0
+        for device in targets:
+            device_seed = None if seed is None else seed + device.id
+            for chunk in level_chunks(
+                device.id, start, interval, count, GENERATE_CHUNK_SIZE, device_seed
+            ):
+                generated += len(create_level_batch(self.db, chunk))
+        if generated:
+            self._data_changed()
+        return generated
+
+    def get_last_n_avg_level(self, device_id: int, n: int):
+        return level_cache.get_or_compute(
+            ("avg", device_id, n),
+            lambda: get_last_n_avg_level_data(self.db, device_id, n),
+        )
 
-    def get_level_by_days(self, days: int):
-        return get_level_by_days(self.db, days)
+    def get_last_n_level_records(
+        self,
+        device_id: int,
+        n: int,
+        after: Optional[Tuple[datetime, int]] = None,
+        columnar: bool = False,
+    ):
+        return level_cache.get_or_compute(
+            ("last", device_id, n, after, columnar),
+            lambda: get_last_n_level_records(self.db, device_id, n, after, columnar),
+        )
+
+    def get_level_by_days(
+        self,
+        device_id: int,
+        days: int,
+        max_points: Optional[int] = None,
+        limit: int = HISTORY_PAGE_SIZE,
+        after: Optional[Tuple[datetime, int]] = None,
+        columnar: bool = False,
+    ):
+        return level_cache.get_or_compute(
+            ("days", device_id, days, max_points, limit, after, columnar),
+            lambda: self._get_level_by_days(
+                device_id, days, max_points, limit, after, columnar
+            ),
+        )
 
-    def get_level_by_date(self, date: str):
-        return get_level_by_date(self.db, date)
+    def _get_level_by_days(
+        self,
+        device_id: int,
+        days: int,
+        max_points: Optional[int],
+        limit: int,
+        after: Optional[Tuple[datetime, int]],
+        columnar: bool,
+    ):
+        if max_points is None:
+            return get_level_by_days(self.db, device_id, days, limit, after, columnar)
+        end_date = local_now()
+        return self._downsample_level_range(
+            device_id, end_date - timedelta(days=days), end_date, max_points, columnar
+        )
+
+    def get_level_by_date(self, device_id: int, date: str, columnar: bool = False):
+        return level_cache.get_or_compute(
+            ("date", device_id, date, columnar),
+            lambda: get_level_by_date(self.db, device_id, date, columnar),
+        )
+
+    def get_level_by_range(
+        self,
+        device_id: int,
+        start_date: datetime,
+        end_date: Optional[datetime],
+        max_points: Optional[int] = None,
+        limit: int = HISTORY_PAGE_SIZE,
+        after: Optional[Tuple[datetime, int]] = None,
+        columnar: bool = False,
+    ):
+        return level_cache.get_or_compute(
+            (
+                "range",
+                device_id,
+                start_date,
+                end_date,
+                max_points,
+                limit,
+                after,
+                columnar,
+            ),
+            lambda: self._get_level_by_range(
+                device_id, start_date, end_date, max_points, limit, after, columnar
+            ),
+        )
+
+    def _get_level_by_range(
+        self,
+        device_id: int,
+        start_date: datetime,
+        end_date: Optional[datetime],
+        max_points: Optional[int],
+        limit: int,
+        after: Optional[Tuple[datetime, int]],
+        columnar: bool,
+    ):
+        if max_points is None:
+            return get_level_by_range(
+                self.db, device_id, start_date, end_date, limit, after, columnar
+            )
+        return self._downsample_level_range(
+            device_id, start_date, end_date, max_points, columnar
+        )
+
+    def _downsample_level_range(
+        self,
+        device_id: int,
+        start_date: datetime,
+        end_date: Optional[datetime],
+        max_points: int,
+        columnar: bool = False,
+    ):
+        rows = iter_level_range(self.db, device_id, start_date, end_date)
+        result = minmax_downsample(
+            rows, start_date, end_date or local_now(), max_points
+        )
+        if columnar:
+            return to_columns(result, ["level"])
+        return [
+            {"date": r[0].strftime("%d/%m/%Y %H:%M"), "level": r[1]} for r in result
+        ]
+
+    def stream_level_by_days(self, device_id: int, days: int, export_format: str):
+        return self.stream_level_by_range(
+            device_id, local_now() - timedelta(days=days), None, export_format
+        )
+
+    def stream_level_by_range(
+        self,
+        device_id: int,
+        start_date: datetime,
+        end_date: Optional[datetime],
+        export_format: str,
+    ):
+        return stream_rows(
+            select_level_range(device_id, start_date, end_date),
+            ["date", "level"],
+            export_format,
+            rollups=select_level_hourly_range(device_id, start_date, end_date),
+        )
@@ -1,31 +1,58 @@
-import uuid
 from sqlalchemy.orm import Session
 from app.repository import phone_repository
 from app.model.phone import Phone
 from app.model.db_models.phone import Phone as PhoneDB
-from typing import List
-from uuid import uuid4
+from typing import List, Optional
+from uuid import UUID, uuid4
+from app.core.constants import PAGE_SIZE
 from app.core.utils import generate_random_phone, generate_random_name
 
 
+def is_valid_phone(number: str) -> bool:
+    return len(number) == 11 and number.isdigit()
+
+
 class PhoneService:
     def __init__(self, db: Session):
         self.db = db
 
     def add_phone(self, name: str, number: str):
         phone_data = Phone(id=uuid4(), name=name, number=number)
-        return phone_repository.create_phone(self.db, phone_data)
+        created = phone_repository.create_phone(self.db, phone_data)
+        if created is None:
+            return {"error": f"Phone number '{number}' already exists."}
+        return created
 
-    def get_all_phones(self) -> List[Phone]:
-        return phone_repository.get_all_phones(self.db)
+    def import_phones(self, contacts: List[dict]) -> dict:
+        phones, rejected = {}, []
+        for index, contact in enumerate(contacts):
+            if not contact["name"] or not is_valid_phone(contact["number"]):
+                rejected.append(
+                    {
+                        "index": index,
+                        "detail": "Name and an 11-digit number are required.",
+                    }
+                )
+                continue
+            phones.setdefault(contact["number"], contact)
+        inserted = phone_repository.create_phone_batch(self.db, list(phones.values()))
+        return {
+            "inserted": inserted,
+            "skipped": len(contacts) - len(rejected) - inserted,
+            "rejected": rejected,
+        }
+
+    def get_all_phones(
+        self, limit: int = PAGE_SIZE, after: Optional[UUID] = None
+    ) -> List[Phone]:
+        return phone_repository.get_all_phones(self.db, limit, after)
 
     def generate_phone_data(self, n: int):
-        for _ in range(n):
-            name = generate_random_name()
-            phone_number = generate_random_phone()
-            phone = PhoneDB(id=uuid.uuid4(), name=name, number=str(phone_number))
-            self.db.add(phone)
-        self.db.commit()
+        phones = [
+            {"name": generate_random_name(), "number": str(generate_random_phone())}
+            for _ in range(n)
+        ]
+        phone_repository.create_phone_batch(self.db, phones)
 
     def delete_all_phone_data(self):
         self.db.query(PhoneDB).delete()
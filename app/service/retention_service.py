@@ -0,0 +1,104 @@
+import time
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from app.core.watermark import level_watermark, sensor_data_watermark
+from app.core.utils import local_now
+from app.repository.data_version_repository import bump_data_version
+from app.repository.level_hourly_repository import delete_level_hourly_before
+from app.repository.level_repository import compact_level_batch, get_level_device_ids
+from app.repository.maintenance_repository import (
+    analyze_tables,
+    incremental_vacuum,
+    incremental_vacuum_enabled,
+)
+from app.repository.sensor_data_repository import (
+    compact_sensor_data_batch,
+    get_sensor_data_device_ids,
+)
+from app.repository.sensor_hourly_repository import delete_sensor_hourly_before
+
+ANALYSIS_LIMIT = 1000
+
+RAW_TABLES = {
+    "levels": (get_level_device_ids, compact_level_batch, level_watermark),
+    "sensor_data": (
+        get_sensor_data_device_ids,
+        compact_sensor_data_batch,
+        sensor_data_watermark,
+    ),
+}
+
+HOURLY_TABLES = {
+    "level_hourly": delete_level_hourly_before,
+    "sensor_hourly": delete_sensor_hourly_before,
+}
+
+
+def day_cutoff(days: int) -> datetime:
+    return datetime.combine(
+        local_now().date() - timedelta(days=days), datetime.min.time()
+    )
+
+
+class RetentionService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _batches(self, step, pause: float) -> int:
+        total = 0
+        while removed := step():
+            total += removed
+            time.sleep(pause)
+        return total
+
+    def compact_raw_data(self, days: int, batch_size: int, pause: float) -> dict:
+        cutoff = day_cutoff(days)
+        compacted = {}
+        for table, (device_ids, compact, watermark) in RAW_TABLES.items():
+            compacted[table] = sum(
+                self._batches(
+                    lambda: compact(self.db, device_id, cutoff, batch_size), pause
+                )
+                for device_id in device_ids(self.db)
+            )
+            if compacted[table]:
+                watermark.advance(*bump_data_version(self.db, table))
+        return compacted
+
+    def purge_hourly_data(self, days: int, batch_size: int, pause: float) -> dict:
+        cutoff = day_cutoff(days)
+        return {
+            table: self._batches(lambda: purge(self.db, cutoff, batch_size), pause)
+            for table, purge in HOURLY_TABLES.items()
+        }
+
+    def vacuum(self, pages: int, pause: float) -> int:
+        if not incremental_vacuum_enabled(self.db):
+            return 0
+        return self._batches(lambda: incremental_vacuum(self.db, pages), pause)
+
+    def apply(
+        self,
+        raw_days: int,
+        hourly_days: int,
+        batch_size: int,
+        pause: float,
+        vacuum_pages: int,
+    ) -> dict:
+        started = time.perf_counter()
+        compacted = self.compact_raw_data(raw_days, batch_size, pause)
+        purged = {table: 0 for table in HOURLY_TABLES}
+        if hourly_days > 0:
+            purged = self.purge_hourly_data(hourly_days, batch_size, pause)
+
+        changed = [table for table, rows in {**compacted, **purged}.items() if rows]
+        vacuumed = 0
+        if changed:
+            vacuumed = self.vacuum(vacuum_pages, pause)
+            analyze_tables(self.db, sorted({*changed, *HOURLY_TABLES}), ANALYSIS_LIMIT)
+        return {
+            "compacted": compacted,
+            "purged": purged,
+            "vacuumed_pages": vacuumed,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
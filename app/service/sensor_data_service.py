@@ -1,75 +1,338 @@
 from sqlalchemy.orm import Session
-from app.model.db_models.sensor_data import SensorData
+from app.model.db_models.sensor_daily import SensorDaily
+from app.model.db_models.sensor_hourly import SensorHourly
 from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
-import random
-import uuid
+from collections import Counter
+from typing import List, Optional, Tuple
 
 from app.model.sensor_data_response import SensorDataResponse
 from app.repository.sensor_data_repository import (
     create_sensor_data,
+    create_sensor_data_batch,
+    delete_sensor_data_batch,
     get_last_n_avg_sensor_data,
     get_sensor_data_by_days,
     get_last_n_sensor_data_records,
     get_sensor_data_by_date,
+    get_sensor_data_by_range,
+    iter_sensor_data_range,
+    select_sensor_data_range,
+    select_sensor_hourly_range,
 )
+from app.core.constants import (
+    COMEDOURO_ID,
+    DELETE_BATCH_SIZE,
+    GENERATE_CHUNK_SIZE,
+    GENERATE_DAYS,
+    GENERATE_INTERVAL,
+    GENERATE_MAX_ROWS,
+    HISTORY_PAGE_SIZE,
+)
+from app.core.cache import sensor_data_cache
+from app.core.dedupe import reading_dedupe
+from app.core.watermark import sensor_data_watermark
+from app.repository.data_version_repository import bump_data_version
+from app.core.columnar import to_columns
+from app.core.downsampling import minmax_downsample
+from app.core.export import stream_rows
+from app.core.synthetic import sample_count, sensor_data_chunks
+from app.core.utils import local_now, reading_error, to_local, to_millis
+from app.service.device_service import DeviceService
 
 
 class SensorDataService:
     def __init__(self, db: Session):
         self.db = db
 
-    def handle_sensor_data(self, temperature: float, humidity: float):
-        date = datetime.now(ZoneInfo("America/Fortaleza"))
-        create_sensor_data(self.db, temperature, humidity, date)
-        return SensorDataResponse(temp=temperature, humi=humidity, date=str(date))
+    def _data_changed(self):
+        sensor_data_watermark.advance(*bump_data_version(self.db, "sensor_data"))
 
-    def delete_all_sensor_data(self):
-        self.db.query(SensorData).delete()
-        self.db.commit()
+    def handle_sensor_data(
+        self,
+        temperature: float,
+        humidity: float,
+        device_id: int = COMEDOURO_ID,
+        date: Optional[datetime] = None,
+    ):
+        date = to_local(date)
+        error = reading_error((temperature, humidity), date, local_now())
+        if error is not None:
+            return {"invalid": error}
+        sensor_data = self.build_sensor_data(temperature, humidity, device_id)
+        if sensor_data is None:
+            return {"error": f"Device {device_id} not found."}
+        key = (device_id, (temperature, humidity), date)
+        if reading_dedupe.seen("sensor", *key):
+            return {"duplicate": "Reading already received."}
+        if date is not None:
+            sensor_data["date"] = date
+        stored = create_sensor_data(self.db, sensor_data)
+        reading_dedupe.remember("sensor", *key)
+        if stored is None:
+            return {"duplicate": "Reading already stored."}
+        self._data_changed()
+        return SensorDataResponse(
+            temp=temperature, humi=humidity, date=str(sensor_data["date"])
+        )
+
+    def build_sensor_data(
+        self, temperature: float, humidity: float, device_id: int = COMEDOURO_ID
+    ) -> Optional[dict]:
+        if DeviceService(self.db).get_device(device_id) is None:
+            return None
+        return {
+            "device_id": device_id,
+            "temperature": temperature,
+            "humidity": humidity,
+            "date": local_now(),
+        }
 
-    def generate_sensor_data(self):
-        tz = ZoneInfo("America/Fortaleza")
-        now = datetime.now(tz)
-        end_date = now
-        start_date = end_date - timedelta(days=31)
-        current_date = start_date
-
-        while current_date <= end_date:
-            for i in range(2):
-                hours_ago = 6 - (i * 3)
-                measurement_time = datetime(
-                    current_date.year, current_date.month, current_date.day, tzinfo=tz
-                ) + timedelta(
-                    hours=now.hour - hours_ago, minutes=now.minute, seconds=now.second
+    def handle_sensor_data_batch(
+        self, readings: List[Tuple[float, float, Optional[datetime], int]]
+    ) -> List[dict]:
+        now = local_now()
+        sensor_data, results, pending, keys = [], [], [], set()
+        for index, (temperature, humidity, date, device_id) in enumerate(readings):
+            date = to_local(date)
+            error = reading_error((temperature, humidity), date, now)
+            if error is None:
+                data = self.build_sensor_data(temperature, humidity, device_id)
+                if data is None:
+                    error = f"Device {device_id} not found."
+            if error is not None:
+                results.append({"index": index, "status": "rejected", "detail": error})
+                continue
+
+            key = (device_id, (temperature, humidity), date)
+            if (date is not None and key in keys) or reading_dedupe.seen(
+                "sensor", *key
+            ):
+                results.append(
+                    {
+                        "index": index,
+                        "status": "duplicate",
+                        "detail": "Reading already received.",
+                    }
                 )
+                continue
 
-                if measurement_time > now:
-                    continue
+            keys.add(key)
+            if date is not None:
+                data["date"] = date
+            sensor_data.append(data)
+            pending.append({"index": index})
+            results.append(pending[-1])
 
-                temperature = round(random.uniform(20.0, 40.0), 1)
-                humidity = round(random.uniform(10.0, 98.0), 1)
+        if sensor_data:
+            inserted = Counter(
+                self._row_key(data) for data in self.save_sensor_data(sensor_data)
+            )
+            for key in keys:
+                reading_dedupe.remember("sensor", *key)
+            for result, data in zip(pending, sensor_data):
+                row_key = self._row_key(data)
+                if inserted[row_key]:
+                    inserted[row_key] -= 1
+                    result.update(
+                        status="saved",
+                        device_id=data["device_id"],
+                        temp=data["temperature"],
+                        humi=data["humidity"],
+                        date=str(data["date"]),
+                    )
+                else:
+                    result.update(status="duplicate", detail="Reading already stored.")
+        return results
 
-                sensor_data = SensorData(
-                    id=uuid.uuid4(),
-                    temperature=temperature,
-                    humidity=humidity,
-                    date=measurement_time,
-                )
-                self.db.add(sensor_data)
+    def save_sensor_data(self, sensor_data: List[dict]) -> List[dict]:
+        inserted = create_sensor_data_batch(self.db, sensor_data)
+        if inserted:
+            self._data_changed()
+        return inserted
 
-            current_date += timedelta(days=1)
+    @staticmethod
+    def _row_key(data: dict) -> tuple:
+        return (
+            data["device_id"],
+            to_millis(data["date"]),
+            data["temperature"],
+            data["humidity"],
+        )
 
+    def delete_all_sensor_data(self):
+        while delete_sensor_data_batch(self.db, DELETE_BATCH_SIZE):
+            pass
+        self.db.query(SensorDaily).delete()
+        self.db.query(SensorHourly).delete()
         self.db.commit()
+        self._data_changed()
+
+    def generate_sensor_data(
+        self,
+        days: int = GENERATE_DAYS,
+        interval: int = GENERATE_INTERVAL,
+        devices: int = 1,
+        seed: Optional[int] = None,
+    ):
+        targets = DeviceService(self.db).get_all_devices()[:devices]
+        if len(targets) < devices:
+            return {"error": f"Only {len(targets)} devices are registered."}
+        count = sample_count(days, interval)
+        if count * devices > GENERATE_MAX_ROWS:
+            return {"error": f"At most {GENERATE_MAX_ROWS} readings can be generated."}
+
+        start = local_now() - timedelta(seconds=interval * (count - 1))
+        generated = 0
+        for device in targets:
+            device_seed = None if seed is None else seed + device.id
+            for chunk in sensor_data_chunks(
+                device.id, start, interval, count, GENERATE_CHUNK_SIZE, device_seed
+            ):
+                generated += len(create_sensor_data_batch(self.db, chunk))
+        if generated:
+            self._data_changed()
+        return generated
+
+    def get_sensor_data_last_n_avg(self, device_id: int, n: int):
+        return sensor_data_cache.get_or_compute(
+            ("avg", device_id, n),
+            lambda: get_last_n_avg_sensor_data(self.db, device_id, n),
+        )
+
+    def get_last_n_sensor_data_records(
+        self,
+        device_id: int,
+        n: int,
+        after: Optional[Tuple[datetime, int]] = None,
+        columnar: bool = False,
+    ):
+        return sensor_data_cache.get_or_compute(
+            ("last", device_id, n, after, columnar),
+            lambda: get_last_n_sensor_data_records(
+                self.db, device_id, n, after, columnar
+            ),
+        )
+
+    def get_sensor_data_by_days(
+        self,
+        device_id: int,
+        days: int,
+        max_points: Optional[int] = None,
+        limit: int = HISTORY_PAGE_SIZE,
+        after: Optional[Tuple[datetime, int]] = None,
+        columnar: bool = False,
+    ):
+        return sensor_data_cache.get_or_compute(
+            ("days", device_id, days, max_points, limit, after, columnar),
+            lambda: self._get_sensor_data_by_days(
+                device_id, days, max_points, limit, after, columnar
+            ),
+        )
+
+    def _get_sensor_data_by_days(
+        self,
+        device_id: int,
+        days: int,
+        max_points: Optional[int],
+        limit: int,
+        after: Optional[Tuple[datetime, int]],
+        columnar: bool,
+    ):
+        if max_points is None:
+            return get_sensor_data_by_days(
+                self.db, device_id, days, limit, after, columnar
+            )
+        end_date = local_now()
+        return self._downsample_sensor_data_range(
+            device_id, end_date - timedelta(days=days), end_date, max_points, columnar
+        )
+
+    def get_sensor_data_by_date(
+        self, device_id: int, date: str, columnar: bool = False
+    ):
+        return sensor_data_cache.get_or_compute(
+            ("date", device_id, date, columnar),
+            lambda: get_sensor_data_by_date(self.db, device_id, date, columnar),
+        )
+
+    def get_sensor_data_by_range(
+        self,
+        device_id: int,
+        start_date: datetime,
+        end_date: Optional[datetime],
+        max_points: Optional[int] = None,
+        limit: int = HISTORY_PAGE_SIZE,
+        after: Optional[Tuple[datetime, int]] = None,
+        columnar: bool = False,
+    ):
+        return sensor_data_cache.get_or_compute(
+            (
+                "range",
+                device_id,
+                start_date,
+                end_date,
+                max_points,
+                limit,
+                after,
+                columnar,
+            ),
+            lambda: self._get_sensor_data_by_range(
+                device_id, start_date, end_date, max_points, limit, after, columnar
+            ),
+        )
 
-    def get_sensor_data_last_n_avg(self, n: int):
-        return get_last_n_avg_sensor_data(self.db, n)
+    def _get_sensor_data_by_range(
+        self,
+        device_id: int,
+        start_date: datetime,
+        end_date: Optional[datetime],
+        max_points: Optional[int],
+        limit: int,
+        after: Optional[Tuple[datetime, int]],
+        columnar: bool,
+    ):
+        if max_points is None:
+            return get_sensor_data_by_range(
+                self.db, device_id, start_date, end_date, limit, after, columnar
+            )
+        return self._downsample_sensor_data_range(
+            device_id, start_date, end_date, max_points, columnar
+        )
 
-    def get_last_n_sensor_data_records(self, n: int):
-        return get_last_n_sensor_data_records(self.db, n)
+    def _downsample_sensor_data_range(
+        self,
+        device_id: int,
+        start_date: datetime,
+        end_date: Optional[datetime],
+        max_points: int,
+        columnar: bool = False,
+    ):
+        rows = iter_sensor_data_range(self.db, device_id, start_date, end_date)
+        result = minmax_downsample(
+            rows, start_date, end_date or local_now(), max_points
+        )
+        if columnar:
+            return to_columns(result, ["temp", "humi"])
+        return [
+            {"date": r[0].strftime("%d/%m/%Y %H:%M"), "temp": r[1], "humi": r[2]}
+            for r in result
+        ]
 
-    def get_sensor_data_by_days(self, days: int):
-        return get_sensor_data_by_days(self.db, days)
+    def stream_sensor_data_by_days(self, device_id: int, days: int, export_format: str):
+        return self.stream_sensor_data_by_range(
+            device_id, local_now() - timedelta(days=days), None, export_format
+        )
 
-    def get_sensor_data_by_date(self, date: str):
-        return get_sensor_data_by_date(self.db, date)
+    def stream_sensor_data_by_range(
+        self,
+        device_id: int,
+        start_date: datetime,
+        end_date: Optional[datetime],
+        export_format: str,
+    ):
+        return stream_rows(
+            select_sensor_data_range(device_id, start_date, end_date),
+            ["date", "temp", "humi"],
+            export_format,
+            rollups=select_sensor_hourly_range(device_id, start_date, end_date),
+        )
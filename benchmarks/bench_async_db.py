@@ -0,0 +1,105 @@
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi.concurrency import run_in_threadpool
+
+from benchmarks.common import create_bench_session, seed_levels
+from app.core.constants import COMEDOURO_ID
+from app.service.level_service import LevelService
+
+
+async def heartbeat(stop: asyncio.Event, lags: list, interval: float = 0.005):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - started - interval) * 1000)
+
+
+async def run_clients(request, concurrency: int, requests: int):
+    stop = asyncio.Event()
+    lags = []
+    ticker = asyncio.create_task(heartbeat(stop, lags))
+
+    async def client():
+        for _ in range(requests):
+            await request()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+
+    lags.sort()
+    return {
+        "req_per_s": concurrency * requests / elapsed,
+        "loop_lag_p50_ms": statistics.median(lags) if lags else elapsed * 1000,
+        "loop_lag_max_ms": lags[-1] if lags else elapsed * 1000,
+    }
+
+
+async def run(
+    rows: int,
+    days: int,
+    concurrency: int,
+    requests: int,
+    query_days: int,
+    rounds: int,
+):
+    db, path = create_bench_session()
+    print(f"Seeding {rows} level rows over {days} days into {path}")
+    seed_levels(db, rows, days)
+    SyncSession = type(db)
+    sync_bind = db.get_bind()
+    db.close()
+
+    def query():
+        with SyncSession(bind=sync_bind) as session:
+            LevelService(session).get_level_by_days(COMEDOURO_ID, query_days)
+
+    async def loop_request():
+        query()
+
+    async def threadpool_request():
+        await run_in_threadpool(query)
+
+    print(f"{'path':<12} {'req/s':>10} {'loop lag p50 ms':>16} {'loop lag max ms':>16}")
+    paths = [("loop", loop_request), ("threadpool", threadpool_request)]
+    results = {name: [] for name, _ in paths}
+    for _ in range(rounds):
+        for name, request in paths:
+            results[name].append(await run_clients(request, concurrency, requests))
+    for name, runs in results.items():
+        print(
+            f"{name:<12} "
+            f"{statistics.median(run['req_per_s'] for run in runs):>10.1f} "
+            f"{statistics.median(run['loop_lag_p50_ms'] for run in runs):>16.2f} "
+            f"{max(run['loop_lag_max_ms'] for run in runs):>16.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare sync session queries run on the event loop with the same "
+        "queries run in the threadpool, as FastAPI does for plain def handlers. "
+        "Both paths alternate for --rounds rounds and the medians are reported."
+    )
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--query-days", type=int, default=7)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(
+        run(
+            args.rows,
+            args.days,
+            args.concurrency,
+            args.requests,
+            args.query_days,
+            args.rounds,
+        )
+    )
@@ -0,0 +1,62 @@
+import argparse
+import gzip
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from benchmarks.common import create_bench_session, seed_sensor_data, timed
+from app.core.columnar import FastJSONResponse
+from app.core.compression import BROTLI_QUALITY, GZIP_LEVEL, brotli
+from app.core.constants import COMEDOURO_ID
+from app.service.sensor_data_service import SensorDataService
+
+
+def encode_default(result) -> bytes:
+    return JSONResponse(jsonable_encoder(result)).body
+
+
+def encode_columnar(result) -> bytes:
+    return FastJSONResponse(result).body
+
+
+def run(rows: int, days: int, query_days: int, repeat: int):
+    db, path = create_bench_session()
+    print(f"Seeding {rows} sensor rows over {days} days into {path}")
+    seed_sensor_data(db, rows, days)
+    service = SensorDataService(db)
+
+    print(
+        f"{'format':<10} {'fetch ms':>10} {'encode ms':>10} {'bytes':>10} "
+        f"{'gzip':>10} {'br':>10}"
+    )
+    for name, columnar, encode in [
+        ("rows", False, encode_default),
+        ("columnar", True, encode_columnar),
+    ]:
+        fetch_ms, result = timed(
+            lambda: service.get_sensor_data_by_days(
+                COMEDOURO_ID, query_days, None, rows, None, columnar
+            ),
+            repeat,
+        )
+        encode_ms, body = timed(lambda: encode(result), repeat)
+        gzip_size = len(gzip.compress(body, compresslevel=GZIP_LEVEL))
+        br_size = len(brotli.compress(body, quality=BROTLI_QUALITY)) if brotli else 0
+        print(
+            f"{name:<10} {fetch_ms:>10.1f} {encode_ms:>10.1f} {len(body):>10} "
+            f"{gzip_size:>10} {br_size:>10}"
+        )
+    db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare payload size and encode time of the row-per-object "
+        "history response with the columnar format, raw and compressed."
+    )
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--query-days", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.rows, args.days, args.query_days, args.repeat)
@@ -0,0 +1,73 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import timedelta
+
+from app.core.utils import local_now
+
+SCHEMAS = ["legacy", "compact"]
+
+
+def run_child(rows: int, days: int, repeat: int):
+    from benchmarks.common import create_bench_session, seed_levels, timed
+    from app.core.constants import COMEDOURO_ID
+    from app.repository.level_repository import query_level_range
+
+    db, path = create_bench_session()
+    started = time.perf_counter()
+    seed_levels(db, rows, days)
+    insert_s = time.perf_counter() - started
+
+    result = {
+        "insert_rows_per_s": rows / insert_s,
+        "file_mb": os.path.getsize(path) / 1024 / 1024,
+    }
+    for window in [1, 7, 30]:
+        start_date = local_now() - timedelta(days=window)
+        result[f"scan_{window}d_ms"], _ = timed(
+            lambda: query_level_range(db, COMEDOURO_ID, start_date, None).all(), repeat
+        )
+    db.close()
+    print(json.dumps(result))
+
+
+def run(rows: int, days: int, repeat: int):
+    results = {}
+    for schema in SCHEMAS:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_compact_schema", "--child"]
+            + ["--rows", str(rows), "--days", str(days), "--repeat", str(repeat)],
+            env={**os.environ, "DB_SCHEMA": schema},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        results[schema] = json.loads(output.strip().splitlines()[-1])
+
+    metrics = list(results[SCHEMAS[0]])
+    print(f"{'metric':<20}" + "".join(f"{schema:>12}" for schema in SCHEMAS))
+    for metric in metrics:
+        print(
+            f"{metric:<20}"
+            + "".join(f"{results[schema][metric]:>12.1f}" for schema in SCHEMAS)
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare insert rate, file size and range scans of the legacy "
+        "(UUID/DateTime) and compact (rowid/epoch ms) level schemas."
+    )
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.rows, args.days, args.repeat)
+    else:
+        run(args.rows, args.days, args.repeat)
@@ -0,0 +1,52 @@
+import argparse
+from datetime import timedelta
+
+from sqlalchemy import text
+
+from benchmarks.common import create_bench_session, seed_levels, timed
+from app.core.constants import COMEDOURO_ID
+from app.core.utils import local_now
+from app.repository.device_repository import create_device
+from app.repository.level_repository import get_level_by_range, query_level_range
+
+
+def run(rows: int, days: int, fleets: list, query_days: int, repeat: int):
+    print(f"{'devices':>8} {'total rows':>12} {'page ms':>10} {'range ms':>10}  plan")
+    for devices in fleets:
+        db, _ = create_bench_session()
+        for device_id in range(COMEDOURO_ID, COMEDOURO_ID + devices):
+            if device_id != COMEDOURO_ID:
+                create_device(db, {"id": device_id, "name": f"Feeder {device_id}"})
+            seed_levels(db, rows, days, device_id)
+
+        start_date = local_now() - timedelta(days=query_days)
+        page_ms, _ = timed(
+            lambda: get_level_by_range(db, COMEDOURO_ID, start_date, None), repeat
+        )
+        range_ms, _ = timed(
+            lambda: query_level_range(db, COMEDOURO_ID, start_date, None).all(),
+            repeat,
+        )
+        statement = query_level_range(db, COMEDOURO_ID, start_date, None).statement
+        compiled = statement.compile(
+            dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True}
+        )
+        plan = db.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+        print(
+            f"{devices:>8} {rows * devices:>12} {page_ms:>10.1f} {range_ms:>10.1f}  "
+            + "; ".join(row[-1] for row in plan)
+        )
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure per-device history queries as the number of feeders grows."
+    )
+    parser.add_argument("--rows", type=int, default=20_000, help="Rows per device.")
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--query-days", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.rows, args.days, args.devices, args.query_days, args.repeat)
@@ -0,0 +1,51 @@
+import argparse
+import json
+
+from benchmarks.common import (
+    create_bench_session,
+    seed_levels,
+    seed_sensor_data,
+    timed,
+)
+from app.core.constants import COMEDOURO_ID
+from app.service.level_service import LevelService
+from app.service.sensor_data_service import SensorDataService
+
+
+def run(rows: int, days: int, max_points: int, repeat: int):
+    db, path = create_bench_session()
+    print(f"Seeding {rows} level and sensor rows over {days} days into {path}")
+    seed_levels(db, rows, days)
+    seed_sensor_data(db, rows, days)
+
+    cases = [
+        ("level", LevelService(db).get_level_by_days),
+        ("temp-humi", SensorDataService(db).get_sensor_data_by_days),
+    ]
+    print(
+        f"{'endpoint':<10} {'mode':<12} {'points':>8} {'fetch ms':>10} "
+        f"{'encode ms':>10} {'bytes':>12}"
+    )
+    for name, fetch in cases:
+        for mode, points in [("full", None), ("max_points", max_points)]:
+            fetch_ms, result = timed(
+                lambda: fetch(COMEDOURO_ID, days, points, rows), repeat
+            )
+            encode_ms, payload = timed(lambda: json.dumps(result), repeat)
+            print(
+                f"{name:<10} {mode:<12} {len(result):>8} {fetch_ms:>10.1f} "
+                f"{encode_ms:>10.1f} {len(payload):>12}"
+            )
+    db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare full history fetches against max_points downsampling."
+    )
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--max-points", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.rows, args.days, args.max_points, args.repeat)
@@ -0,0 +1,85 @@
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from datetime import timedelta
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from benchmarks.common import create_bench_session, seed_levels
+from app.core.constants import COMEDOURO_ID
+from app.core.export import stream_rows
+from app.core.utils import local_now
+from app.repository.level_repository import get_level_by_days, select_level_range
+
+
+def measure(fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = fn()
+    elapsed = (time.perf_counter() - started) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024, size / 1024 / 1024
+
+
+async def consume(statement, export_format, session_factory):
+    size = 0
+    async for chunk in stream_rows(
+        statement, ["date", "level"], export_format, session_factory
+    ):
+        size += len(chunk)
+    return size
+
+
+def run(rows: int, days: int, query_days: int):
+    db, path = create_bench_session()
+    print(f"Seeding {rows} level rows over {days} days into {path}")
+    seed_levels(db, rows, days)
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+    statement = select_level_range(
+        COMEDOURO_ID, local_now() - timedelta(days=query_days), None
+    )
+
+    print(f"{'path':<8} {'ms':>10} {'peak MB':>10} {'body MB':>10}")
+    results = [
+        (
+            "json",
+            measure(
+                lambda: len(
+                    json.dumps(get_level_by_days(db, COMEDOURO_ID, query_days, rows))
+                )
+            ),
+        ),
+    ]
+    for export_format in ["ndjson", "csv"]:
+        results.append(
+            (
+                export_format,
+                measure(
+                    lambda: asyncio.run(
+                        consume(statement, export_format, session_factory)
+                    )
+                ),
+            )
+        )
+    for name, (elapsed, peak, size) in results:
+        print(f"{name:<8} {elapsed:>10.1f} {peak:>10.1f} {size:>10.1f}")
+
+    db.close()
+    asyncio.run(async_engine.dispose())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare peak memory of the JSON list response with the "
+        "streamed NDJSON/CSV export."
+    )
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--query-days", type=int, default=365)
+    args = parser.parse_args()
+    run(args.rows, args.days, args.query_days)
@@ -0,0 +1,135 @@
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import seed_levels
+from app.core.constants import COMEDOURO_ID
+from app.core.database import Base
+from app.core.storage_profile import (
+    STORAGE_PROFILES,
+    apply_pragmas,
+    get_pool_options,
+    get_pragmas,
+)
+from app.repository.device_repository import create_default_device
+from app.service.level_service import LevelService
+
+
+def run_profile(
+    profile: str,
+    writers: int,
+    readers: int,
+    seconds: float,
+    seed: int,
+    bulk_rows: int,
+):
+    path = os.path.join(tempfile.mkdtemp(prefix="peat-bench-"), "bench.db")
+    engine = create_engine(
+        f"sqlite:///{path}", connect_args={"timeout": 1}, **get_pool_options()
+    )
+    apply_pragmas(engine, get_pragmas(profile))
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with Session() as db:
+        create_default_device(db)
+        seed_levels(db, seed, 30)
+
+    counters = {"writes": 0, "reads": 0, "bulk": 0, "locked": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def count(name):
+        with lock:
+            counters[name] += 1
+
+    def writer():
+        while time.monotonic() < deadline:
+            with Session() as db:
+                try:
+                    LevelService(db).handle_level(random.uniform(2, 25))
+                    count("writes")
+                except OperationalError as e:
+                    db.rollback()
+                    count("locked" if "locked" in str(e) else "errors")
+
+    def reader():
+        while time.monotonic() < deadline:
+            with Session() as db:
+                try:
+                    LevelService(db).get_last_n_level_records(COMEDOURO_ID, 50)
+                    count("reads")
+                except OperationalError as e:
+                    count("locked" if "locked" in str(e) else "errors")
+
+    def bulk_writer():
+        while time.monotonic() < deadline:
+            with Session() as db:
+                try:
+                    service = LevelService(db)
+                    service.save_levels(
+                        [
+                            service.build_level(random.uniform(2, 25))
+                            for _ in range(bulk_rows)
+                        ]
+                    )
+                    count("bulk")
+                except OperationalError as e:
+                    db.rollback()
+                    count("locked" if "locked" in str(e) else "errors")
+
+    threads = [threading.Thread(target=writer) for _ in range(writers)]
+    if bulk_rows:
+        threads.append(threading.Thread(target=bulk_writer))
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    return {name: value / seconds for name, value in counters.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure write/read contention for each SQLite storage profile."
+    )
+    parser.add_argument("--profiles", nargs="+", default=list(STORAGE_PROFILES))
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=20_000)
+    parser.add_argument(
+        "--bulk-rows",
+        type=int,
+        default=200_000,
+        help="Rows per long-running bulk transaction (0 disables the bulk writer).",
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'profile':<12} {'writes/s':>10} {'reads/s':>10} {'bulk/s':>10} "
+        f"{'locked/s':>10} {'errors/s':>10}"
+    )
+    for profile in args.profiles:
+        result = run_profile(
+            profile,
+            args.writers,
+            args.readers,
+            args.seconds,
+            args.seed,
+            args.bulk_rows,
+        )
+        print(
+            f"{profile:<12} {result['writes']:>10.1f} {result['reads']:>10.1f} "
+            f"{result['bulk']:>10.2f} "
+            f"{result['locked']:>10.1f} {result['errors']:>10.1f}"
+        )
@@ -0,0 +1,275 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import time
+from datetime import timedelta
+
+import paho.mqtt.client as paho
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import (
+    create_bench_session,
+    seed_levels,
+    seed_sensor_data,
+    timed,
+)
+from app.core.constants import COMEDOURO_ID
+from app.core.mqtt_core import (
+    INGEST_BATCH_SIZE,
+    INGEST_FLUSH_INTERVAL,
+    INGEST_QUEUE_SIZE,
+    INGEST_SPOOL_DIR,
+    INGEST_SPOOL_FSYNC_INTERVAL,
+    INGEST_SPOOL_SEGMENT_BYTES,
+)
+from app.core.utils import local_now
+from app.mqtt import mqtt_listener
+from app.mqtt.spool import Spool
+from app.repository import level_repository, sensor_data_repository
+
+READ_MODES = {
+    "level": {
+        "avg": lambda db, args: level_repository.get_last_n_avg_level_data(
+            db, COMEDOURO_ID, args.avg_days
+        ),
+        "last": lambda db, args: level_repository.get_last_n_level_records(
+            db, COMEDOURO_ID, args.last
+        ),
+        "days": lambda db, args: level_repository.get_level_by_days(
+            db, COMEDOURO_ID, args.query_days
+        ),
+        "date": lambda db, args: level_repository.get_level_by_date(
+            db, COMEDOURO_ID, query_date(args)
+        ),
+    },
+    "sensor": {
+        "avg": lambda db, args: sensor_data_repository.get_last_n_avg_sensor_data(
+            db, COMEDOURO_ID, args.avg_days
+        ),
+        "last": lambda db, args: sensor_data_repository.get_last_n_sensor_data_records(
+            db, COMEDOURO_ID, args.last
+        ),
+        "days": lambda db, args: sensor_data_repository.get_sensor_data_by_days(
+            db, COMEDOURO_ID, args.query_days
+        ),
+        "date": lambda db, args: sensor_data_repository.get_sensor_data_by_date(
+            db, COMEDOURO_ID, query_date(args)
+        ),
+    },
+}
+
+INGEST_TOPICS = {"level": "bench/level", "sensor": "bench/sensor"}
+MESSAGE_SEQUENCE = itertools.count()
+
+
+def query_date(args) -> str:
+    return (local_now() - timedelta(days=args.days // 2)).strftime("%d%m%Y")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def make_message(kind: str, index: int, date) -> paho.MQTTMessage:
+    message = paho.MQTTMessage(topic=INGEST_TOPICS[kind].encode())
+    if kind == "level":
+        payload = {"level": float(index % 100), "date": date.isoformat()}
+    else:
+        payload = {
+            "temperature": 20.0 + index % 200 / 10,
+            "humidity": 10.0 + index % 880 / 10,
+            "date": date.isoformat(),
+        }
+    message.payload = json.dumps(payload).encode()
+    return message
+
+
+def bench_reads(db, rows: int, args) -> list:
+    results = []
+    for kind, modes in READ_MODES.items():
+        for mode, query in modes.items():
+            query(db, args)
+            median_ms, _ = timed(lambda: query(db, args), args.repeat)
+            results.append(
+                {
+                    "name": f"{kind}.{mode}",
+                    "rows": rows,
+                    "unit": "ms",
+                    "value": median_ms,
+                }
+            )
+            print(f"{kind + '.' + mode:<24} {rows:>10} {median_ms:>12.2f} ms")
+    return results
+
+
+def bench_ingest(db, path: str, rows: int, args) -> list:
+    mqtt_listener.MQTT_TOPIC_LEVEL = INGEST_TOPICS["level"]
+    mqtt_listener.MQTT_TOPIC_SENSOR = INGEST_TOPICS["sensor"]
+    queue = mqtt_listener.ingest_queue
+    mqtt_listener.configure_ingest(
+        sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind()),
+        INGEST_QUEUE_SIZE,
+        args.batch_size,
+        INGEST_FLUSH_INTERVAL,
+    )
+    queue.spool = (
+        Spool(
+            os.path.join(os.path.dirname(path), "spool"),
+            INGEST_SPOOL_SEGMENT_BYTES,
+            INGEST_SPOOL_FSYNC_INTERVAL,
+        )
+        if INGEST_SPOOL_DIR
+        else None
+    )
+
+    results = []
+    for kind in INGEST_TOPICS:
+        start = local_now() - timedelta(days=args.days + 1)
+        messages = [
+            make_message(kind, index, start + timedelta(milliseconds=index))
+            for index in itertools.islice(MESSAGE_SEQUENCE, args.messages)
+        ]
+        saved = queue.stats()["saved"]
+        queue.start()
+        started = time.perf_counter()
+        for message in messages:
+            mqtt_listener.on_message(None, None, message)
+        received = time.perf_counter() - started
+        queue.stop()
+        drained = time.perf_counter() - started
+        saved = queue.stats()["saved"] - saved
+
+        for name, seconds in [("on_message", received), ("end_to_end", drained)]:
+            rate = args.messages / seconds
+            results.append(
+                {
+                    "name": f"ingest.{kind}.{name}",
+                    "rows": rows,
+                    "unit": "msg/s",
+                    "value": rate,
+                }
+            )
+            print(f"{'ingest.' + kind + '.' + name:<24} {rows:>10} {rate:>10.0f} msg/s")
+        if saved != args.messages:
+            print(f"warning: {saved} of {args.messages} {kind} messages were saved")
+    return results
+
+
+def run(args):
+    results = []
+    print(f"{'benchmark':<24} {'rows':>10} {'result':>15}")
+    for rows in args.rows:
+        db, path = create_bench_session()
+        seed_levels(db, rows, args.days)
+        seed_sensor_data(db, rows, args.days)
+        results.extend(bench_reads(db, rows, args))
+        if args.messages:
+            results.extend(bench_ingest(db, path, rows, args))
+        db.close()
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "created_at": local_now().isoformat(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "params": {key: value for key, value in vars(args).items() if key != "command"},
+        "results": results,
+    }
+    output = args.output or os.path.join("bench-results", f"{commit}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results saved to {output}")
+
+
+def compare(args) -> int:
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+
+    previous = {(r["name"], r["rows"]): r for r in baseline["results"]}
+    regressions = 0
+    print(f"{baseline['commit']} -> {current['commit']}")
+    print(
+        f"{'benchmark':<24} {'rows':>10} {'baseline':>12} {'current':>12} {'change':>8}"
+    )
+    for result in current["results"]:
+        before = previous.get((result["name"], result["rows"]))
+        if before is None or not before["value"]:
+            continue
+        change = (result["value"] - before["value"]) / before["value"] * 100
+        worse = change if result["unit"] == "ms" else -change
+        flag = ""
+        if worse > args.threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(
+            f"{result['name']:<24} {result['rows']:>10} {before['value']:>12.2f} "
+            f"{result['value']:>12.2f} {change:>+7.1f}%{flag}"
+        )
+    print(f"{regressions} regression(s) above {args.threshold}%")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Time every read mode of the level and sensor repositories and "
+        "the MQTT ingest path, and compare saved results between commits."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the suite and save JSON results.")
+    run_parser.add_argument(
+        "--rows",
+        type=int,
+        nargs="+",
+        default=[10_000, 100_000],
+        help="Rows seeded per table, one database per volume (10k to 10M).",
+    )
+    run_parser.add_argument("--days", type=int, default=365)
+    run_parser.add_argument("--avg-days", type=int, default=7)
+    run_parser.add_argument("--last", type=int, default=100)
+    run_parser.add_argument("--query-days", type=int, default=30)
+    run_parser.add_argument("--repeat", type=int, default=20)
+    run_parser.add_argument(
+        "--messages",
+        type=int,
+        default=5_000,
+        help="Synthetic MQTT messages per topic, 0 skips the ingest benchmark.",
+    )
+    run_parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE)
+    run_parser.add_argument("--output", help="Defaults to bench-results/<commit>.json.")
+
+    compare_parser = commands.add_parser(
+        "compare", help="Compare two result files and flag regressions."
+    )
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="Percent slowdown reported as a regression.",
+    )
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    else:
+        sys.exit(compare(args))
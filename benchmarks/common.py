@@ -0,0 +1,97 @@
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.cache import level_cache, sensor_data_cache
+from app.core.constants import COMEDOURO_ID
+from app.core.database import Base
+from app.core.utils import local_now
+from app.model.db_models import (  # noqa: F401
+    data_version,
+    device,
+    email,
+    level,
+    level_daily,
+    level_hourly,
+    phone,
+    sensor_daily,
+    sensor_data,
+    sensor_hourly,
+)
+from app.repository.device_repository import create_default_device
+from app.service.level_service import LevelService
+from app.service.sensor_data_service import SensorDataService
+
+CHUNK_SIZE = 500
+
+level_cache.max_size = 0
+sensor_data_cache.max_size = 0
+
+
+def create_bench_session(path: str = None):
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="peat-bench-"), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    create_default_device(db)
+    return db, path
+
+
+def _timestamps(rows: int, days: int):
+    end = local_now()
+    step = timedelta(days=days) / rows
+    return [end - step * i for i in range(rows, 0, -1)]
+
+
+def seed_levels(db: Session, rows: int, days: int, device_id: int = COMEDOURO_ID):
+    service = LevelService(db)
+    chunk = []
+    for date in _timestamps(rows, days):
+        chunk.append(
+            {
+                "device_id": device_id,
+                "date": date,
+                "level": float(random.randint(0, 100)),
+            }
+        )
+        if len(chunk) == CHUNK_SIZE:
+            service.save_levels(chunk)
+            chunk = []
+    if chunk:
+        service.save_levels(chunk)
+
+
+def seed_sensor_data(db: Session, rows: int, days: int, device_id: int = COMEDOURO_ID):
+    service = SensorDataService(db)
+    chunk = []
+    for date in _timestamps(rows, days):
+        chunk.append(
+            {
+                "device_id": device_id,
+                "date": date,
+                "temperature": round(random.uniform(20.0, 40.0), 1),
+                "humidity": round(random.uniform(10.0, 98.0), 1),
+            }
+        )
+        if len(chunk) == CHUNK_SIZE:
+            service.save_sensor_data(chunk)
+            chunk = []
+    if chunk:
+        service.save_sensor_data(chunk)
+
+
+def timed(fn, repeat: int = 5):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
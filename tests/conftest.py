@@ -0,0 +1,49 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+os.environ.setdefault("API_TOKEN", "test-token")
+
+from app.core.database import Base  # noqa: E402
+from app.model.db_models import (  # noqa: E402, F401
+    data_version,
+    device,
+    email,
+    level,
+    level_daily,
+    level_hourly,
+    phone,
+    sensor_daily,
+    sensor_data,
+    sensor_hourly,
+)
+
+
+class FakeSession:
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def session_factory():
+    return FakeSession
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
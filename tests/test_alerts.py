@@ -0,0 +1,172 @@
+import json
+import socketserver
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from app.alerts.detector import ALERT_LOW, ALERT_RECOVERED, LevelAlarm
+from app.alerts.dispatcher import AlertDispatcher
+from app.alerts.senders import SmtpSender, WebhookSmsSender
+
+
+def make_alert(device_id: int, level: float, kind: str = ALERT_LOW) -> dict:
+    return {
+        "kind": kind,
+        "device_id": device_id,
+        "device_name": f"Feeder {device_id}",
+        "level": level,
+        "date": datetime(2025, 5, 3, 10, 30),
+    }
+
+
+class RecordingSender:
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.calls = []
+
+    def send(self, recipients, subject, body):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("provider unavailable")
+        self.calls.append((recipients, subject, body))
+
+
+def wait_for(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_level_alarm_uses_hysteresis():
+    alarm = LevelAlarm(low=20, clear=30)
+    levels = [25, 15, 10, 25, 29, 30, 35, 19]
+    kinds = [alarm.observe(1, level) for level in levels]
+    assert kinds == [
+        None,
+        ALERT_LOW,
+        None,
+        None,
+        None,
+        ALERT_RECOVERED,
+        None,
+        ALERT_LOW,
+    ]
+    assert alarm.observe(2, 50) is None
+    assert alarm.active() == [1]
+
+
+def test_alerts_are_batched_and_repeats_are_rate_limited():
+    sender = RecordingSender()
+    dispatcher = AlertDispatcher(
+        {"email": sender},
+        contacts=lambda: {"email": ["ana@example.com", "rui@example.com"]},
+        workers=1,
+        batch_window=0.1,
+        rate_limit=60,
+    )
+    dispatcher.start()
+    for device_id in (1, 2, 3):
+        assert dispatcher.submit(make_alert(device_id, 12.0))
+    wait_for(lambda: dispatcher.stats()["batches"] == 1)
+    dispatcher.submit(make_alert(1, 40.0, ALERT_RECOVERED))
+    wait_for(lambda: dispatcher.stats()["batches"] == 2)
+    dispatcher.submit(make_alert(1, 10.0))
+    dispatcher.submit(make_alert(4, 10.0))
+    wait_for(lambda: dispatcher.stats()["batches"] == 3)
+    dispatcher.stop()
+
+    [low, refilled, other] = sender.calls
+    assert low[0] == ["ana@example.com", "rui@example.com"]
+    assert low[1] == "Peat Data: 3 feeder(s) running low"
+    assert low[2].count("running low: 12%") == 3
+    assert refilled[1] == "Peat Data: feeder refilled"
+    assert other[1] == "Peat Data: 1 feeder(s) running low"
+    assert "(device 4)" in other[2] and "(device 1)" not in other[2]
+    stats = dispatcher.stats()
+    assert stats["sent"] == 6
+    assert stats["rate_limited"] == 2
+    assert not stats["running"]
+
+
+def test_failed_sends_are_retried():
+    sender = RecordingSender(failures=2)
+    dispatcher = AlertDispatcher(
+        {"sms": sender},
+        contacts=lambda: {"sms": ["+5585999990000"]},
+        batch_window=0,
+        max_retries=2,
+        retry_delay=0,
+    )
+    dispatcher.start()
+    dispatcher.submit(make_alert(1, 5.0))
+    wait_for(lambda: dispatcher.stats()["sent"] == 1)
+    dispatcher.stop()
+    assert dispatcher.stats()["retries"] == 2
+    assert len(sender.calls) == 1
+
+
+class SmtpStandIn(socketserver.StreamRequestHandler):
+    def reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.reply("220 localhost")
+        message = {"to": [], "data": []}
+        while line := self.rfile.readline().decode().rstrip("\r\n"):
+            command = line.upper()
+            if command.startswith("RCPT TO:"):
+                message["to"].append(line[8:].strip("<>"))
+            if command == "DATA":
+                self.reply("354 send data")
+                while (data := self.rfile.readline().decode()) != ".\r\n":
+                    message["data"].append(data)
+                self.server.messages.append(message)
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            self.reply("250 ok")
+
+
+def test_smtp_sender_delivers_to_a_local_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), SmtpStandIn)
+    server.messages = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        sender = SmtpSender(
+            "127.0.0.1", server.server_address[1], "alerts@peat.local", starttls=False
+        )
+        sender.send(["ana@example.com"], "Peat Data: feeder refilled", "Feeder 1")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    [message] = server.messages
+    assert message["to"] == ["ana@example.com"]
+    assert "Subject: Peat Data: feeder refilled\r\n" in message["data"]
+
+
+def test_sms_sender_posts_to_the_webhook():
+    received = []
+
+    class WebhookStandIn(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.append((self.headers["Authorization"], json.loads(body)))
+            self.send_response(202)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), WebhookStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/sms"
+        WebhookSmsSender(url, "secret").send(["+5585999990000"], "subject", "low")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert received == [("Bearer secret", {"to": ["+5585999990000"], "message": "low"})]
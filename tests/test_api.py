@@ -1,24 +1,99 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.cache import device_cache, level_cache, sensor_data_cache
+from app.core.database import Base, get_db
 from app.main import app
+from app.repository.device_repository import create_default_device
+
+HEADERS = {"Authorization": f"Bearer {os.environ['API_TOKEN']}"}
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    path = tmp_path_factory.mktemp("api") / "peat_data.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine)
+    with SessionLocal() as db:
+        create_default_device(db)
 
-client = TestClient(app)
+    def override_get_db():
+        with SessionLocal() as db:
+            yield db
+
+    for cache in (device_cache, level_cache, sensor_data_cache):
+        cache.invalidate()
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    for cache in (device_cache, level_cache, sensor_data_cache):
+        cache.invalidate()
+    engine.dispose()
+
+
+def test_requests_without_a_valid_token_are_rejected(client):
+    response = client.post(
+        "/level",
+        json={"level": 10.0},
+        headers={"Authorization": "Bearer wrong"},
+    )
+    assert response.status_code == 401
 
 
-def test_post_temperature_humidity():
+def test_post_temperature_humidity(client):
     response = client.post(
-        "/temperature-humidity", json={"temperature": 25.0, "humidity": 60.0}
+        "/temp-humi", json={"temperature": 25.0, "humidity": 60.0}, headers=HEADERS
     )
     assert response.status_code == 200
-    assert response.json() == {"message": "Data received and sent to Firestore"}
+    body = response.json()
+    assert body["message"] == "Temperature and humidity data received successfully"
+    assert (body["temperature"], body["humidity"]) == ("25.0", "60.0")
 
 
-def test_post_distance():
-    response = client.post("/distance", json={"distance": 100.0})
+def test_post_level_converts_the_distance_reading(client):
+    response = client.post("/level", json={"level": 2.0}, headers=HEADERS)
     assert response.status_code == 200
-    assert response.json() == {"message": "Data received and sent to Firestore"}
+    body = response.json()
+    assert body["message"] == "Level data received successfully"
+    assert body["level"] == "100.0"
+
+    response = client.post(
+        "/level", json={"level": 2.0, "device_id": 99}, headers=HEADERS
+    )
+    assert response.status_code == 404
 
 
-def test_get_records():
-    response = client.get("/records")
+def test_get_last_records(client):
+    client.post("/level", json={"level": 25.0}, headers=HEADERS)
+    response = client.get("/level", params={"last": 2}, headers=HEADERS)
     assert response.status_code == 200
-    assert "message" in response.json()
+    assert [record["level"] for record in response.json()] == [0.0, 100.0]
+
+    response = client.get("/level", headers=HEADERS)
+    assert response.status_code == 400
+
+
+def test_retried_dated_readings_are_stored_once(client):
+    date = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+    for path, payload in [
+        ("/level", {"level": 10.0, "date": date}),
+        ("/temp-humi", {"temperature": 20.0, "humidity": 50.0, "date": date}),
+    ]:
+        first = client.post(path, json=payload, headers=HEADERS)
+        retry = client.post(path, json=payload, headers=HEADERS)
+        assert first.status_code == retry.status_code == 200
+        assert first.json()["message"].endswith("received successfully")
+        assert retry.json()["message"].startswith("Duplicate")
+
+    future = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+    response = client.post(
+        "/level", json={"level": 10.0, "date": future}, headers=HEADERS
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Reading timestamp is in the future."
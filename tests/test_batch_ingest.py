@@ -0,0 +1,166 @@
+from datetime import timedelta
+
+import pytest
+
+from app.alerts.detector import LevelAlarm
+from app.core.cache import device_cache
+from app.core.dedupe import ReadingDedupe
+from app.core.utils import local_now
+from app.model.db_models.level import Level
+from app.model.db_models.sensor_data import SensorData
+from app.repository.device_repository import create_default_device
+from app.service import level_service, sensor_data_service
+from app.service.level_service import LevelService
+from app.service.sensor_data_service import SensorDataService
+
+
+class RecordingDispatcher:
+    def __init__(self):
+        self.alerts = []
+
+    def submit(self, alert: dict) -> bool:
+        self.alerts.append(alert)
+        return True
+
+
+@pytest.fixture
+def alerts(monkeypatch):
+    dispatcher = RecordingDispatcher()
+    monkeypatch.setattr(level_service, "alert_dispatcher", dispatcher)
+    return dispatcher.alerts
+
+
+@pytest.fixture
+def db(db, monkeypatch, alerts):
+    monkeypatch.setattr(level_service, "level_alarm", LevelAlarm(low=20, clear=30))
+    dedupe = ReadingDedupe()
+    monkeypatch.setattr(level_service, "reading_dedupe", dedupe)
+    monkeypatch.setattr(sensor_data_service, "reading_dedupe", dedupe)
+    device_cache.invalidate()
+    create_default_device(db)
+    yield db
+    device_cache.invalidate()
+
+
+def test_level_batch_reports_a_status_per_reading(db):
+    now = local_now().replace(microsecond=0)
+    earlier = now - timedelta(minutes=5)
+    results = LevelService(db).handle_level_batch(
+        [
+            (10.0, earlier, 1),
+            (12.0, now + timedelta(hours=1), 1),
+            (10.0, earlier, 1),
+            (11.0, earlier, 99),
+            (float("nan"), earlier, 1),
+            (14.0, now, 1),
+        ]
+    )
+
+    assert [result["status"] for result in results] == [
+        "saved",
+        "rejected",
+        "duplicate",
+        "rejected",
+        "rejected",
+        "saved",
+    ]
+    assert results[1]["detail"] == "Reading timestamp is in the future."
+    assert results[3]["detail"] == "Device 99 not found."
+    assert [result["index"] for result in results] == list(range(6))
+    assert results[0]["date"] == str(earlier)
+    assert db.query(Level).count() == 2
+
+    [again] = LevelService(db).handle_level_batch([(10.0, earlier, 1)])
+    assert again["status"] == "duplicate"
+    assert db.query(Level).count() == 2
+
+
+def test_sensor_data_batch_reports_a_status_per_reading(db):
+    now = local_now().replace(microsecond=0)
+    earlier = now - timedelta(minutes=5)
+    results = SensorDataService(db).handle_sensor_data_batch(
+        [
+            (25.0, 60.0, earlier, 1),
+            (25.0, 60.0, earlier, 1),
+            (26.0, 61.0, now + timedelta(hours=1), 1),
+            (27.0, 62.0, earlier, 2),
+            (25.0, 61.0, earlier, 1),
+            (24.0, 59.0, None, 1),
+            (24.0, 59.0, None, 1),
+        ]
+    )
+
+    assert [result["status"] for result in results] == [
+        "saved",
+        "duplicate",
+        "rejected",
+        "rejected",
+        "saved",
+        "saved",
+        "saved",
+    ]
+    assert results[0] == {
+        "index": 0,
+        "status": "saved",
+        "device_id": 1,
+        "temp": 25.0,
+        "humi": 60.0,
+        "date": str(earlier),
+    }
+    assert db.query(SensorData).count() == 4
+
+
+def test_mixed_level_batch_raises_alerts_in_reading_order(db, alerts):
+    earlier = local_now().replace(microsecond=0) - timedelta(minutes=5)
+    results = LevelService(db).handle_level_batch([(2.0, None, 1), (25.0, earlier, 1)])
+
+    assert [result["status"] for result in results] == ["saved", "saved"]
+    assert [(alert["kind"], alert["level"]) for alert in alerts] == [
+        ("low", 0),
+        ("recovered", 100),
+    ]
+
+
+def test_batches_report_readings_ignored_by_the_insert_as_duplicates(db, monkeypatch):
+    earlier = local_now() - timedelta(minutes=5)
+    LevelService(db).handle_level_batch([(10.0, earlier, 1)])
+    SensorDataService(db).handle_sensor_data_batch([(25.0, 60.0, earlier, 1)])
+    dedupe = ReadingDedupe()
+    monkeypatch.setattr(level_service, "reading_dedupe", dedupe)
+    monkeypatch.setattr(sensor_data_service, "reading_dedupe", dedupe)
+
+    levels = LevelService(db).handle_level_batch(
+        [(10.0, earlier, 1), (12.0, earlier, 1)]
+    )
+    sensor_data = SensorDataService(db).handle_sensor_data_batch(
+        [(25.0, 60.0, earlier, 1)]
+    )
+
+    assert [result["status"] for result in levels] == ["duplicate", "saved"]
+    assert levels[0] == {
+        "index": 0,
+        "status": "duplicate",
+        "detail": "Reading already stored.",
+    }
+    assert [result["status"] for result in sensor_data] == ["duplicate"]
+    assert db.query(Level).count() == 2
+    assert db.query(SensorData).count() == 1
+
+
+def test_replayed_and_backdated_readings_do_not_change_the_alarm(
+    db, alerts, monkeypatch
+):
+    now = local_now().replace(microsecond=0)
+    service = LevelService(db)
+    service.handle_level_batch([(2.0, now - timedelta(minutes=10), 1)])
+    service.handle_level_batch([(25.0, now - timedelta(minutes=5), 1)])
+    monkeypatch.setattr(level_service, "reading_dedupe", ReadingDedupe())
+
+    replayed = service.handle_level_batch([(2.0, now - timedelta(minutes=10), 1)])
+    backdated = service.handle_level_batch([(2.0, now - timedelta(minutes=30), 1)])
+
+    assert [result["status"] for result in replayed + backdated] == [
+        "duplicate",
+        "saved",
+    ]
+    assert [alert["kind"] for alert in alerts] == ["low"]
@@ -0,0 +1,49 @@
+import time
+
+from app.core.cache import ResultCache
+
+
+def test_cache_hits_until_invalidated():
+    cache = ResultCache(max_size=4, ttl=60)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return [len(calls)]
+
+    assert cache.get_or_compute(("avg", 7), compute) == [1]
+    assert cache.get_or_compute(("avg", 7), compute) == [1]
+    cache.invalidate()
+    assert cache.get_or_compute(("avg", 7), compute) == [2]
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+
+def test_cache_discards_result_computed_before_invalidation():
+    cache = ResultCache(max_size=4, ttl=60)
+
+    def compute():
+        cache.invalidate()
+        return ["stale"]
+
+    assert cache.get_or_compute("key", compute) == ["stale"]
+    assert cache.stats()["size"] == 0
+
+
+def test_cache_evicts_least_recently_used_and_expired():
+    cache = ResultCache(max_size=2, ttl=60)
+    cache.get_or_compute("a", lambda: ["a"])
+    cache.get_or_compute("b", lambda: ["b"])
+    cache.get_or_compute("a", lambda: ["a"])
+    cache.get_or_compute("c", lambda: ["c"])
+
+    assert cache.get_or_compute("a", lambda: ["miss"]) == ["a"]
+    assert cache.get_or_compute("b", lambda: ["miss"]) == ["miss"]
+    assert cache.stats()["evictions"] >= 1
+
+    cache = ResultCache(max_size=2, ttl=0.01)
+    cache.get_or_compute("a", lambda: ["a"])
+    time.sleep(0.02)
+    assert cache.get_or_compute("a", lambda: ["new"]) == ["new"]
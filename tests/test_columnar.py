@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from app.core.columnar import FastJSONResponse, to_columns
+from app.core.compression import accepted_encodings
+
+
+def test_to_columns_builds_parallel_arrays():
+    rows = [
+        (datetime(2025, 1, 1, 9, 0), 21.5, 60.0, 7),
+        (datetime(2025, 1, 1, 6, 0), 20.0, 65.5, 6),
+    ]
+    columns = to_columns(rows, ["temp", "humi"])
+    assert columns == {
+        "ts": [1735732800000, 1735722000000],
+        "temp": [21.5, 20.0],
+        "humi": [60.0, 65.5],
+    }
+    assert FastJSONResponse(columns).body.startswith(b'{"ts":[1735732800000,')
+
+
+def test_accepted_encodings_skips_refused_codings():
+    assert accepted_encodings("br;q=1.0, gzip, deflate") == {"br", "gzip", "deflate"}
+    assert accepted_encodings("gzip;q=0, identity") == {"identity"}
+    assert accepted_encodings("") == {""}
@@ -0,0 +1,55 @@
+import pytest
+
+from app.core.contact_import import parse_contacts
+from app.service.email_service import EmailService
+from app.service.phone_service import PhoneService
+
+
+def test_contacts_are_parsed_from_json_and_csv():
+    expected = [{"name": "Ana", "email": "ana@example.com"}]
+    body = b'[{"name": " Ana ", "email": "ana@example.com "}]'
+    assert parse_contacts(body, "application/json", "email") == expected
+    body = b"\xef\xbb\xbfemail,name\r\nana@example.com,Ana\r\n"
+    assert parse_contacts(body, "text/csv; charset=utf-8", "email") == expected
+
+
+@pytest.mark.parametrize(
+    "body, content_type",
+    [
+        (b"{}", "application/json"),
+        (b"[1]", "application/json"),
+        (b'[{"name": "Ana"}]', "application/json"),
+        (b"name,phone\nAna,85999990000\n", "text/csv"),
+        (b"name,number\nAna\n", "text/csv"),
+    ],
+)
+def test_malformed_imports_raise_value_error(body, content_type):
+    with pytest.raises(ValueError):
+        parse_contacts(body, content_type, "number")
+
+
+def test_duplicate_contacts_are_skipped(db):
+    service = EmailService(db)
+    service.add_email("Ana", "ana@example.com")
+
+    result = service.import_emails(
+        [
+            {"name": "Ana", "email": "ana@example.com"},
+            {"name": "Rui", "email": "rui@example.com"},
+            {"name": "Rui Souza", "email": "rui@example.com"},
+            {"name": "", "email": "bia@example.com"},
+        ]
+    )
+    assert result == {
+        "inserted": 1,
+        "skipped": 2,
+        "rejected": [{"index": 3, "detail": "Name and email are required."}],
+    }
+    assert "error" in service.add_email("Rui", "rui@example.com")
+
+    phones = PhoneService(db)
+    rows = [{"name": "Ana", "number": "85999990000"}] * 2 + [
+        {"name": "Rui", "number": "123"}
+    ]
+    assert phones.import_phones(rows)["inserted"] == 1
+    assert "error" in phones.add_phone("Ana", "85999990000")
@@ -0,0 +1,32 @@
+import time
+from datetime import datetime
+
+from app.core.dedupe import ReadingDedupe
+
+
+def test_only_timestamped_readings_are_remembered():
+    dedupe = ReadingDedupe(max_size=10, window=0.05)
+    date = datetime(2025, 5, 1, 10, 0)
+    dedupe.remember("level", 1, (10.0,), date)
+    dedupe.remember("level", 1, (10.0,), None)
+
+    assert dedupe.seen("level", 1, (10.0,), date)
+    assert not dedupe.seen("level", 1, (10.0,), None)
+    assert not dedupe.seen("level", 2, (10.0,), date)
+    assert not dedupe.seen("sensor", 1, (10.0,), date)
+    assert dedupe.stats()["duplicates"] == 1
+    assert dedupe.stats()["size"] == 1
+
+    time.sleep(0.1)
+    assert not dedupe.seen("level", 1, (10.0,), date)
+
+
+def test_oldest_keys_are_evicted_past_max_size():
+    dedupe = ReadingDedupe(max_size=2, window=60)
+    date = datetime(2025, 5, 1, 10, 0)
+    for level in range(3):
+        dedupe.remember("level", 1, (float(level),), date)
+
+    assert not dedupe.seen("level", 1, (0.0,), date)
+    assert dedupe.seen("level", 1, (2.0,), date)
+    assert dedupe.stats() == {"checked": 2, "duplicates": 1, "evictions": 1, "size": 2}
@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+
+from app.core.downsampling import minmax_downsample
+
+START = datetime(2025, 1, 1)
+
+
+def make_rows(n, step=timedelta(minutes=1)):
+    return [(START + step * i, float(i % 97), float(i % 13)) for i in range(n)]
+
+
+def test_small_input_is_returned_unchanged():
+    rows = make_rows(50)
+    assert minmax_downsample(rows, START, START + timedelta(hours=1), 100) == rows
+
+
+def test_output_is_bounded_and_keeps_extremes():
+    rows = make_rows(10_000)
+    end = START + timedelta(minutes=10_000)
+    result = minmax_downsample(iter(rows), START, end, 200)
+
+    assert len(result) <= 200
+    assert max(r[1] for r in result) == max(r[1] for r in rows)
+    assert min(r[2] for r in result) == min(r[2] for r in rows)
+
+
+def test_input_order_is_preserved():
+    rows = list(reversed(make_rows(5_000)))
+    end = START + timedelta(minutes=5_000)
+    result = minmax_downsample(rows, START, end, 100)
+
+    dates = [r[0] for r in result]
+    assert dates == sorted(dates, reverse=True)
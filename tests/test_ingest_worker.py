@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import signal
+import threading
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.alerts.detector import LevelAlarm
+from app.core.cache import device_cache
+from app.core.database import Base
+from app.core.dedupe import ReadingDedupe
+from app.core.read_only import ReadOnlyMiddleware
+from app.model.db_models.level import Level
+from app.model.db_models.sensor_data import SensorData
+from app.mqtt import __main__ as worker
+from app.mqtt import mqtt_listener
+from app.mqtt.ingest_queue import IngestQueue
+from app.repository.device_repository import create_default_device
+from app.service import level_service
+
+MESSAGES = [
+    ("peat/level", {"level": 5.0}),
+    ("peat/level", {"level": 10.0}),
+    ("peat/level", {"level": 15.0}),
+    ("peat/temp-humi", {"temperature": 25.0, "humidity": 60.0}),
+    ("peat/temp-humi", {"temperature": 26.0, "humidity": 61.0}),
+]
+STOP_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+
+class Service:
+    def start(self):
+        pass
+
+    def stop(self, timeout: float = None):
+        pass
+
+
+class FakeClient:
+    queued = None
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def connect(self, host, port, keepalive):
+        self.on_connect(self, None, {}, 0)
+        for topic, payload in MESSAGES:
+            message = SimpleNamespace(topic=topic, payload=json.dumps(payload).encode())
+            self.on_message(self, None, message)
+        FakeClient.queued = mqtt_listener.ingest_queue.queue.qsize()
+        threading.Timer(0.1, os.kill, (os.getpid(), signal.SIGTERM)).start()
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def test_ingest_queue_drains_into_its_session_factory_on_stop(session_factory):
+    saved = []
+    queue = IngestQueue(
+        handlers={"level": lambda db, rows: saved.extend(rows) or len(rows)},
+        max_size=100,
+        batch_size=10,
+        flush_interval=60.0,
+        put_timeout=1.0,
+        session_factory=session_factory,
+    )
+    queue.start()
+    for level in range(25):
+        queue.put("level", {"level": level})
+    queue.stop()
+
+    assert [row["level"] for row in saved] == list(range(25))
+    assert queue.stats()["saved"] == 25
+
+
+def test_read_only_middleware_rejects_writes():
+    app = FastAPI()
+    app.add_middleware(ReadOnlyMiddleware)
+
+    @app.get("/level")
+    def read():
+        return {"ok": True}
+
+    @app.post("/level")
+    def write():
+        return {"ok": True}
+
+    client = TestClient(app)
+    assert client.get("/level").status_code == 200
+    response = client.post("/level")
+    assert response.status_code == 405
+    assert response.headers["Allow"] == "GET, HEAD, OPTIONS"
+
+
+def test_worker_drains_queued_readings_when_stopped(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'worker.db'}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        create_default_device(db)
+    monkeypatch.setattr(worker, "run_migrations", lambda: None)
+    monkeypatch.setattr(
+        worker, "create_session_factory", lambda *_: sessionmaker(bind=engine)
+    )
+    for name in ("watermark_sync", "retention_job", "alert_dispatcher"):
+        monkeypatch.setattr(worker, name, Service())
+    monkeypatch.setattr(mqtt_listener, "MQTT_SHARED_GROUP", "ingest")
+    monkeypatch.setattr(mqtt_listener, "MQTT_TOPIC_LEVEL", "peat/level")
+    monkeypatch.setattr(mqtt_listener, "MQTT_TOPIC_SENSOR", "peat/temp-humi")
+    monkeypatch.setattr(mqtt_listener, "session_factory", None)
+    monkeypatch.setattr(mqtt_listener, "reading_dedupe", ReadingDedupe())
+    monkeypatch.setattr(mqtt_listener.paho, "Client", FakeClient)
+    ingest_queue = mqtt_listener.ingest_queue
+    for name in ("session_factory", "batch_size", "flush_interval"):
+        monkeypatch.setattr(ingest_queue, name, getattr(ingest_queue, name))
+    monkeypatch.setattr(ingest_queue.queue, "maxsize", ingest_queue.queue.maxsize)
+    monkeypatch.setattr(level_service, "alert_dispatcher", SimpleNamespace())
+    monkeypatch.setattr(level_service, "level_alarm", LevelAlarm(low=0, clear=1))
+    handlers = {signum: signal.getsignal(signum) for signum in STOP_SIGNALS}
+    device_cache.invalidate()
+    try:
+        worker.run(
+            argparse.Namespace(
+                db_profile=None,
+                pool_size=2,
+                queue_size=100,
+                batch_size=100,
+                flush_interval=60.0,
+                stats_interval=0,
+            )
+        )
+    finally:
+        for signum, handler in handlers.items():
+            signal.signal(signum, handler)
+        device_cache.invalidate()
+
+    assert FakeClient.queued == len(MESSAGES)
+    with sessionmaker(bind=engine)() as db:
+        assert db.query(Level).count() == 3
+        assert db.query(SensorData).count() == 2
+    assert ingest_queue.queue.qsize() == 0
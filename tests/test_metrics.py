@@ -0,0 +1,55 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.metrics import (
+    REGISTRY,
+    Counter,
+    Histogram,
+    MetricsMiddleware,
+    http_requests,
+)
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("test_latency_seconds", "Test.", ("kind",), (0.1, 1.0))
+    REGISTRY.remove(histogram)
+    histogram.observe_many((0.05, 0.5, 5.0), "level")
+
+    assert histogram.render().splitlines()[2:] == [
+        'test_latency_seconds_bucket{kind="level",le="0.1"} 1',
+        'test_latency_seconds_bucket{kind="level",le="1.0"} 2',
+        'test_latency_seconds_bucket{kind="level",le="+Inf"} 3',
+        'test_latency_seconds_sum{kind="level"} 5.55',
+        'test_latency_seconds_count{kind="level"} 3',
+    ]
+
+
+def test_counter_escapes_label_values():
+    counter = Counter("test_events", "Test.", ("topic",))
+    REGISTRY.remove(counter)
+    counter.inc('a"b')
+    counter.inc('a"b', amount=2)
+
+    assert counter.render().splitlines()[-1] == 'test_events_total{topic="a\\"b"} 3'
+
+
+def test_middleware_labels_requests_by_route_template(monkeypatch):
+    monkeypatch.setattr(http_requests, "_values", {})
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        return {"id": item_id}
+
+    client = TestClient(app)
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/missing")
+
+    lines = http_requests.render().splitlines()
+    assert (
+        'http_requests_total{method="GET",route="/items/{item_id}",status="200"} 2'
+        in lines
+    )
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in lines
@@ -0,0 +1,44 @@
+from sqlalchemy import create_engine, text
+
+from app.core import migrate_compact
+from app.core.migrate_compact import copy_table, swap_table
+from app.model.db_models.types import from_epoch_millis
+
+
+def insert_level(conn, index: int, date):
+    conn.execute(
+        text(
+            "INSERT INTO levels (id, device_id, date, level) "
+            "VALUES (:id, 1, :date, :level)"
+        ),
+        {"id": f"id-{index}", "date": date, "level": float(index)},
+    )
+
+
+def test_swap_copies_rows_written_during_the_online_copy(tmp_path, monkeypatch):
+    monkeypatch.setattr(migrate_compact, "COPY_BATCH_SIZE", 2)
+    bind = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with bind.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE levels (id VARCHAR PRIMARY KEY, device_id INTEGER, "
+                "date DATETIME, level FLOAT)"
+            )
+        )
+        for index in range(5):
+            insert_level(conn, index, f"2025-05-0{index + 2} 10:00:00.000000")
+
+    assert copy_table(bind, "levels") == 5
+
+    with bind.begin() as conn:
+        insert_level(conn, 5, "2025-04-01 08:00:00.000000")
+        insert_level(conn, 6, None)
+        insert_level(conn, 7, "2025-05-20 12:30:00.000000")
+    swap_table(bind, "levels")
+
+    with bind.connect() as conn:
+        rows = conn.execute(text("SELECT ts, level FROM levels ORDER BY ts")).all()
+        legacy = conn.execute(text("SELECT count(*) FROM levels_legacy")).scalar()
+    assert [level for _, level in rows] == [5.0, 0.0, 1.0, 2.0, 3.0, 4.0, 7.0]
+    assert str(from_epoch_millis(rows[0][0])) == "2025-04-01 08:00:00"
+    assert legacy == 8
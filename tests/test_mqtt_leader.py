@@ -0,0 +1,76 @@
+import multiprocessing
+import os
+import queue
+import signal
+import time
+
+from app.core.locks import FileLock
+from app.mqtt.leader import LeaderElection
+
+RETRY_INTERVAL = 0.05
+context = multiprocessing.get_context("fork")
+
+
+def run_worker(lock_path: str, broker: multiprocessing.Queue):
+    election = LeaderElection(
+        FileLock(lock_path),
+        lambda: broker.put(("subscribe", os.getpid())),
+        lambda: broker.put(("unsubscribe", os.getpid())),
+        RETRY_INTERVAL,
+    )
+
+    def shutdown(signum, frame):
+        election.stop()
+        broker.close()
+        broker.join_thread()
+        os._exit(0)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    election.start()
+    while True:
+        time.sleep(1)
+
+
+def drain(broker: multiprocessing.Queue, timeout: float = 1.0) -> list:
+    events = []
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            events.append(broker.get(timeout=RETRY_INTERVAL))
+        except queue.Empty:
+            pass
+    return events
+
+
+def test_one_worker_consumes_and_another_takes_over(tmp_path):
+    broker = context.Queue()
+    workers = {}
+    for _ in range(4):
+        worker = context.Process(
+            target=run_worker, args=(str(tmp_path / "mqtt.lock"), broker)
+        )
+        worker.start()
+        workers[worker.pid] = worker
+
+    try:
+        events = drain(broker)
+        assert [event for event, _ in events] == ["subscribe"]
+        leader = events[0][1]
+
+        os.kill(leader, signal.SIGKILL)
+        workers.pop(leader).join()
+        events = drain(broker)
+        assert [event for event, _ in events] == ["subscribe"]
+        assert events[0][1] in workers
+        leader = events[0][1]
+
+        os.kill(leader, signal.SIGTERM)
+        workers.pop(leader).join()
+        events = drain(broker)
+        assert [event for event, _ in events] == ["unsubscribe", "subscribe"]
+        assert events[0][1] == leader
+        assert events[1][1] in workers
+    finally:
+        for worker in workers.values():
+            worker.kill()
+            worker.join()
@@ -0,0 +1,33 @@
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from app.core.pagination import (
+    Page,
+    encode_cursor,
+    parse_id_cursor,
+    parse_time_cursor,
+)
+
+
+def test_cursor_round_trip():
+    date = datetime(2025, 3, 1, 12, 30, 15, 250000)
+    assert parse_time_cursor(encode_cursor(date, 42)) == (date, 42)
+
+    contact_id = uuid4()
+    assert parse_id_cursor(encode_cursor(str(contact_id))) == contact_id
+    assert parse_time_cursor(None) is None
+
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", encode_cursor("x", 1), "W10"])
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        parse_time_cursor(cursor)
+
+
+def test_page_is_a_list_with_next_cursor():
+    page = Page([1, 2], "abc")
+    assert page == [1, 2]
+    assert page.next_cursor == "abc"
+    assert Page().next_cursor is None
@@ -0,0 +1,124 @@
+import asyncio
+from datetime import timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.export import stream_rows
+from app.core.pagination import parse_time_cursor
+from app.core.utils import local_now
+from app.model.db_models.level import Level
+from app.model.db_models.level_daily import LevelDaily
+from app.model.db_models.level_hourly import LevelHourly
+from app.repository.level_daily_repository import rebuild_level_daily
+from app.repository.level_repository import (
+    create_level_batch,
+    get_level_by_date,
+    get_level_by_days,
+    select_level_hourly_range,
+    select_level_range,
+)
+from app.service.retention_service import RetentionService
+
+
+def seed_levels(db, days_ago: int, count: int):
+    start = (local_now() - timedelta(days=days_ago)).replace(hour=10, minute=0)
+    create_level_batch(
+        db,
+        [
+            {
+                "device_id": 1,
+                "date": start + timedelta(minutes=20 * index),
+                "level": float(index),
+            }
+            for index in range(count)
+        ],
+    )
+
+
+def test_old_readings_are_compacted_into_hourly_rollups(db):
+    seed_levels(db, 40, 6)
+    seed_levels(db, 1, 3)
+
+    result = RetentionService(db).apply(30, 0, batch_size=4, pause=0, vacuum_pages=10)
+
+    assert result["compacted"] == {"levels": 6, "sensor_data": 0}
+    assert db.query(Level).count() == 3
+    hours = db.query(LevelHourly).order_by(LevelHourly.hour).all()
+    assert [(h.count, h.sum, h.min, h.max) for h in hours] == [
+        (3, 3.0, 0.0, 2.0),
+        (3, 12.0, 3.0, 5.0),
+    ]
+    assert db.query(LevelDaily).count() == 2
+
+    rebuild_level_daily(db)
+    assert db.query(LevelDaily).count() == 2
+
+
+def test_expired_hourly_rollups_are_purged(db):
+    seed_levels(db, 400, 3)
+    seed_levels(db, 40, 3)
+
+    result = RetentionService(db).apply(30, 365, batch_size=1, pause=0, vacuum_pages=10)
+
+    assert result["compacted"]["levels"] == 6
+    assert result["purged"] == {"level_hourly": 1, "sensor_hourly": 0}
+    assert db.query(LevelHourly).count() == 1
+    assert db.query(LevelDaily).count() == 2
+
+
+def test_ranges_read_compacted_hours_from_the_rollups(db):
+    seed_levels(db, 40, 6)
+    seed_levels(db, 1, 3)
+    RetentionService(db).apply(30, 0, batch_size=4, pause=0, vacuum_pages=10)
+
+    page = get_level_by_days(db, 1, 60, limit=4)
+    assert [record["level"] for record in page] == [2.0, 1.0, 0.0, 4.0]
+    page = get_level_by_days(
+        db, 1, 60, limit=4, after=parse_time_cursor(page.next_cursor)
+    )
+    assert [record["level"] for record in page] == [1.0]
+    assert page.next_cursor is None
+
+    day = (local_now() - timedelta(days=40)).strftime("%d%m%Y")
+    assert get_level_by_date(db, 1, day) == [
+        {"date": "11:00", "level": 4.0},
+        {"date": "10:00", "level": 1.0},
+    ]
+
+
+def test_exports_merge_compacted_hours_into_the_raw_rows(tmp_path):
+    path = tmp_path / "export.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        seed_levels(db, 40, 6)
+        RetentionService(db).apply(30, 0, batch_size=4, pause=0, vacuum_pages=10)
+        seed_levels(db, 40, 1)
+        seed_levels(db, 1, 2)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+    async def export():
+        start = local_now() - timedelta(days=60)
+        chunks = stream_rows(
+            select_level_range(1, start, None),
+            ["date", "level"],
+            "csv",
+            async_sessionmaker(bind=async_engine),
+            rollups=select_level_hourly_range(1, start, None),
+        )
+        return "".join([chunk async for chunk in chunks])
+
+    lines = asyncio.run(export()).splitlines()
+    asyncio.run(async_engine.dispose())
+    engine.dispose()
+    assert lines[0] == "date,level"
+    assert [line.split(",")[1] for line in lines[1:]] == [
+        "1.0",
+        "0.0",
+        "4.0",
+        "0.0",
+        "1.0",
+    ]
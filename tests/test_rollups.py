@@ -0,0 +1,51 @@
+from datetime import timedelta
+
+from app.core.utils import local_now
+from app.repository.level_daily_repository import rebuild_level_daily
+from app.repository.level_repository import (
+    create_level,
+    create_level_batch,
+    get_last_n_avg_level_data,
+)
+from app.repository.sensor_daily_repository import rebuild_sensor_daily
+from app.repository.sensor_data_repository import (
+    create_sensor_data,
+    create_sensor_data_batch,
+    get_last_n_avg_sensor_data,
+)
+
+
+def test_incremental_rollups_match_a_rebuild(db):
+    now = local_now().replace(hour=12, minute=0, second=0, microsecond=0)
+    for day in range(5):
+        for hour in range(0, 24, 7):
+            date = now - timedelta(days=day, hours=hour)
+            value = float(day * 10 + hour)
+            reading = {"device_id": 1 + hour % 2, "date": date}
+            if hour % 3:
+                create_level(db, {**reading, "level": value})
+                create_sensor_data(
+                    db, {**reading, "temperature": value, "humidity": 100 - value}
+                )
+            else:
+                create_level_batch(db, [{**reading, "level": value}])
+                create_sensor_data_batch(
+                    db, [{**reading, "temperature": value, "humidity": 100 - value}]
+                )
+    create_level_batch(db, [{"device_id": 1, "date": now, "level": 0.0}])
+
+    def averages():
+        return [
+            (
+                get_last_n_avg_level_data(db, device_id, 7),
+                get_last_n_avg_sensor_data(db, device_id, 7),
+            )
+            for device_id in (1, 2)
+        ]
+
+    incremental = averages()
+    assert all(levels and sensor for levels, sensor in incremental)
+
+    rebuild_level_daily(db)
+    rebuild_sensor_daily(db)
+    assert averages() == incremental
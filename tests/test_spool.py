@@ -0,0 +1,74 @@
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy.exc import OperationalError
+
+from app.mqtt.ingest_queue import IngestQueue
+from app.mqtt.spool import Spool
+
+
+def test_spool_survives_reopen_and_replays_in_order(tmp_path):
+    date = datetime(2025, 5, 1, 12, 0, tzinfo=timezone.utc)
+    spool = Spool(str(tmp_path), segment_bytes=200, fsync_interval=0.0)
+    assert spool.open()
+    for level in range(6):
+        spool.append("level", [{"device_id": 1, "level": level, "date": date}])
+    spool.append("sensor", [{"device_id": 1, "temperature": 20.0, "date": date}])
+    spool.close()
+
+    spool = Spool(str(tmp_path), segment_bytes=200, fsync_interval=0.0)
+    spool.open()
+    assert spool.pending == 7
+    assert spool.stats()["segments"] > 1
+
+    replayed = []
+    while (chunk := spool.read(4)) is not None:
+        kind, rows, token = chunk
+        replayed.append((kind, [row.get("level") for row in rows]))
+        assert all(row["date"] == date for row in rows)
+        spool.commit(token, len(rows), 0.001)
+
+    assert [kind for kind, _ in replayed][-1] == "sensor"
+    levels = [level for kind, chunk in replayed if kind == "level" for level in chunk]
+    assert levels == list(range(6))
+    stats = spool.stats()
+    assert stats["pending"] == 0 and stats["segments"] == 0
+    assert stats["lag_seconds"] == 0.0 and stats["replay_rate"] > 0
+    spool.close()
+
+
+def test_ingest_queue_spools_while_database_is_locked(tmp_path, session_factory):
+    saved = []
+    locked = [True]
+
+    def save(db, rows):
+        if locked[0]:
+            raise OperationalError("INSERT", {}, Exception("database is locked"))
+        saved.extend(rows)
+        return len(rows)
+
+    queue = IngestQueue(
+        handlers={"level": save},
+        max_size=100,
+        batch_size=10,
+        flush_interval=0.01,
+        put_timeout=1.0,
+        session_factory=session_factory,
+        spool=Spool(str(tmp_path), segment_bytes=1 << 20, fsync_interval=0.01),
+        retry_interval=0.05,
+    )
+    queue.start()
+    for level in range(20):
+        queue.put("level", {"device_id": 1, "level": level})
+    time.sleep(0.2)
+    assert saved == []
+    assert queue.stats()["spool"]["pending"] == 20
+
+    locked[0] = False
+    time.sleep(0.3)
+    queue.stop()
+
+    assert sorted(row["level"] for row in saved) == list(range(20))
+    stats = queue.stats()
+    assert stats["spooled"] == 20 and stats["failed"] == 0
+    assert stats["spool"]["pending"] == 0 and stats["spool"]["replayed"] == 20
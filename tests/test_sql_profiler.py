@@ -0,0 +1,33 @@
+from sqlalchemy import text
+
+from app.core.sql_profiler import SqlProfiler
+from app.repository.level_repository import get_last_n_avg_level_data
+
+
+def test_statements_are_attributed_to_the_repository_function(engine, db):
+    profiler = SqlProfiler(slow_ms=0)
+    profiler.attach(engine)
+    get_last_n_avg_level_data(db, 1, 7)
+    get_last_n_avg_level_data(db, 1, 7)
+
+    [query] = profiler.top()
+    assert query["caller"] == "level_repository.get_last_n_avg_level_data"
+    assert query["count"] == 2
+    assert query["slow"] == 2
+    assert query["plan"][0].startswith("SEARCH level_daily")
+    assert not query["full_scan"]
+
+
+def test_slow_full_scans_are_flagged(engine, db):
+    profiler = SqlProfiler(slow_ms=0)
+    profiler.attach(engine)
+    db.execute(text("SELECT * FROM levels WHERE level > :level"), {"level": 1})
+
+    [query] = profiler.top()
+    assert query["plan"] == ["SCAN levels"]
+    assert query["full_scan"]
+
+    profiler.reset()
+    profiler.slow_ms = 1000
+    db.execute(text("SELECT * FROM levels WHERE level > :level"), {"level": 1})
+    assert profiler.top()[0]["plan"] is None
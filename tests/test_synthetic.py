@@ -0,0 +1,37 @@
+from datetime import datetime
+
+import pytest
+
+from app.core import synthetic
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(synthetic, "np", None)
+    elif synthetic.np is None:
+        pytest.skip("NumPy is not installed")
+
+
+def test_levels_are_refilled_every_morning_and_drain_during_the_day(backend):
+    start = datetime(2025, 5, 1, 0, 0)
+    chunks = list(synthetic.level_chunks(3, start, 3600, 72, 50, seed=1))
+
+    assert [len(chunk) for chunk in chunks] == [50, 22]
+    rows = [row for chunk in chunks for row in chunk]
+    assert rows[25]["date"] == datetime(2025, 5, 2, 1, 0)
+    assert {row["device_id"] for row in rows} == {3}
+    for day in range(3):
+        cycle = [row["level"] for row in rows[day * 24 + 7 : day * 24 + 24]]
+        assert cycle[0] >= 90
+        assert cycle == sorted(cycle, reverse=True)
+
+
+def test_temperature_peaks_in_the_afternoon(backend):
+    start = datetime(2025, 5, 1, 0, 0)
+    [rows] = synthetic.sensor_data_chunks(1, start, 3600, 24, 100, seed=1)
+
+    temperatures = [row["temperature"] for row in rows]
+    assert 12 <= temperatures.index(max(temperatures)) <= 17
+    assert all(10.0 <= row["humidity"] <= 98.0 for row in rows)
+    assert synthetic.sample_count(31, 43200) == 62
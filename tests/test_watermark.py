@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+from starlette.requests import Request
+
+from app.core.watermark import Watermark, cache_headers, is_not_modified
+
+
+def make_request(headers: dict) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "headers": [
+                (name.lower().encode(), value.encode())
+                for name, value in headers.items()
+            ],
+        }
+    )
+
+
+def test_etag_changes_with_version_and_params():
+    watermark = Watermark("levels")
+    etag, _ = watermark.validators(("last", 3))
+    assert watermark.validators(("last", 3))[0] == etag
+    assert watermark.validators(("last", 4))[0] != etag
+
+    watermark.advance()
+    assert watermark.validators(("last", 3))[0] != etag
+
+
+def test_relative_modes_are_not_older_than_their_window():
+    watermark = Watermark("levels")
+    _, last_modified = watermark.validators(("avg", 7))
+    since = datetime.now() + timedelta(days=1)
+    _, shifted = watermark.validators(("avg", 7), since)
+    assert shifted > last_modified
+
+
+def test_conditional_request_matching():
+    watermark = Watermark("levels")
+    etag, last_modified = watermark.validators(("last", 3))
+    headers = cache_headers(etag, last_modified)
+
+    assert is_not_modified(make_request({"If-None-Match": etag}), etag, last_modified)
+    assert is_not_modified(
+        make_request({"If-None-Match": f'"other", {etag}'}), etag, last_modified
+    )
+    assert not is_not_modified(
+        make_request({"If-None-Match": '"other"'}), etag, last_modified
+    )
+    assert is_not_modified(
+        make_request({"If-Modified-Since": headers["Last-Modified"]}),
+        etag,
+        last_modified,
+    )
+    assert not is_not_modified(make_request({}), etag, last_modified)